@@ -0,0 +1,4 @@
+"""
+Benchmark module
+Offline performance benchmarks driven by synthetic media
+"""
@@ -0,0 +1,194 @@
+"""
+Synthetic media generation module
+Generates deterministic slides, narration audio, subtitles and talking-head clips with FFmpeg lavfi sources,
+so benchmarks run offline without real decks or TTS output
+"""
+
+import os
+import subprocess
+
+
+# lavfi test patterns cycled across slides so every slide is a distinct image
+SLIDE_PATTERNS = ['testsrc2', 'smptehdbars', 'rgbtestsrc', 'mandelbrot', 'cellauto']
+
+
+def _run_ffmpeg(args, output_path):
+    """
+    Run an FFmpeg command that produces output_path, skipping it if the file already exists
+
+    Args:
+        args (list): FFmpeg arguments (without the leading 'ffmpeg -y' and trailing output path)
+        output_path (str): Output file path
+
+    Returns:
+        str: Output file path
+    """
+    if os.path.exists(output_path):
+        return output_path
+
+    cmd = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error'] + args + [output_path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed to generate {output_path}: {result.stderr}")
+    return output_path
+
+
+def generate_slide_image(output_dir, index, width=1920, height=1080):
+    """
+    Generate a slide image from a lavfi test pattern
+
+    Args:
+        output_dir (str): Output directory
+        index (int): Slide index, selects the pattern
+        width (int): Image width
+        height (int): Image height
+
+    Returns:
+        str: Image file path
+    """
+    pattern = SLIDE_PATTERNS[index % len(SLIDE_PATTERNS)]
+    output_path = os.path.join(output_dir, f'slide_{index}_{width}x{height}.png')
+    return _run_ffmpeg([
+        '-f', 'lavfi',
+        '-i', f'{pattern}=size={width}x{height}:rate=1',
+        '-frames:v', '1',
+    ], output_path)
+
+
+def generate_audio(output_dir, duration, kind='sine', seed=0):
+    """
+    Generate a narration stand-in audio track
+
+    Args:
+        output_dir (str): Output directory
+        duration (float): Duration in seconds
+        kind (str): 'sine' for a pure tone or 'noise' for seeded pink noise
+        seed (int): Seed for the noise generator and tone frequency
+
+    Returns:
+        str: Audio file path (AAC in M4A, encodable by every FFmpeg build)
+    """
+    if kind == 'sine':
+        source = f'sine=frequency={220 + 20 * (seed % 10)}:duration={duration}:sample_rate=24000'
+    elif kind == 'noise':
+        source = f'anoisesrc=color=pink:duration={duration}:sample_rate=24000:amplitude=0.3:seed={seed}'
+    else:
+        raise ValueError(f"Unknown audio kind: {kind}. Supported: ['sine', 'noise']")
+
+    output_path = os.path.join(output_dir, f'audio_{kind}_{seed}_{duration:g}s.m4a')
+    return _run_ffmpeg([
+        '-f', 'lavfi',
+        '-i', source,
+        '-c:a', 'aac',
+        '-b:a', '128k',
+    ], output_path)
+
+
+def _seconds_to_srt_time(seconds):
+    """
+    Convert seconds to SRT time format (HH:MM:SS,mmm)
+
+    Args:
+        seconds (float): Time in seconds
+
+    Returns:
+        str: SRT time format
+    """
+    total_ms = int(round(seconds * 1000))
+    h, rest = divmod(total_ms, 3600 * 1000)
+    m, rest = divmod(rest, 60 * 1000)
+    s, ms = divmod(rest, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def generate_srt(output_dir, duration, index=0, cue_seconds=2.5):
+    """
+    Generate an SRT subtitle file with evenly spaced cues covering the duration
+
+    Args:
+        output_dir (str): Output directory
+        duration (float): Total duration in seconds
+        index (int): Slide index, used in the cue text and filename
+        cue_seconds (float): Length of each cue
+
+    Returns:
+        str: SRT file path
+    """
+    output_path = os.path.join(output_dir, f'subtitle_{index}_{duration:g}s.srt')
+    if os.path.exists(output_path):
+        return output_path
+
+    blocks = []
+    start = 0.0
+    number = 1
+    while start < duration:
+        end = min(start + cue_seconds, duration)
+        blocks.append(
+            f"{number}\n"
+            f"{_seconds_to_srt_time(start)} --> {_seconds_to_srt_time(end)}\n"
+            f"第 {index + 1} 页 字幕 {number}: synthetic subtitle line"
+        )
+        start = end
+        number += 1
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('\n\n'.join(blocks) + '\n')
+    return output_path
+
+
+def generate_talking_head(output_dir, duration, size=2048, fps=30):
+    """
+    Generate a synthetic digital human clip with the same geometry as lip-sync output
+
+    Args:
+        output_dir (str): Output directory
+        duration (float): Duration in seconds
+        size (int): Square frame size (lip-sync clips are 2048x2048)
+        fps (int): Frame rate
+
+    Returns:
+        str: Video file path
+    """
+    output_path = os.path.join(output_dir, f'talking_head_{size}_{fps}fps_{duration:g}s.mp4')
+    return _run_ffmpeg([
+        '-f', 'lavfi',
+        '-i', f'testsrc=size={size}x{size}:rate={fps}:duration={duration}',
+        '-c:v', 'libx264',
+        '-preset', 'ultrafast',
+        '-crf', '23',
+        '-pix_fmt', 'yuv420p',
+    ], output_path)
+
+
+def generate_deck(output_dir, slide_count, slide_seconds, audio_kind='sine', with_avatar=False,
+                  with_subtitles=False, avatar_size=2048):
+    """
+    Generate the local files for a synthetic deck, in the shape returned by video.downloader.download_segment_files
+
+    Args:
+        output_dir (str): Directory where generated media is cached
+        slide_count (int): Number of slides
+        slide_seconds (float): Narration length per slide
+        audio_kind (str): 'sine' or 'noise'
+        with_avatar (bool): Attach a talking-head clip to every slide
+        with_subtitles (bool): Attach an SRT file to every slide
+        avatar_size (int): Square size of the talking-head clip
+
+    Returns:
+        list: Segment dicts with image_path, audio_path, video_path, subtitle_path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    avatar_path = None
+    if with_avatar:
+        avatar_path = generate_talking_head(output_dir, slide_seconds, size=avatar_size)
+
+    segments = []
+    for i in range(slide_count):
+        segments.append({
+            'image_path': generate_slide_image(output_dir, i),
+            'audio_path': generate_audio(output_dir, slide_seconds, kind=audio_kind, seed=i),
+            'video_path': avatar_path,
+            'subtitle_path': generate_srt(output_dir, slide_seconds, index=i) if with_subtitles else None,
+        })
+    return segments
@@ -0,0 +1,308 @@
+"""
+TTS event-loop conformance check
+Runs concurrent synthesize + transcribe calls through a TTS provider while probing event-loop lag,
+and fails when any probe wakes up later than the threshold, i.e. when a provider blocks the loop
+
+By default the provider talks to a local synthetic OpenAI-compatible server with configurable latency,
+so the check runs offline; pass --base-url / --api-key to run it against a real endpoint
+
+Usage (from the server directory):
+    python -m benchmarks.tts_event_loop --channel openai --concurrency 1,8,32 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import aiofiles
+
+from benchmarks.synthetic import _run_ffmpeg, generate_srt
+from benchmarks.video_synthesis import collect_environment
+from system.health import EventLoopLagMonitor
+from tts.providers import TTSProviderFactory
+
+REPORT_SCHEMA_VERSION = 1
+
+# Probe interval; a blocking provider shows up as lag close to the upstream latency
+PROBE_INTERVAL = 0.01
+
+
+def generate_mp3(output_dir, duration):
+    """
+    Generate an MP3 stand-in for TTS output
+
+    Args:
+        output_dir (str): Output directory
+        duration (float): Duration in seconds
+
+    Returns:
+        str: MP3 file path
+    """
+    output_path = os.path.join(output_dir, f'speech_{duration:g}s.mp3')
+    return _run_ffmpeg([
+        '-f', 'lavfi',
+        '-i', f'sine=frequency=440:duration={duration}:sample_rate=24000',
+        '-c:a', 'libmp3lame',
+        '-b:a', '64k',
+    ], output_path)
+
+
+class _SyntheticHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog (5) stalls concurrent connects on SYN retries
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class SyntheticSpeechServer:
+    """OpenAI-compatible /models, /audio/speech and /audio/transcriptions endpoints served from a background thread"""
+
+    def __init__(self, audio_path, subtitle_path, latency, chunks=8, error_rate=0.0):
+        """
+        Args:
+            audio_path (str): MP3 returned by /audio/speech
+            subtitle_path (str): SRT returned by /audio/transcriptions
+            latency (float): Seconds each call takes; speech is streamed in chunks spread over it
+            chunks (int): Number of chunks the speech body is streamed in
+            error_rate (float): Share of POST calls answered with 500
+
+        latency and error_rate may be changed while the server runs to simulate a degrading provider
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        requests_lock = threading.Lock()
+        synthetic = self
+        with open(audio_path, 'rb') as f:
+            audio = f.read()
+        # response_format=pcm: the same tone as raw 24 kHz 16-bit mono samples
+        pcm = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-i', audio_path, '-f', 's16le', '-ar', '24000', '-ac', '1', '-'],
+            capture_output=True, check=True
+        ).stdout
+        with open(subtitle_path, 'rb') as f:
+            subtitle = f.read()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                # /models is what provider warm-up calls
+                body = b'{"object": "list", "data": []}' if self.path.endswith('/models') else b''
+                self.send_response(200 if body else 404)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length)
+                with requests_lock:
+                    synthetic.requests += 1
+                latency = synthetic.latency
+                if random.random() < synthetic.error_rate:
+                    error = b'{"error": {"message": "Synthetic server error", "type": "server_error"}}'
+                    self.send_response(500)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(error)))
+                    self.end_headers()
+                    self.wfile.write(error)
+                elif self.path.endswith('/audio/speech'):
+                    is_pcm = json.loads(body or b'{}').get('response_format') == 'pcm'
+                    payload = pcm if is_pcm else audio
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'audio/pcm' if is_pcm else 'audio/mpeg')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    step = -(-len(payload) // chunks)
+                    for start in range(0, len(payload), step):
+                        time.sleep(latency / chunks)
+                        self.wfile.write(payload[start:start + step])
+                elif self.path.endswith('/audio/transcriptions'):
+                    time.sleep(latency)
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                    self.send_header('Content-Length', str(len(subtitle)))
+                    self.end_headers()
+                    self.wfile.write(subtitle)
+                else:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+
+        self._server = _SyntheticHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/v1'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+async def _synthesize_one(provider, output_dir, index):
+    """Same provider calls and file writes as the /tts/synthesize endpoint"""
+    output_path = Path(output_dir) / f'tts_{index}.mp3'
+    await provider.synthesize(
+        text='The quick brown fox jumps over the lazy dog.',
+        voice='coral',
+        output_path=output_path,
+        model='gpt-4o-mini-tts'
+    )
+    transcript = await provider.transcribe(output_path, response_format='srt')
+    async with aiofiles.open(Path(output_dir) / f'tts_{index}.srt', 'w', encoding='utf-8') as f:
+        await f.write(transcript)
+
+
+async def run_case(channel, concurrency, provider_kwargs, output_dir):
+    """
+    Run concurrent TTS calls and measure event-loop lag while they are in flight
+
+    Args:
+        channel (str): TTS channel
+        concurrency (int): Number of simultaneous requests
+        provider_kwargs (dict): Provider initialization parameters
+        output_dir (str): Directory for generated audio and subtitles
+
+    Returns:
+        dict: Measurements for this case
+    """
+    provider = TTSProviderFactory.create_provider(channel, **provider_kwargs)
+    monitor = EventLoopLagMonitor(interval=PROBE_INTERVAL, window=sys.maxsize)
+    monitor.start()
+    started_at = time.perf_counter()
+    try:
+        results = await asyncio.gather(
+            *(_synthesize_one(provider, output_dir, i) for i in range(concurrency)),
+            return_exceptions=True
+        )
+    finally:
+        wall_seconds = time.perf_counter() - started_at
+        await monitor.stop()
+        await provider.aclose()
+
+    errors = [repr(r) for r in results if isinstance(r, Exception)]
+    samples = sorted(monitor.samples) or [0.0]
+    return {
+        'channel': channel,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall_seconds, 3),
+        'probes': len(monitor.samples),
+        'max_lag_seconds': round(samples[-1], 4),
+        'p99_lag_seconds': round(samples[int(0.99 * (len(samples) - 1))], 4),
+        'errors': errors,
+    }
+
+
+def run_check(channel, concurrency_levels, latency, max_lag, base_url=None, api_key=None, work_dir=None):
+    """
+    Run the conformance check across concurrency levels
+
+    Args:
+        channel (str): TTS channel
+        concurrency_levels (list): Simultaneous request counts
+        latency (float): Synthetic upstream latency per call (ignored with base_url)
+        max_lag (float): Largest acceptable event-loop lag in seconds
+        base_url (str): Real API base URL; a synthetic server is started when not given
+        api_key (str): API key for base_url
+        work_dir (str): Directory for synthetic media and outputs
+
+    Returns:
+        dict: Report with a 'passed' flag
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix='tts_loop_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+
+    def _run_all(provider_kwargs):
+        results = []
+        for concurrency in concurrency_levels:
+            output_dir = os.path.join(work_dir, f'{channel}_{concurrency}')
+            os.makedirs(output_dir, exist_ok=True)
+            result = asyncio.run(run_case(channel, concurrency, provider_kwargs, output_dir))
+            result['passed'] = not result['errors'] and result['max_lag_seconds'] <= max_lag
+            print(
+                f"{channel} x{concurrency}: {result['wall_seconds']}s, max lag {result['max_lag_seconds']}s, "
+                f"errors {len(result['errors'])} -> {'PASS' if result['passed'] else 'FAIL'}"
+            )
+            results.append(result)
+        return results
+
+    if base_url:
+        results = _run_all({'base_url': base_url, 'api_key': api_key})
+    else:
+        audio_path = generate_mp3(work_dir, 3.0)
+        subtitle_path = generate_srt(work_dir, 3.0)
+        with SyntheticSpeechServer(audio_path, subtitle_path, latency) as server:
+            results = _run_all({'base_url': server.base_url, 'api_key': 'synthetic'})
+
+    return {
+        'schema_version': REPORT_SCHEMA_VERSION,
+        'environment': collect_environment(),
+        'config': {
+            'channel': channel,
+            'concurrency': concurrency_levels,
+            'latency': None if base_url else latency,
+            'max_lag': max_lag,
+            'probe_interval': PROBE_INTERVAL,
+            'synthetic': not base_url,
+        },
+        'results': results,
+        'passed': all(r['passed'] for r in results),
+    }
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that TTS providers keep the event loop responsive")
+    parser.add_argument('--channel', default='openai',
+                        help=f"TTS channel from {TTSProviderFactory.get_supported_channels()}")
+    parser.add_argument('--concurrency', type=_int_list, default=[1, 8, 32],
+                        help="Comma-separated simultaneous request counts")
+    parser.add_argument('--latency', type=float, default=0.5, help="Synthetic upstream latency per call")
+    parser.add_argument('--max-lag', type=float, default=0.1, help="Largest acceptable event-loop lag in seconds")
+    parser.add_argument('--base-url', default=None, help="Run against a real API instead of the synthetic server")
+    parser.add_argument('--api-key', default=None, help="API key for --base-url")
+    parser.add_argument('--work-dir', default=None, help="Directory for synthetic media and outputs")
+    parser.add_argument('--output', default='tts_event_loop.json', help="Report path")
+    args = parser.parse_args(argv)
+
+    report = run_check(
+        channel=args.channel,
+        concurrency_levels=args.concurrency,
+        latency=args.latency,
+        max_lag=args.max_lag,
+        base_url=args.base_url,
+        api_key=args.api_key,
+        work_dir=args.work_dir
+    )
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Conformance report written to {args.output}")
+    sys.exit(0 if report['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
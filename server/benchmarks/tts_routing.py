@@ -0,0 +1,174 @@
+"""
+TTS routing check
+Routes synthesize calls over two local synthetic OpenAI-compatible backends through the provider registry
+(TTS_ROUTES-style configuration) while one backend degrades: first it slows down, then it fails every call,
+then it recovers. Reports how calls were spread per phase, client-visible errors and latency, and fails when
+a client call errors or the degraded backend keeps more than --max-degraded-share of the traffic
+
+Usage (from the server directory):
+    python -m benchmarks.tts_routing --calls 80 --concurrency 4 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.synthetic import generate_srt
+from benchmarks.tts_event_loop import SyntheticSpeechServer, generate_mp3
+from benchmarks.video_synthesis import collect_environment
+from tts.registry import TTSProviderRegistry
+from tts.routing import parse_routes
+
+REPORT_SCHEMA_VERSION = 1
+
+# (phase, latency multiplier, error rate) of the degrading backend; the other one stays healthy
+PHASES = [
+    ('balanced', 1.0, 0.0),
+    ('slow', 4.0, 0.0),
+    ('failing', 1.0, 1.0),
+    ('recovered', 1.0, 0.0),
+]
+# Phases in which the degraded backend should get little traffic
+DEGRADED_PHASES = ('slow', 'failing')
+
+
+async def _run_phase(provider, calls, concurrency, work_dir, phase):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def _call(index):
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                await provider.synthesize(
+                    text=f"Slide {index} of the {phase} phase.",
+                    voice='coral',
+                    output_path=Path(work_dir) / f'{phase}_{index}.mp3',
+                )
+                latencies.append(time.perf_counter() - started_at)
+            except Exception as e:
+                errors.append(repr(e))
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(_call(i) for i in range(calls)))
+    wall = time.perf_counter() - started_at
+    latencies.sort()
+    return {
+        'wall_seconds': round(wall, 3),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'p50_seconds': round(latencies[len(latencies) // 2], 3) if latencies else None,
+        'p95_seconds': round(latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)], 3) if latencies else None,
+    }
+
+
+async def _run(calls, concurrency, latency, circuit_reset, work_dir):
+    audio_path = generate_mp3(work_dir, 3.0)
+    subtitle_path = generate_srt(work_dir, 3.0)
+    with SyntheticSpeechServer(audio_path, subtitle_path, latency) as degrading, \
+            SyntheticSpeechServer(audio_path, subtitle_path, latency) as healthy:
+        routes = parse_routes(json.dumps({'openai': [
+            {'name': 'degrading', 'api_key': 'synthetic', 'base_url': degrading.base_url},
+            {'name': 'healthy', 'api_key': 'synthetic', 'base_url': healthy.base_url},
+        ]}))
+        registry = TTSProviderRegistry(httpx.Limits(max_connections=100, max_keepalive_connections=20), routes=routes)
+        provider = registry.get_provider('openai')
+        for backend in provider.backends:
+            backend.provider.breaker.reset_timeout = circuit_reset
+        results = []
+        try:
+            for phase, slowdown, error_rate in PHASES:
+                degrading.latency = latency * slowdown
+                degrading.error_rate = error_rate
+                before = (degrading.requests, healthy.requests)
+                result = await _run_phase(provider, calls, concurrency, work_dir, phase)
+                sent = (degrading.requests - before[0], healthy.requests - before[1])
+                result.update({
+                    'phase': phase,
+                    'degrading_requests': sent[0],
+                    'healthy_requests': sent[1],
+                    'degrading_share': round(sent[0] / max(sum(sent), 1), 3),
+                })
+                print(f"{phase:>9}: {result}")
+                results.append(result)
+            routing = provider.stats()
+        finally:
+            await registry.aclose()
+    return results, routing
+
+
+def run_check(calls, concurrency, latency, max_degraded_share, circuit_reset, work_dir=None):
+    """
+    Route calls over a degrading and a healthy synthetic backend
+
+    Args:
+        calls (int): Synthesize calls per phase
+        concurrency (int): Calls in flight at a time
+        latency (float): Synthetic upstream latency per call of a healthy backend
+        max_degraded_share (float): Largest acceptable share of requests sent to the degraded backend
+            in the slow and failing phases
+        circuit_reset (float): Seconds the circuit of a failing backend stays open
+        work_dir (str): Directory for the synthetic inputs and outputs
+
+    Returns:
+        dict: Report with a 'passed' flag
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix='tts_routing_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+    results, routing = asyncio.run(_run(calls, concurrency, latency, circuit_reset, work_dir))
+    passed = all(r['errors'] == 0 for r in results) and all(
+        r['degrading_share'] <= max_degraded_share for r in results if r['phase'] in DEGRADED_PHASES
+    )
+    return {
+        'schema_version': REPORT_SCHEMA_VERSION,
+        'environment': collect_environment(),
+        'config': {
+            'calls': calls,
+            'concurrency': concurrency,
+            'latency': latency,
+            'max_degraded_share': max_degraded_share,
+            'circuit_reset': circuit_reset,
+        },
+        'results': results,
+        'routing': routing,
+        'passed': passed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check TTS routing and failover against synthetic backends")
+    parser.add_argument('--calls', type=int, default=80, help="Synthesize calls per phase")
+    parser.add_argument('--concurrency', type=int, default=4, help="Calls in flight at a time")
+    parser.add_argument('--latency', type=float, default=0.3, help="Synthetic upstream latency per call")
+    parser.add_argument('--max-degraded-share', type=float, default=0.25,
+                        help="Largest acceptable share of requests to the degraded backend while it is slow or failing")
+    parser.add_argument('--circuit-reset', type=float, default=2.0,
+                        help="Seconds the circuit of a failing backend stays open")
+    parser.add_argument('--work-dir', default=None, help="Directory for synthetic inputs and outputs")
+    parser.add_argument('--output', default='tts_routing.json', help="Report path")
+    args = parser.parse_args(argv)
+
+    report = run_check(
+        calls=args.calls,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        max_degraded_share=args.max_degraded_share,
+        circuit_reset=args.circuit_reset,
+        work_dir=args.work_dir,
+    )
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"TTS routing report written to {args.output}")
+    sys.exit(0 if report['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Local subtitle timing accuracy check
+Renders synthetic narration whose cue timings are known (one noise burst per estimated syllable, speaking
+rate varied per cue, random pauses between cues and shorter ones at commas inside cues), then times the cues with tts.timing both proportionally
+and with silence refinement, and reports the boundary error against the ground truth
+
+Usage (from the server directory):
+    python -m benchmarks.tts_subtitles --runs 20 --max-error 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from benchmarks.video_synthesis import collect_environment
+from tts.text import CLAUSE_END, split_at
+from tts.timing import ANALYSIS_SAMPLE_RATE, _split_cues, build_cues, decode_audio, speech_weight
+
+REPORT_SCHEMA_VERSION = 1
+
+SAMPLE_TEXTS = [
+    "大家好，欢迎来到今天的课程。我们将学习人工智能的基础知识，包括机器学习、深度学习和自然语言处理等多个方面的内容，"
+    "并通过案例加以说明。首先，我们来看一下什么是机器学习。简单来说，机器学习就是让计算机从数据中学习规律。",
+    "Today we will cover the basics of machine learning, deep learning, and natural language processing, "
+    "with plenty of examples along the way. First, what is a model? A model maps inputs to outputs. "
+    "Ready? Let's go!",
+    "本节介绍 Transformer 架构。It was introduced in 2017 and now powers most large language models. "
+    "它的核心是自注意力机制，每个词都可以关注句子中的其他词。",
+]
+
+
+def render_narration(text, seed):
+    """
+    Render synthetic narration for text
+
+    Args:
+        text (str): Narration text
+        seed (int): Random seed for speaking rate, pauses and noise
+
+    Returns:
+        tuple: (int16 samples at ANALYSIS_SAMPLE_RATE, [(start, end, cue text)] ground truth)
+    """
+    rng = np.random.default_rng(seed)
+    rate = ANALYSIS_SAMPLE_RATE
+    pieces = [np.zeros(int(rng.uniform(0.15, 0.4) * rate))]
+    cursor = len(pieces[0])
+    truth = []
+    cues = _split_cues(text, 48)
+    for i, (cue, pause) in enumerate(cues):
+        speed = rng.uniform(0.8, 1.25)
+        start = cursor
+        clauses = split_at(CLAUSE_END, cue)
+        for j, clause in enumerate(clauses):
+            for _ in range(int(speech_weight(clause))):
+                burst = int(rng.uniform(0.17, 0.25) / speed * rate)
+                envelope = np.sin(np.linspace(0, np.pi, burst)) ** 0.5
+                pieces.append(rng.normal(0, 6000, burst) * envelope * rng.uniform(0.5, 1.0))
+                # Gaps between syllables are shorter than a pause
+                gap = int(rng.uniform(0.01, 0.06) * rate)
+                pieces.append(rng.normal(0, 30, gap))
+                cursor += burst + gap
+            if j < len(clauses) - 1:
+                # Commas inside a cue are short pauses too
+                comma = int(rng.uniform(0.15, 0.3) * rate)
+                pieces.append(rng.normal(0, 30, comma))
+                cursor += comma
+        truth.append((start / rate, (cursor - gap) / rate, cue))
+        if i < len(cues) - 1:
+            silence = int((rng.uniform(0.35, 0.8) if pause >= 1 else rng.uniform(0.18, 0.4) if pause else 0.03) * rate)
+            pieces.append(rng.normal(0, 30, silence))
+            cursor += silence
+    pieces.append(np.zeros(int(rng.uniform(0.3, 0.8) * rate)))
+    samples = np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+    return samples, truth
+
+
+def _write_wav(path, samples):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(ANALYSIS_SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+
+
+def _errors(cues, truth):
+    return [abs(a - b) for (s, e, _), (ts, te, _) in zip(cues, truth) for a, b in ((s, ts), (e, te))]
+
+
+def run_check(runs, max_error, work_dir=None):
+    """
+    Compare proportional and silence-refined cue timing against ground truth
+
+    Args:
+        runs (int): Synthetic narrations per sample text
+        max_error (float): Largest acceptable mean boundary error in seconds (refined timing)
+        work_dir (str): Directory for the rendered WAV files
+
+    Returns:
+        dict: Report with a 'passed' flag
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix='tts_subtitle_bench_')
+    os.makedirs(work_dir, exist_ok=True)
+    proportional, refined, seconds = [], [], []
+    for text_index, text in enumerate(SAMPLE_TEXTS):
+        for run in range(runs):
+            samples, truth = render_narration(text, seed=text_index * 1000 + run)
+            duration = len(samples) / ANALYSIS_SAMPLE_RATE
+            path = os.path.join(work_dir, f'narration_{text_index}_{run}.wav')
+            _write_wav(path, samples)
+
+            proportional.extend(_errors(build_cues(text, duration), truth))
+            started_at = time.perf_counter()
+            decoded = asyncio.run(decode_audio(path))
+            cues = build_cues(text, duration, decoded, ANALYSIS_SAMPLE_RATE)
+            seconds.append(time.perf_counter() - started_at)
+            refined.extend(_errors(cues, truth))
+
+    def _summary(errors):
+        errors = sorted(float(e) for e in errors)
+        return {
+            'mean_error_seconds': round(float(np.mean(errors)), 4),
+            'p95_error_seconds': round(errors[int(0.95 * (len(errors) - 1))], 4),
+            'max_error_seconds': round(errors[-1], 4),
+        }
+
+    report = {
+        'schema_version': REPORT_SCHEMA_VERSION,
+        'environment': collect_environment(),
+        'config': {'runs': runs, 'texts': len(SAMPLE_TEXTS), 'max_error': max_error},
+        'proportional': _summary(proportional),
+        'refined': _summary(refined),
+        'avg_refine_seconds': round(float(np.mean(seconds)), 4),
+    }
+    report['passed'] = report['refined']['mean_error_seconds'] <= max_error
+    print(f"proportional: {report['proportional']}")
+    print(f"refined:      {report['refined']} ({report['avg_refine_seconds']}s per narration)")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check local subtitle timing against synthetic narration")
+    parser.add_argument('--runs', type=int, default=20, help="Synthetic narrations per sample text")
+    parser.add_argument('--max-error', type=float, default=0.25,
+                        help="Largest acceptable mean boundary error in seconds")
+    parser.add_argument('--work-dir', default=None, help="Directory for the rendered WAV files")
+    parser.add_argument('--output', default='tts_subtitles.json', help="Report path")
+    args = parser.parse_args(argv)
+
+    report = run_check(runs=args.runs, max_error=args.max_error, work_dir=args.work_dir)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Subtitle timing report written to {args.output}")
+    sys.exit(0 if report['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Video synthesis benchmark
+Runs video.synthesizer.synthesize_video on synthetic decks across deck sizes, encode profiles and
+concurrency levels, and writes per-stage timings, x-realtime factor and peak memory to a JSON report
+
+Usage (from the server directory):
+    python -m benchmarks.video_synthesis --decks 1,5,10 --profiles default,fast --workers 1,2,4 --avatar
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import psutil
+
+from benchmarks.synthetic import generate_deck
+from video.synthesizer import ENCODE_PROFILES, get_audio_duration, synthesize_video
+
+REPORT_SCHEMA_VERSION = 1
+
+
+class PeakMemorySampler:
+    """Samples the RSS of this process plus all FFmpeg children and keeps the maximum"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        total = 0
+        processes = [self._process]
+        try:
+            processes += self._process.children(recursive=True)
+        except psutil.Error:
+            pass
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                # Child exited between listing and sampling
+                continue
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def _command_output(cmd):
+    """
+    Return the first line of a command's stdout, or None if it cannot be run
+
+    Args:
+        cmd (list): Command and arguments
+
+    Returns:
+        str: First output line or None
+    """
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return result.stdout.splitlines()[0].strip()
+
+
+def collect_environment():
+    """
+    Describe the machine and revision the benchmark ran on, so reports can be compared across commits
+
+    Returns:
+        dict: Environment information
+    """
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return {
+        'git_commit': _command_output(['git', '-C', repo_dir, 'rev-parse', 'HEAD']),
+        'git_dirty': bool(_command_output(['git', '-C', repo_dir, 'status', '--porcelain'])),
+        'ffmpeg_version': _command_output(['ffmpeg', '-hide_banner', '-version']),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'memory_total_bytes': psutil.virtual_memory().total,
+    }
+
+
+def run_case(segments, encode_profile, max_workers, output_dir):
+    """
+    Synthesize one deck and measure it
+
+    Args:
+        segments (list): Segment dicts from benchmarks.synthetic.generate_deck
+        encode_profile (str): Key of ENCODE_PROFILES
+        max_workers (int): Segment encode concurrency
+        output_dir (str): Directory for the synthesized video
+
+    Returns:
+        dict: Measurements for this case
+    """
+    output_path = os.path.join(output_dir, f'bench_{encode_profile}_{max_workers}w_{len(segments)}.mp4')
+    timings = {}
+
+    with PeakMemorySampler() as sampler:
+        started_at = time.perf_counter()
+        synthesize_video(
+            segments,
+            output_path,
+            encode_profile=encode_profile,
+            max_workers=max_workers,
+            timings=timings
+        )
+        wall_seconds = time.perf_counter() - started_at
+
+    output_duration = get_audio_duration(output_path)
+    output_size = os.path.getsize(output_path)
+    os.remove(output_path)
+
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'output_duration_seconds': round(output_duration, 3),
+        'x_realtime': round(output_duration / wall_seconds, 3) if wall_seconds > 0 else None,
+        'output_size_bytes': output_size,
+        'peak_rss_bytes': sampler.peak_bytes,
+        # Stage times are summed across workers, so with max_workers > 1 they can exceed wall_seconds
+        'stage_seconds': {stage: round(seconds, 3) for stage, seconds in sorted(timings.items())},
+    }
+
+
+def run_benchmark(deck_sizes, encode_profiles, worker_counts, slide_seconds=5.0, audio_kind='sine',
+                  with_avatar=False, with_subtitles=False, avatar_size=2048, repeat=1, work_dir=None):
+    """
+    Run the full benchmark matrix
+
+    Args:
+        deck_sizes (list): Slide counts to benchmark
+        encode_profiles (list): ENCODE_PROFILES keys to benchmark
+        worker_counts (list): max_workers values to benchmark
+        slide_seconds (float): Narration length per slide
+        audio_kind (str): 'sine' or 'noise'
+        with_avatar (bool): Overlay a synthetic talking-head clip on every slide
+        with_subtitles (bool): Burn a synthetic SRT into every slide
+        avatar_size (int): Square size of the talking-head clip
+        repeat (int): Runs per case; every run is reported
+        work_dir (str): Cache directory for synthetic media (a temp dir is used and removed if None)
+
+    Returns:
+        dict: Machine-readable report
+    """
+    for profile in encode_profiles:
+        if profile not in ENCODE_PROFILES:
+            raise ValueError(f"Unknown encode profile: {profile}. Supported: {list(ENCODE_PROFILES.keys())}")
+
+    owns_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='video_bench_')
+    media_dir = os.path.join(work_dir, 'media')
+    output_dir = os.path.join(work_dir, 'output')
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    try:
+        for deck_size in deck_sizes:
+            print(f"Generating synthetic deck: {deck_size} slides x {slide_seconds}s")
+            segments = generate_deck(
+                media_dir,
+                deck_size,
+                slide_seconds,
+                audio_kind=audio_kind,
+                with_avatar=with_avatar,
+                with_subtitles=with_subtitles,
+                avatar_size=avatar_size
+            )
+            for profile in encode_profiles:
+                for workers in worker_counts:
+                    for run in range(1, repeat + 1):
+                        print(f"Benchmark: slides={deck_size} profile={profile} workers={workers} run={run}/{repeat}")
+                        measurement = run_case(segments, profile, workers, output_dir)
+                        results.append({
+                            'deck_size': deck_size,
+                            'encode_profile': profile,
+                            'max_workers': workers,
+                            'run': run,
+                            **measurement
+                        })
+    finally:
+        if owns_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'schema_version': REPORT_SCHEMA_VERSION,
+        'benchmark': 'video_synthesis',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': collect_environment(),
+        'config': {
+            'deck_sizes': deck_sizes,
+            'encode_profiles': encode_profiles,
+            'worker_counts': worker_counts,
+            'slide_seconds': slide_seconds,
+            'audio_kind': audio_kind,
+            'with_avatar': with_avatar,
+            'with_subtitles': with_subtitles,
+            'avatar_size': avatar_size,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def _str_list(value):
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark video synthesis on synthetic media")
+    parser.add_argument('--decks', type=_int_list, default=[1, 5], help="Comma-separated slide counts")
+    parser.add_argument('--profiles', type=_str_list, default=['default'],
+                        help=f"Comma-separated encode profiles from {list(ENCODE_PROFILES.keys())}")
+    parser.add_argument('--workers', type=_int_list, default=[1], help="Comma-separated segment concurrency levels")
+    parser.add_argument('--slide-seconds', type=float, default=5.0, help="Narration length per slide")
+    parser.add_argument('--audio', choices=['sine', 'noise'], default='sine', help="Synthetic audio source")
+    parser.add_argument('--avatar', action='store_true', help="Overlay a synthetic talking-head clip")
+    parser.add_argument('--avatar-size', type=int, default=2048, help="Square size of the talking-head clip")
+    parser.add_argument('--subtitles', action='store_true', help="Burn synthetic subtitles")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per case")
+    parser.add_argument('--work-dir', default=None, help="Reuse synthetic media from this directory")
+    parser.add_argument('--output', default='bench_output.json', help="Report path")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        deck_sizes=args.decks,
+        encode_profiles=args.profiles,
+        worker_counts=args.workers,
+        slide_seconds=args.slide_seconds,
+        audio_kind=args.audio,
+        with_avatar=args.avatar,
+        with_subtitles=args.subtitles,
+        avatar_size=args.avatar_size,
+        repeat=args.repeat,
+        work_dir=args.work_dir
+    )
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Benchmark report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,8 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from upload.api import router as upload_router
-from tts.api import router as tts_router
-from video.api import router as video_router
-from virtual.api import router as virtual_router
-from pptToImg.api import router as pptToImg_router
-from fastapi_mcp import FastApiMCP
 from pathlib import Path
 from dotenv import load_dotenv
 import os
 
-# Load environment variables from .env file
+# Load environment variables from .env file before importing modules that read configuration at import time
 # Try to load from project root first, then from current directory
 env_path = Path(__file__).parent.parent / ".env"
 if not env_path.exists():
@@ -23,11 +13,41 @@ else:
     # Fallback to loading from current directory
     load_dotenv()
 
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
+from upload.api import router as upload_router
+from tts.api import router as tts_router
+from video.api import router as video_router
+from virtual.api import router as virtual_router, start_clip_prewarm
+from pptToImg.api import router as pptToImg_router
+from system.api import router as system_router
+from system import health as system_health
+from tts.registry import provider_registry
+from fastapi_mcp import FastApiMCP
+from contextlib import asynccontextmanager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup/shutdown hooks
+    """
+    await system_health.startup()
+    start_clip_prewarm()
+    provider_registry.start_warm_up()
+    yield
+    await provider_registry.aclose()
+    await system_health.shutdown()
+
+
 # Create FastAPI app instance
 app = FastAPI(
     title="FastAPI Project",
     description="A FastAPI project template with system monitoring, file upload, TTS, video synthesis, and PPT to image conversion capabilities",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -45,6 +65,7 @@ app.include_router(tts_router, prefix="/api/v1")
 app.include_router(video_router, prefix="/api/v1")
 app.include_router(virtual_router, prefix="/api/v1")
 app.include_router(pptToImg_router, prefix="/api/v1")
+app.include_router(system_router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
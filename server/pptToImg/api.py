@@ -17,6 +17,8 @@ from pptToImg.utils import (
     convert_ppt_to_pdf,
     pdf_to_images
 )
+from system.admission import ppt_admission
+from system.scheduler import scheduler, get_tenant, get_priority
 
 router = APIRouter(
     prefix="/pptToImg",
@@ -24,6 +26,10 @@ router = APIRouter(
 )
 
 
+# Uploads up to this size are treated as interactive previews unless X-Priority says otherwise
+INTERACTIVE_MAX_BYTES = 5 * 1024 * 1024
+
+
 # context data dir under temp root
 _CONTEXT_DATA_DIR: Path = get_ppt_temp_directory() / "context_data"
 _CONTEXT_DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -88,6 +94,22 @@ def _find_item_index(items: List[Dict], target_id: str) -> int:
     return -1
 
 
+def _convert_to_images(src_path: str, session_dir: str, images_dir: str) -> List[str]:
+    """
+    Convert PPT/PPTX to PDF, then render each page to PNG.
+
+    Args:
+        src_path: Uploaded PPT/PPTX path
+        session_dir: Session directory for the intermediate PDF
+        images_dir: Output directory for page images
+
+    Returns:
+        List[str]: Image file paths
+    """
+    pdf_path = convert_ppt_to_pdf(src_path, session_dir)
+    return pdf_to_images(pdf_path, images_dir, dpi=200)
+
+
 @router.post(
     "/upload",
     response_model=PPTUploadResponse,
@@ -105,6 +127,10 @@ def _find_item_index(items: List[Dict], target_id: str) -> int:
     - LibreOffice (soffice) must be installed
     - PyMuPDF (fitz) or pdf2image + poppler recommended for PDF rendering
     
+    Scheduling:
+    - Conversions are fair-queued per tenant (`X-Tenant-ID`, then `X-Session-ID`, then client address)
+    - `X-Priority: interactive | batch` selects the priority class; files up to 5MB default to interactive
+    
     Returns:
     - session: Unique session ID
     - count: Number of pages converted
@@ -152,12 +178,23 @@ async def upload_ppt(
             detail=f"保存上传文件失败: {e}"
         )
     
-    # Convert PPT → PDF
-    pdf_path = convert_ppt_to_pdf(str(src_path), str(session_dir))
-    
-    # Convert PDF → PNG images
-    images_dir = session_dir / "images"
-    img_paths = pdf_to_images(pdf_path, str(images_dir), dpi=200)
+    file_size = src_path.stat().st_size
+    tenant = get_tenant(request)
+    priority = get_priority(request, interactive=file_size <= INTERACTIVE_MAX_BYTES)
+
+    # Wait for a conversion slot, or fail fast with 429 when the service is saturated
+    async with ppt_admission.admit():
+        # Convert PPT → PDF → PNG images on the fair-share scheduler
+        images_dir = session_dir / "images"
+        img_paths = await scheduler.run(
+            _convert_to_images,
+            str(src_path),
+            str(session_dir),
+            str(images_dir),
+            tenant=tenant,
+            priority=priority,
+            cost=max(file_size / (1024 * 1024), 1)
+        )
     
     # Build response data
     base_url = str(request.base_url).rstrip("/")
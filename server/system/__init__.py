@@ -0,0 +1,4 @@
+"""
+System module
+Provides admission control and health/readiness endpoints
+"""
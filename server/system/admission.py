@@ -0,0 +1,289 @@
+"""
+Admission control module
+Limits how many heavy jobs (video synthesis, lip-sync, PPT conversion, TTS) run at once and
+rejects new work with 429 + Retry-After when the pod is saturated
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+import psutil
+from fastapi import HTTPException
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+# System headroom limits shared by every controller
+CPU_PERCENT_LIMIT = _env_float("ADMISSION_CPU_PERCENT_LIMIT", 90.0)
+MEMORY_PERCENT_LIMIT = _env_float("ADMISSION_MEMORY_PERCENT_LIMIT", 85.0)
+MIN_FREE_DISK_MB = _env_int("ADMISSION_MIN_FREE_DISK_MB", 1024)
+DISK_PATH = Path(os.getenv("ADMISSION_DISK_PATH", "uploads"))
+
+# How long a snapshot of system load is reused before psutil is queried again
+_SYSTEM_SNAPSHOT_TTL = 1.0
+# How often a deferred request re-checks for a free slot
+_POLL_INTERVAL = 0.25
+
+_snapshot_lock = threading.Lock()
+_snapshot = {"taken_at": 0.0, "data": None}
+
+
+def get_system_load() -> dict:
+    """
+    Get current CPU, memory and scratch disk usage (cached for about a second).
+
+    Returns:
+        dict: cpu_percent, memory_percent, disk_free_mb and disk_path
+    """
+    with _snapshot_lock:
+        now = time.monotonic()
+        if _snapshot["data"] is not None and now - _snapshot["taken_at"] < _SYSTEM_SNAPSHOT_TTL:
+            return _snapshot["data"]
+
+        DISK_PATH.mkdir(parents=True, exist_ok=True)
+        data = {
+            # interval=None compares against the previous call, so this never blocks
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": psutil.virtual_memory().percent,
+            "disk_free_mb": psutil.disk_usage(str(DISK_PATH)).free // (1024 * 1024),
+            "disk_path": str(DISK_PATH),
+        }
+        _snapshot["taken_at"] = now
+        _snapshot["data"] = data
+        return data
+
+
+def get_pressure_reasons(load: dict = None, include_cpu: bool = True) -> list:
+    """
+    List which system headroom limits are currently exceeded.
+
+    Args:
+        load: Result of get_system_load() (queried if not provided)
+        include_cpu: Whether the CPU limit counts (the pod's own work keeps CPU high)
+
+    Returns:
+        list: Human-readable reasons, empty when there is headroom
+    """
+    load = load or get_system_load()
+    reasons = []
+    if include_cpu and load["cpu_percent"] >= CPU_PERCENT_LIMIT:
+        reasons.append(f"cpu {load['cpu_percent']:.0f}% >= {CPU_PERCENT_LIMIT:.0f}%")
+    if load["memory_percent"] >= MEMORY_PERCENT_LIMIT:
+        reasons.append(f"memory {load['memory_percent']:.0f}% >= {MEMORY_PERCENT_LIMIT:.0f}%")
+    if load["disk_free_mb"] < MIN_FREE_DISK_MB:
+        reasons.append(f"disk free {load['disk_free_mb']}MB < {MIN_FREE_DISK_MB}MB")
+    return reasons
+
+
+class AdmissionController:
+    """Bounded running slots plus a bounded wait queue for one class of heavy work"""
+
+    def __init__(self, name: str, max_running: int, max_queued: int, queue_timeout: float):
+        """
+        Initialize admission controller.
+
+        Args:
+            name: Work class name (used in errors and readiness output)
+            max_running: Jobs allowed to run at the same time
+            max_queued: Jobs allowed to wait for a slot; more are rejected immediately
+            queue_timeout: Seconds a job may wait before it is rejected
+        """
+        self.name = name
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        # Moving average of job duration, used to estimate Retry-After
+        self.avg_job_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _try_start(self) -> bool:
+        """Take a running slot if one is free and the system has headroom. Caller holds the lock."""
+        if self.running >= self.max_running:
+            return False
+        if get_pressure_reasons(include_cpu=self._cpu_gated()):
+            return False
+        self.running += 1
+        self.admitted_total += 1
+        return True
+
+    def _cpu_gated(self) -> bool:
+        # With nothing of this class running, high CPU is other work (often this pod's own renders):
+        # refusing would only serialize jobs and time out the queue, so CPU only gates additional jobs
+        return self.running > 0
+
+    def _finish(self, started_at: float) -> None:
+        elapsed = time.monotonic() - started_at
+        with self._lock:
+            self.running -= 1
+            if self.avg_job_seconds == 0.0:
+                self.avg_job_seconds = elapsed
+            else:
+                self.avg_job_seconds = 0.8 * self.avg_job_seconds + 0.2 * elapsed
+
+    def retry_after(self) -> int:
+        """
+        Estimate how many seconds a rejected client should wait before retrying.
+
+        Returns:
+            int: Seconds, between 1 and 300
+        """
+        per_job = self.avg_job_seconds or 10.0
+        waves = (self.queued + self.running) / max(self.max_running, 1)
+        return int(min(max(per_job * max(waves, 1.0), 1), 300))
+
+    def _reject(self, reason: str) -> HTTPException:
+        with self._lock:
+            self.rejected_total += 1
+        return HTTPException(
+            status_code=429,
+            detail=f"服务繁忙 ({self.name}): {reason}，请稍后重试",
+            headers={"Retry-After": str(self.retry_after())}
+        )
+
+    def _enqueue(self) -> bool:
+        """Start immediately, or join the wait queue. Returns True if started. Raises 429 if the queue is full."""
+        with self._lock:
+            if self._try_start():
+                return True
+            if self.queued >= self.max_queued:
+                full = True
+            else:
+                self.queued += 1
+                full = False
+        if full:
+            raise self._reject("queue is full")
+        return False
+
+    def _dequeue_or_start(self) -> bool:
+        with self._lock:
+            if self._try_start():
+                self.queued -= 1
+                return True
+            return False
+
+    def _leave_queue(self) -> None:
+        with self._lock:
+            self.queued -= 1
+
+    def _timeout_reason(self) -> str:
+        reasons = get_pressure_reasons(include_cpu=self._cpu_gated())
+        if reasons:
+            return "; ".join(reasons)
+        return f"{self.running}/{self.max_running} jobs running"
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold a running slot for the duration of an async block, waiting in the queue if needed.
+
+        Raises:
+            HTTPException: 429 with Retry-After if the queue is full or the wait times out
+        """
+        if not self._enqueue():
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while not self._dequeue_or_start():
+                    if time.monotonic() >= deadline:
+                        self._leave_queue()
+                        raise self._reject(self._timeout_reason())
+                    await asyncio.sleep(_POLL_INTERVAL)
+            except asyncio.CancelledError:
+                self._leave_queue()
+                raise
+
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self._finish(started_at)
+
+    @contextmanager
+    def admit_sync(self):
+        """
+        Blocking variant of admit() for sync endpoints running in the threadpool.
+
+        Raises:
+            HTTPException: 429 with Retry-After if the queue is full or the wait times out
+        """
+        if not self._enqueue():
+            deadline = time.monotonic() + self.queue_timeout
+            while not self._dequeue_or_start():
+                if time.monotonic() >= deadline:
+                    self._leave_queue()
+                    raise self._reject(self._timeout_reason())
+                time.sleep(_POLL_INTERVAL)
+
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self._finish(started_at)
+
+    def is_saturated(self) -> bool:
+        """
+        Whether new work would be rejected right now.
+
+        Returns:
+            bool: True if the wait queue is full
+        """
+        return self.queued >= self.max_queued
+
+    def stats(self) -> dict:
+        """
+        Get current counters for readiness and metrics output.
+
+        Returns:
+            dict: Controller state
+        """
+        return {
+            "name": self.name,
+            "running": self.running,
+            "max_running": self.max_running,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "avg_job_seconds": round(self.avg_job_seconds, 3),
+            "saturated": self.is_saturated(),
+        }
+
+
+def _controller_from_env(name: str, max_running: int, max_queued: int, queue_timeout: float) -> AdmissionController:
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdmissionController(
+        name=name,
+        max_running=_env_int(f"{prefix}_MAX_RUNNING", max_running),
+        max_queued=_env_int(f"{prefix}_MAX_QUEUED", max_queued),
+        queue_timeout=_env_float(f"{prefix}_QUEUE_TIMEOUT", queue_timeout),
+    )
+
+
+# One controller per heavy endpoint; limits can be overridden with ADMISSION_<NAME>_MAX_RUNNING etc.
+# Video, lip-sync and PPT jobs admitted here are then ordered by system.scheduler, so max_running
+# bounds accepted work rather than concurrent renders and is set above the scheduler's worker count.
+video_admission = _controller_from_env("video", max_running=8, max_queued=4, queue_timeout=30.0)
+virtual_admission = _controller_from_env("virtual", max_running=8, max_queued=8, queue_timeout=30.0)
+ppt_admission = _controller_from_env("ppt", max_running=8, max_queued=4, queue_timeout=30.0)
+tts_admission = _controller_from_env("tts", max_running=8, max_queued=32, queue_timeout=15.0)
+
+CONTROLLERS = [video_admission, virtual_admission, ppt_admission, tts_admission]
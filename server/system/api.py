@@ -0,0 +1,105 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from system.schemas import LivenessResponse, ReadinessResponse
+from system.admission import CONTROLLERS, get_system_load, get_pressure_reasons
+from system.scheduler import scheduler
+from system.health import (
+    REQUIRED_BINARIES,
+    MAX_READY_LOOP_LAG,
+    MAX_LIVE_LOOP_LAG,
+    get_binaries,
+    get_disk_status,
+    get_circuit_states,
+    loop_lag_monitor
+)
+
+router = APIRouter(
+    prefix="/system",
+    tags=["system"]
+)
+
+
+@router.get(
+    "/live",
+    response_model=LivenessResponse,
+    operation_id="liveness_probe",
+    summary="Liveness Probe",
+    description="""
+    Liveness probe for Kubernetes.
+
+    Returns 200 while the event loop keeps responding, or 503 when it has been
+    blocked for longer than HEALTH_MAX_LIVE_LOOP_LAG seconds.
+    """,
+    responses={503: {"model": LivenessResponse, "description": "Event loop is stuck"}}
+)
+async def liveness():
+    """
+    Liveness probe based on event-loop lag.
+
+    Returns:
+        LivenessResponse: Liveness state (HTTP 503 when not alive)
+    """
+    lag = loop_lag_monitor.stats()
+    response = LivenessResponse(
+        alive=lag["current_seconds"] < MAX_LIVE_LOOP_LAG,
+        event_loop_lag=lag
+    )
+    return JSONResponse(status_code=200 if response.alive else 503, content=response.model_dump())
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    operation_id="readiness_probe",
+    summary="Readiness Probe",
+    description="""
+    Readiness probe for load balancers and Kubernetes.
+
+    Returns 200 when this replica can accept new heavy jobs, or 503 when:
+    - a required binary (ffmpeg, ffprobe) is missing
+    - any admission queue is full
+    - CPU/memory headroom is exhausted or a scratch disk is low on space
+    - the event loop is lagging
+
+    Provider circuit states are reported but do not affect readiness, since every
+    replica shares the same upstream providers.
+    """,
+    responses={503: {"model": ReadinessResponse, "description": "Replica is not ready"}}
+)
+async def readiness():
+    """
+    Readiness probe based on binaries, admission queues, system headroom and event-loop lag.
+
+    Returns:
+        ReadinessResponse: Readiness state (HTTP 503 when not ready)
+    """
+    binaries = get_binaries()
+    load = get_system_load()
+    disks = get_disk_status()
+    lag = loop_lag_monitor.stats()
+
+    reasons = [f"{name} not found" for name in REQUIRED_BINARIES if not binaries.get(name)]
+    reasons += get_pressure_reasons(load)
+    for label, disk in disks.items():
+        if not disk["ok"] and disk["path"] != load["disk_path"]:
+            reasons.append(f"{label} disk free {disk['free_mb']}MB is too low")
+    for controller in CONTROLLERS:
+        if controller.is_saturated():
+            reasons.append(f"{controller.name} queue full ({controller.queued}/{controller.max_queued})")
+    if lag["current_seconds"] >= MAX_READY_LOOP_LAG:
+        reasons.append(f"event loop lag {lag['current_seconds']:.2f}s >= {MAX_READY_LOOP_LAG:.2f}s")
+
+    response = ReadinessResponse(
+        ready=not reasons,
+        status="ok" if not reasons else "not_ready",
+        reasons=reasons,
+        binaries=binaries,
+        system=load,
+        disks=disks,
+        admission=[controller.stats() for controller in CONTROLLERS],
+        scheduler=scheduler.stats(),
+        circuits=get_circuit_states(),
+        event_loop_lag=lag
+    )
+    return JSONResponse(status_code=200 if response.ready else 503, content=response.model_dump())
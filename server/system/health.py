@@ -0,0 +1,187 @@
+"""
+Health module
+Startup binary detection, scratch disk checks, event-loop lag monitoring and provider circuit state
+used by the liveness/readiness endpoints
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import psutil
+
+from system.admission import MIN_FREE_DISK_MB, DISK_PATH
+
+
+# Binaries the service shells out to; readiness fails if a required one is missing
+REQUIRED_BINARIES = ["ffmpeg", "ffprobe"]
+OPTIONAL_BINARIES = ["soffice"]
+
+# Event-loop lag above this many seconds makes the replica not ready / not live
+MAX_READY_LOOP_LAG = float(os.getenv("HEALTH_MAX_READY_LOOP_LAG", "1.0"))
+MAX_LIVE_LOOP_LAG = float(os.getenv("HEALTH_MAX_LIVE_LOOP_LAG", "10.0"))
+
+_binaries: Optional[Dict[str, Optional[str]]] = None
+
+# name -> callable returning {"state": "closed" | "open" | "half_open", ...}
+_circuit_sources: Dict[str, Callable[[], dict]] = {}
+
+
+def detect_binaries() -> Dict[str, Optional[str]]:
+    """
+    Resolve external binaries once and cache the result.
+
+    Returns:
+        dict: Binary name -> absolute path, or None if not found
+    """
+    global _binaries
+    from pptToImg.utils import find_soffice
+
+    found = {}
+    for name in REQUIRED_BINARIES + OPTIONAL_BINARIES:
+        if name == "soffice":
+            try:
+                found[name] = find_soffice()
+            except FileNotFoundError:
+                found[name] = None
+        else:
+            found[name] = shutil.which(name)
+    _binaries = found
+    return found
+
+
+def get_binaries() -> Dict[str, Optional[str]]:
+    """
+    Get cached binary locations (detected on first use if startup detection did not run).
+
+    Returns:
+        dict: Binary name -> absolute path, or None if not found
+    """
+    if _binaries is None:
+        return detect_binaries()
+    return _binaries
+
+
+def get_disk_status() -> Dict[str, dict]:
+    """
+    Get free space on the scratch locations the service writes to.
+
+    Returns:
+        dict: Label -> path, free_mb and ok flag
+    """
+    locations = {
+        "uploads": DISK_PATH,
+        "temp": Path(tempfile.gettempdir()),
+    }
+    status = {}
+    for label, path in locations.items():
+        try:
+            free_mb = psutil.disk_usage(str(path)).free // (1024 * 1024)
+        except OSError:
+            free_mb = 0
+        status[label] = {
+            "path": str(path),
+            "free_mb": free_mb,
+            "ok": free_mb >= MIN_FREE_DISK_MB,
+        }
+    return status
+
+
+def register_circuit_source(name: str, source: Callable[[], dict]) -> None:
+    """
+    Register a provider whose circuit breaker state is reported by the health endpoints.
+
+    Args:
+        name: Provider name
+        source: Callable returning a dict with at least a 'state' key
+    """
+    _circuit_sources[name] = source
+
+
+def get_circuit_states() -> Dict[str, dict]:
+    """
+    Get the circuit breaker state of every registered provider.
+
+    Returns:
+        dict: Provider name -> state dict
+    """
+    states = {}
+    for name, source in _circuit_sources.items():
+        try:
+            states[name] = source()
+        except Exception as e:
+            states[name] = {"state": "unknown", "error": str(e)}
+    return states
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep"""
+
+    def __init__(self, interval: float = 0.5, window: int = 20):
+        """
+        Initialize event-loop lag monitor.
+
+        Args:
+            interval: Seconds between probes
+            window: Number of recent probes kept for the max
+        """
+        self.interval = interval
+        self.window = window
+        self.samples = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started_at = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - started_at - self.interval, 0.0)
+            self.samples.append(lag)
+            if len(self.samples) > self.window:
+                self.samples.pop(0)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """
+        Get recent lag measurements.
+
+        Returns:
+            dict: current and max lag in seconds over the window, and whether the monitor runs
+        """
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "current_seconds": round(self.samples[-1], 4) if self.samples else 0.0,
+            "max_seconds": round(max(self.samples), 4) if self.samples else 0.0,
+        }
+
+
+loop_lag_monitor = EventLoopLagMonitor()
+
+
+async def startup() -> None:
+    """Detect binaries and start background health monitoring (called from the app lifespan)."""
+    binaries = detect_binaries()
+    missing = [name for name in REQUIRED_BINARIES if not binaries.get(name)]
+    if missing:
+        print(f"Warning: required binaries not found: {missing}")
+    loop_lag_monitor.start()
+
+
+async def shutdown() -> None:
+    """Stop background health monitoring."""
+    await loop_lag_monitor.stop()
@@ -0,0 +1,371 @@
+"""
+Idempotency module
+Deduplicates retried heavy POSTs by Idempotency-Key header or canonical request hash.
+With an Idempotency-Key, duplicates attach to the in-flight job or replay the stored result; without one,
+identical requests only attach to the in-flight job and nothing is stored. Records and claim locks live on the
+shared volume so replicas see each other's jobs.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, Response
+
+
+IDEMPOTENCY_DIR = Path("uploads") / "aividfromppt" / "idempotency"
+# How long completed results are replayed
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# A claim lock not refreshed for this long is treated as abandoned (replica died mid-job);
+# the owner refreshes it every third of this (at most every minute) while the job runs
+IDEMPOTENCY_STALE_AFTER = float(os.getenv("IDEMPOTENCY_STALE_SECONDS", "90"))
+# How long a duplicate waits for a job owned by another replica before answering 409
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "900"))
+_HEARTBEAT_MAX_INTERVAL = 60.0
+# How often a duplicate re-reads a record owned by another replica
+_POLL_INTERVAL = 1.0
+# Retry-After of the 409 a duplicate gets when it stops waiting for another replica
+_CONFLICT_RETRY_AFTER = 30
+# How often expired records are swept
+_SWEEP_INTERVAL = 600.0
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class _OwnerCancelled(Exception):
+    """Set on a job's future when its owner gave up; attached duplicates retry instead of failing"""
+
+
+def canonical_request_hash(scope: str, payload: Dict[str, Any]) -> str:
+    """
+    Hash a request body independent of key order and whitespace.
+
+    Args:
+        scope: Endpoint scope, e.g. 'video.synthesize'
+        payload: JSON-serializable request body
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    canonical = json.dumps({"scope": scope, "payload": payload}, sort_keys=True, separators=(",", ":"),
+                           ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """File-backed idempotency records with in-process attachment to running jobs"""
+
+    def __init__(self, directory: Path, ttl: float, stale_after: float, wait_timeout: float = IDEMPOTENCY_WAIT_TIMEOUT):
+        """
+        Initialize idempotency store.
+
+        Args:
+            directory: Directory on the shared volume for records and claim locks
+            ttl: Seconds a completed result is replayed
+            stale_after: Seconds after which a claim lock that is not refreshed is considered abandoned
+            wait_timeout: Seconds a duplicate waits for a job owned by another replica
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self.wait_timeout = wait_timeout
+        self.heartbeat_interval = min(stale_after / 3, _HEARTBEAT_MAX_INTERVAL)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    # ----- record files -----
+
+    def _record_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _lock_path(self, key: str) -> Path:
+        return self.directory / f"{key}.lock"
+
+    def _read_record(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._record_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_record(self, key: str, record: dict) -> None:
+        path = self._record_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _try_claim(self, key: str) -> bool:
+        """Create the claim lock atomically; replaces a stale lock left by a dead replica."""
+        lock_path = self._lock_path(key)
+        for _ in range(2):
+            try:
+                fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    age = time.time() - lock_path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if age < self.stale_after:
+                    return False
+                self._remove(lock_path)
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(str(os.getpid()))
+            return True
+        return False
+
+    def _start_heartbeat(self, key: str) -> threading.Event:
+        """Keep touching the claim lock while the job runs, so other replicas do not take it over; set the event to stop."""
+        lock_path = self._lock_path(key)
+        stop = threading.Event()
+
+        def _beat():
+            while not stop.wait(self.heartbeat_interval):
+                try:
+                    os.utime(lock_path)
+                except FileNotFoundError:
+                    return
+
+        threading.Thread(target=_beat, name="idempotency-heartbeat", daemon=True).start()
+        return stop
+
+    def _release_local(self, key: str, future: concurrent.futures.Future) -> None:
+        """Drop the in-process slot without a result; attached duplicates start over."""
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(_OwnerCancelled())
+
+    def _sweep_expired(self) -> None:
+        now = time.time()
+        if now - self._last_sweep < _SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        for path in self.directory.glob("*.json"):
+            try:
+                if now - path.stat().st_mtime > self.ttl:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+
+    # ----- lookup -----
+
+    def _check(self, scope: str, key: str, request_hash: str,
+               validate: Optional[Callable[[dict], bool]]) -> Optional[dict]:
+        """Return a replayable result for key, raise 422 on key reuse with a different body, else None."""
+        record = self._read_record(key)
+        if record is None:
+            return None
+        if record.get("request_hash") != request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Idempotency-Key 已用于不同的请求内容 ({scope})"
+            )
+        if record.get("status") != "completed":
+            return None
+        if time.time() - record.get("completed_at", 0) > self.ttl:
+            return None
+        result = record.get("result")
+        if validate is not None and not validate(result):
+            # Stored result points at files that no longer exist
+            return None
+        return result
+
+    def _resolve_key(self, scope: str, idempotency_key: Optional[str], payload: Dict[str, Any]):
+        request_hash = canonical_request_hash(scope, payload)
+        if idempotency_key:
+            key = hashlib.sha256(f"{scope}:{idempotency_key}".encode("utf-8")).hexdigest()
+        else:
+            key = request_hash
+        return key, request_hash
+
+    def _attach_or_register(self, key: str):
+        """Return (future, is_owner) for the in-process job identified by key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = concurrent.futures.Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: concurrent.futures.Future, request_hash: str, persist: bool,
+                result: Any = None, error: BaseException = None) -> None:
+        if error is None:
+            if persist:
+                self._write_record(key, {
+                    "status": "completed",
+                    "request_hash": request_hash,
+                    "completed_at": time.time(),
+                    "result": result,
+                })
+            future.set_result(result)
+        else:
+            # Failures are not stored, so a retry recomputes
+            if persist:
+                self._remove(self._record_path(key))
+            # A cancelled owner (client disconnect) says nothing about the job: duplicates retry it
+            future.set_exception(error if isinstance(error, Exception) else _OwnerCancelled())
+        self._remove(self._lock_path(key))
+        with self._lock:
+            self._inflight.pop(key, None)
+        self._sweep_expired()
+
+    @staticmethod
+    def _to_dict(result: Any) -> dict:
+        return result.model_dump() if hasattr(result, "model_dump") else result
+
+    @staticmethod
+    def _mark_replayed(response: Optional[Response]) -> None:
+        if response is not None:
+            response.headers[REPLAYED_HEADER] = "true"
+
+    def _wait_expired(self, scope: str, deadline: float) -> None:
+        """Raise 409 once a duplicate has waited wait_timeout for another replica's job."""
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail=f"相同请求仍在其他副本处理中 ({scope})",
+                headers={"Retry-After": str(_CONFLICT_RETRY_AFTER)}
+            )
+
+    # ----- public API -----
+
+    async def run(self, scope: str, idempotency_key: Optional[str], payload: Dict[str, Any],
+                  compute: Callable[[], Awaitable[Any]], response: Optional[Response] = None,
+                  validate: Optional[Callable[[dict], bool]] = None) -> dict:
+        """
+        Run compute once per idempotency key; duplicates get the same result.
+
+        Args:
+            scope: Endpoint scope, e.g. 'video.synthesize'
+            idempotency_key: Idempotency-Key header value; if None, the request hash is used and identical
+                requests only attach to the in-flight job (no result is stored or replayed)
+            payload: JSON-serializable request body
+            compute: Coroutine function producing the response model
+            response: Response to mark with Idempotent-Replayed on duplicates
+            validate: Optional check that a stored result is still usable
+
+        Returns:
+            dict: Response model data
+
+        Raises:
+            HTTPException: 409 if another replica's job did not finish within wait_timeout
+        """
+        key, request_hash = self._resolve_key(scope, idempotency_key, payload)
+        persist = bool(idempotency_key)
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            result = self._check(scope, key, request_hash, validate) if persist else None
+            if result is not None:
+                self._mark_replayed(response)
+                return result
+
+            future, is_owner = self._attach_or_register(key)
+            if not is_owner:
+                # Same job already running in this process
+                try:
+                    result = await asyncio.shield(asyncio.wrap_future(future))
+                except _OwnerCancelled:
+                    continue
+                self._mark_replayed(response)
+                return result
+
+            if self._try_claim(key):
+                break
+
+            # Another replica owns the job: release the local slot and poll its record
+            self._release_local(key, future)
+            self._wait_expired(scope, deadline)
+            await asyncio.sleep(_POLL_INTERVAL)
+
+        if persist:
+            self._write_record(key, {"status": "in_progress", "request_hash": request_hash, "started_at": time.time()})
+        heartbeat = self._start_heartbeat(key)
+        try:
+            result = self._to_dict(await compute())
+        except BaseException as e:
+            self._finish(key, future, request_hash, persist, error=e)
+            raise
+        finally:
+            heartbeat.set()
+        self._finish(key, future, request_hash, persist, result=result)
+        return result
+
+    def run_sync(self, scope: str, idempotency_key: Optional[str], payload: Dict[str, Any],
+                 compute: Callable[[], Any], response: Optional[Response] = None,
+                 validate: Optional[Callable[[dict], bool]] = None) -> dict:
+        """
+        Blocking variant of run() for sync endpoints running in the threadpool.
+
+        Args:
+            scope: Endpoint scope, e.g. 'virtual.generate_video'
+            idempotency_key: Idempotency-Key header value; if None, the request hash is used and identical
+                requests only attach to the in-flight job (no result is stored or replayed)
+            payload: JSON-serializable request body
+            compute: Function producing the response model
+            response: Response to mark with Idempotent-Replayed on duplicates
+            validate: Optional check that a stored result is still usable
+
+        Returns:
+            dict: Response model data
+
+        Raises:
+            HTTPException: 409 if another replica's job did not finish within wait_timeout
+        """
+        key, request_hash = self._resolve_key(scope, idempotency_key, payload)
+        persist = bool(idempotency_key)
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            result = self._check(scope, key, request_hash, validate) if persist else None
+            if result is not None:
+                self._mark_replayed(response)
+                return result
+
+            future, is_owner = self._attach_or_register(key)
+            if not is_owner:
+                try:
+                    result = future.result()
+                except _OwnerCancelled:
+                    continue
+                self._mark_replayed(response)
+                return result
+
+            if self._try_claim(key):
+                break
+
+            self._release_local(key, future)
+            self._wait_expired(scope, deadline)
+            time.sleep(_POLL_INTERVAL)
+
+        if persist:
+            self._write_record(key, {"status": "in_progress", "request_hash": request_hash, "started_at": time.time()})
+        heartbeat = self._start_heartbeat(key)
+        try:
+            result = self._to_dict(compute())
+        except BaseException as e:
+            self._finish(key, future, request_hash, persist, error=e)
+            raise
+        finally:
+            heartbeat.set()
+        self._finish(key, future, request_hash, persist, result=result)
+        return result
+
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_DIR, IDEMPOTENCY_TTL, IDEMPOTENCY_STALE_AFTER)
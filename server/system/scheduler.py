@@ -0,0 +1,292 @@
+"""
+Fair-share scheduler module
+Runs heavy blocking work (video synthesis, lip-sync, PPT conversion) on a shared worker pool with
+weighted fair queuing across tenants, priority classes and per-tenant concurrency caps
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Share of worker time each priority class receives when both have work waiting
+PRIORITY_WEIGHTS = {
+    INTERACTIVE: 4.0,
+    BATCH: 1.0,
+}
+
+TENANT_HEADER = "X-Tenant-ID"
+SESSION_HEADER = "X-Session-ID"
+PRIORITY_HEADER = "X-Priority"
+
+
+class _Job:
+    """A queued unit of work with its fair-queuing finish tag"""
+
+    __slots__ = ("fn", "args", "kwargs", "future", "tenant", "priority", "cost", "start_tag", "finish_tag", "seq")
+
+    def __init__(self, fn, args, kwargs, tenant, priority, cost, start_tag, finish_tag, seq):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = concurrent.futures.Future()
+        self.tenant = tenant
+        self.priority = priority
+        self.cost = cost
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.seq = seq
+
+
+class FairScheduler:
+    """Weighted fair queuing across tenants within priority classes, executed on worker threads"""
+
+    def __init__(self, max_workers: int, tenant_max_running: int, tenant_weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize fair scheduler.
+
+        Args:
+            max_workers: Worker threads shared by all tenants
+            tenant_max_running: Jobs one tenant may run at the same time
+            tenant_weights: Optional per-tenant weights (default 1.0)
+        """
+        self.max_workers = max_workers
+        self.tenant_max_running = tenant_max_running
+        self.tenant_weights = tenant_weights or {}
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Dict[str, deque]] = {p: {} for p in PRIORITY_WEIGHTS}
+        # Virtual time per class and last finish tag per (class, tenant)
+        self._virtual_time = {p: 0.0 for p in PRIORITY_WEIGHTS}
+        self._last_finish: Dict[tuple, float] = {}
+        # Normalized work served per class, used to split workers between classes
+        self._class_served = {p: 0.0 for p in PRIORITY_WEIGHTS}
+        self._running: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._threads = []
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"fair-scheduler-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    # ----- queuing -----
+
+    def submit(self, fn: Callable, *args, tenant: str = "default", priority: str = INTERACTIVE,
+               cost: float = 1.0, **kwargs) -> concurrent.futures.Future:
+        """
+        Queue a blocking call.
+
+        Args:
+            fn: Function to run on a worker thread
+            *args: Positional arguments for fn
+            tenant: Tenant/session the work is billed to
+            priority: INTERACTIVE or BATCH
+            cost: Relative size of the job (e.g. slide count), larger jobs use more of the tenant's share
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            concurrent.futures.Future: Resolves with fn's result
+        """
+        if priority not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown priority class: {priority}. Supported: {list(PRIORITY_WEIGHTS.keys())}")
+        cost = max(float(cost), 0.1)
+        weight = self.tenant_weights.get(tenant, 1.0)
+
+        with self._cond:
+            self._ensure_started()
+            queues = self._queues[priority]
+            if not any(queues.values()):
+                # Class was idle: don't let it bank credit while nobody used it
+                busy = [
+                    served / PRIORITY_WEIGHTS[p] for p, served in self._class_served.items()
+                    if p != priority and any(self._queues[p].values())
+                ]
+                if busy:
+                    self._class_served[priority] = max(self._class_served[priority], min(busy) * PRIORITY_WEIGHTS[priority])
+            start_tag = max(self._virtual_time[priority], self._last_finish.get((priority, tenant), 0.0))
+            finish_tag = start_tag + cost / weight
+            self._last_finish[(priority, tenant)] = finish_tag
+            job = _Job(fn, args, kwargs, tenant, priority, cost, start_tag, finish_tag, next(self._seq))
+            queues.setdefault(tenant, deque()).append(job)
+            self._cond.notify()
+        return job.future
+
+    async def run(self, fn: Callable, *args, tenant: str = "default", priority: str = INTERACTIVE,
+                  cost: float = 1.0, **kwargs) -> Any:
+        """
+        Queue a blocking call and await its result without blocking the event loop.
+
+        Returns:
+            Any: fn's result
+        """
+        future = self.submit(fn, *args, tenant=tenant, priority=priority, cost=cost, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def run_sync(self, fn: Callable, *args, tenant: str = "default", priority: str = INTERACTIVE,
+                 cost: float = 1.0, **kwargs) -> Any:
+        """
+        Queue a blocking call and wait for it on the calling thread.
+
+        Returns:
+            Any: fn's result
+        """
+        return self.submit(fn, *args, tenant=tenant, priority=priority, cost=cost, **kwargs).result()
+
+    # ----- dispatch -----
+
+    def _eligible_head(self, priority: str) -> Optional[_Job]:
+        """Job with the smallest finish tag among tenants below their concurrency cap. Caller holds the lock."""
+        best = None
+        for tenant, queue in self._queues[priority].items():
+            if not queue or self._running.get(tenant, 0) >= self.tenant_max_running:
+                continue
+            head = queue[0]
+            if best is None or (head.finish_tag, head.seq) < (best.finish_tag, best.seq):
+                best = head
+        return best
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pick the class that is furthest behind its share, then its fairest job. Caller holds the lock."""
+        candidates = []
+        for priority, weight in PRIORITY_WEIGHTS.items():
+            head = self._eligible_head(priority)
+            if head is not None:
+                candidates.append((self._class_served[priority] / weight, -weight, priority, head))
+        if not candidates:
+            return None
+        _, _, priority, job = min(candidates, key=lambda c: c[:3])
+
+        queue = self._queues[priority][job.tenant]
+        queue.popleft()
+        if not queue:
+            del self._queues[priority][job.tenant]
+        self._virtual_time[priority] = max(self._virtual_time[priority], job.start_tag)
+        self._class_served[priority] += job.cost
+        self._running[job.tenant] = self._running.get(job.tenant, 0) + 1
+        return job
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn(*job.args, **job.kwargs))
+                except BaseException as e:
+                    job.future.set_exception(e)
+
+            with self._cond:
+                self._running[job.tenant] -= 1
+                if not self._running[job.tenant]:
+                    del self._running[job.tenant]
+                # A tenant dropping below its cap may make queued work eligible
+                self._cond.notify_all()
+
+    # ----- introspection -----
+
+    def stats(self) -> dict:
+        """
+        Get queue depth and running jobs for readiness and metrics output.
+
+        Returns:
+            dict: Scheduler state
+        """
+        with self._cond:
+            queued = {
+                priority: sum(len(q) for q in queues.values())
+                for priority, queues in self._queues.items()
+            }
+            tenants = set(self._running)
+            for queues in self._queues.values():
+                tenants.update(t for t, q in queues.items() if q)
+            return {
+                "max_workers": self.max_workers,
+                "tenant_max_running": self.tenant_max_running,
+                "running": sum(self._running.values()),
+                "queued": queued,
+                "active_tenants": len(tenants),
+            }
+
+
+def get_tenant(request: Request) -> str:
+    """
+    Identify the tenant a request is billed to.
+
+    Uses the X-Tenant-ID header, then X-Session-ID, then the client address.
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        str: Tenant key
+    """
+    tenant = request.headers.get(TENANT_HEADER) or request.headers.get(SESSION_HEADER)
+    if tenant:
+        return tenant.strip()
+    return request.client.host if request.client else "anonymous"
+
+
+def get_priority(request: Request, interactive: bool) -> str:
+    """
+    Resolve the priority class of a request.
+
+    The X-Priority header ('interactive' or 'batch') wins; otherwise the endpoint's
+    size-based guess is used.
+
+    Args:
+        request: FastAPI request object
+        interactive: Endpoint's guess (True for small preview-sized jobs)
+
+    Returns:
+        str: INTERACTIVE or BATCH
+
+    Raises:
+        HTTPException: If X-Priority has an unknown value
+    """
+    header = request.headers.get(PRIORITY_HEADER)
+    if header:
+        priority = header.strip().lower()
+        if priority not in PRIORITY_WEIGHTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{PRIORITY_HEADER} 无效，必须为 {list(PRIORITY_WEIGHTS.keys())} 之一"
+            )
+        return priority
+    return INTERACTIVE if interactive else BATCH
+
+
+def _parse_tenant_weights(value: str) -> Dict[str, float]:
+    """Parse 'tenant_a=2,tenant_b=0.5' into a weights dict."""
+    weights = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        tenant, weight = item.split("=", 1)
+        try:
+            weights[tenant.strip()] = float(weight)
+        except ValueError:
+            continue
+    return weights
+
+
+scheduler = FairScheduler(
+    max_workers=int(os.getenv("SCHEDULER_MAX_WORKERS", "4")),
+    tenant_max_running=int(os.getenv("SCHEDULER_TENANT_MAX_RUNNING", "2")),
+    tenant_weights=_parse_tenant_weights(os.getenv("SCHEDULER_TENANT_WEIGHTS", "")),
+)
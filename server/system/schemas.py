@@ -0,0 +1,76 @@
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+
+
+class LivenessResponse(BaseModel):
+    """Liveness probe response model"""
+    alive: bool = Field(..., description="Whether the process is responsive")
+    event_loop_lag: Dict[str, Any] = Field(..., description="Recent event-loop lag measurements")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "alive": True,
+                "event_loop_lag": {"running": True, "current_seconds": 0.0012, "max_seconds": 0.0153}
+            }
+        }
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe response model"""
+    ready: bool = Field(..., description="Whether this replica should receive new heavy jobs")
+    status: str = Field(..., description="'ok' when ready, otherwise 'not_ready'")
+    reasons: List[str] = Field(default_factory=list, description="Why the replica is not ready")
+    binaries: Dict[str, Optional[str]] = Field(..., description="External binaries detected at startup (None if missing)")
+    system: Dict[str, Any] = Field(..., description="Current CPU, memory and scratch disk usage")
+    disks: Dict[str, Dict[str, Any]] = Field(..., description="Free space on scratch locations")
+    admission: List[Dict[str, Any]] = Field(..., description="Running/queued jobs vs capacity per heavy endpoint")
+    scheduler: Dict[str, Any] = Field(default_factory=dict, description="Fair-share scheduler workers and queue depth")
+    circuits: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="Provider circuit breaker states")
+    event_loop_lag: Dict[str, Any] = Field(..., description="Recent event-loop lag measurements")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "ready": True,
+                "status": "ok",
+                "reasons": [],
+                "binaries": {
+                    "ffmpeg": "/usr/bin/ffmpeg",
+                    "ffprobe": "/usr/bin/ffprobe",
+                    "soffice": "/usr/bin/soffice"
+                },
+                "system": {
+                    "cpu_percent": 35.2,
+                    "memory_percent": 41.0,
+                    "disk_free_mb": 20480,
+                    "disk_path": "uploads"
+                },
+                "disks": {
+                    "uploads": {"path": "uploads", "free_mb": 20480, "ok": True},
+                    "temp": {"path": "/tmp", "free_mb": 8192, "ok": True}
+                },
+                "admission": [
+                    {
+                        "name": "video",
+                        "running": 1,
+                        "max_running": 2,
+                        "queued": 0,
+                        "max_queued": 4,
+                        "admitted_total": 12,
+                        "rejected_total": 0,
+                        "avg_job_seconds": 48.3,
+                        "saturated": False
+                    }
+                ],
+                "scheduler": {
+                    "max_workers": 4,
+                    "tenant_max_running": 2,
+                    "running": 3,
+                    "queued": {"interactive": 0, "batch": 5},
+                    "active_tenants": 2
+                },
+                "circuits": {},
+                "event_loop_lag": {"running": True, "current_seconds": 0.0012, "max_seconds": 0.0153}
+            }
+        }
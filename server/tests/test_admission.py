@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from system import admission
+from system.admission import AdmissionController
+
+
+def _load(cpu=10.0, memory=10.0, disk_free_mb=100000):
+    return {"cpu_percent": cpu, "memory_percent": memory, "disk_free_mb": disk_free_mb, "disk_path": "uploads"}
+
+
+@pytest.fixture
+def system_load(monkeypatch):
+    load = _load()
+    monkeypatch.setattr(admission, "get_system_load", lambda: load)
+    return load
+
+
+def test_full_queue_is_rejected_with_retry_after(system_load):
+    controller = AdmissionController("test", max_running=1, max_queued=0, queue_timeout=1.0)
+
+    async def main():
+        async with controller.admit():
+            async with controller.admit():
+                pass
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.status_code == 429
+    assert int(excinfo.value.headers["Retry-After"]) >= 1
+    assert controller.running == 0 and controller.rejected_total == 1
+
+
+def test_queued_job_starts_when_a_slot_frees(system_load):
+    controller = AdmissionController("test", max_running=1, max_queued=1, queue_timeout=5.0)
+    order = []
+
+    async def job(name, seconds):
+        async with controller.admit():
+            order.append(name)
+            await asyncio.sleep(seconds)
+
+    async def main():
+        await asyncio.gather(job("first", 0.3), job("second", 0))
+
+    asyncio.run(main())
+    assert order == ["first", "second"]
+    assert controller.running == 0 and controller.queued == 0
+
+
+def test_queue_timeout_is_rejected(system_load):
+    controller = AdmissionController("test", max_running=1, max_queued=1, queue_timeout=0.3)
+
+    async def main():
+        async with controller.admit():
+            async with controller.admit():
+                pass
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.status_code == 429
+    assert controller.queued == 0
+
+
+def test_busy_cpu_does_not_block_the_first_job(system_load):
+    system_load.update(cpu_percent=99.0)
+    controller = AdmissionController("test", max_running=4, max_queued=1, queue_timeout=0.3)
+
+    async def main():
+        async with controller.admit():
+            # A second job on a saturated CPU waits and times out
+            async with controller.admit():
+                pass
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main())
+    assert "cpu" in excinfo.value.detail
+    assert controller.admitted_total == 1
+
+
+def test_memory_pressure_blocks_even_an_idle_controller(system_load):
+    system_load.update(memory_percent=99.0)
+    controller = AdmissionController("test", max_running=4, max_queued=1, queue_timeout=0.3)
+
+    async def main():
+        async with controller.admit():
+            pass
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main())
+    assert "memory" in excinfo.value.detail
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import HTTPException, Response
+
+from system.idempotency import REPLAYED_HEADER, IdempotencyStore
+
+
+def _store(tmp_path, stale_after=60.0, wait_timeout=60.0) -> IdempotencyStore:
+    return IdempotencyStore(tmp_path, ttl=3600, stale_after=stale_after, wait_timeout=wait_timeout)
+
+
+class _Counter:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"n": self.calls}
+
+
+def test_keyed_result_is_replayed(tmp_path):
+    store = _store(tmp_path)
+    compute = _Counter()
+    response = Response()
+
+    async def main():
+        first = await store.run("test", "key-1", {"a": 1}, compute)
+        second = await store.run("test", "key-1", {"a": 1}, compute, response=response)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == {"n": 1}
+    assert compute.calls == 1
+    assert response.headers[REPLAYED_HEADER] == "true"
+
+
+def test_keyed_reuse_with_different_body_is_rejected(tmp_path):
+    store = _store(tmp_path)
+
+    async def main():
+        await store.run("test", "key-1", {"a": 1}, _Counter())
+        await store.run("test", "key-1", {"a": 2}, _Counter())
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.status_code == 422
+
+
+def test_keyless_requests_only_share_the_in_flight_job(tmp_path):
+    store = _store(tmp_path)
+    compute = _Counter(delay=0.1)
+
+    async def main():
+        concurrent = await asyncio.gather(*(store.run("test", None, {"a": 1}, compute) for _ in range(5)))
+        later = await store.run("test", None, {"a": 1}, compute)
+        return concurrent, later
+
+    concurrent, later = asyncio.run(main())
+    assert concurrent == [{"n": 1}] * 5
+    # Nothing is stored, so a later identical request computes again
+    assert later == {"n": 2}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failures_are_not_stored(tmp_path):
+    store = _store(tmp_path)
+    calls = []
+
+    async def flaky():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("provider down")
+        return {"ok": True}
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await store.run("test", "key-1", {}, flaky)
+        return await store.run("test", "key-1", {}, flaky)
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert len(calls) == 2
+
+
+def test_duplicate_recomputes_when_owner_is_cancelled(tmp_path):
+    store = _store(tmp_path)
+    compute = _Counter(delay=0.2)
+
+    async def main():
+        owner = asyncio.ensure_future(store.run("test", "key-1", {}, compute))
+        await asyncio.sleep(0.05)
+        duplicate = asyncio.ensure_future(store.run("test", "key-1", {}, compute))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        return await duplicate
+
+    assert asyncio.run(main()) == {"n": 2}
+    assert not list(tmp_path.glob("*.lock"))
+
+
+def test_running_job_refreshes_its_claim_lock(tmp_path):
+    store = _store(tmp_path, stale_after=0.3)
+    other_replica = _store(tmp_path, stale_after=0.3)
+    key, _ = store._resolve_key("test", "key-1", {})
+
+    async def main():
+        job = asyncio.ensure_future(store.run("test", "key-1", {}, _Counter(delay=0.8)))
+        await asyncio.sleep(0.6)
+        # Older than stale_after since creation, but the heartbeat keeps it fresh
+        assert not other_replica._try_claim(key)
+        return await job
+
+    assert asyncio.run(main()) == {"n": 1}
+
+
+def test_abandoned_claim_is_taken_over(tmp_path):
+    store = _store(tmp_path, stale_after=1.0)
+    key, _ = store._resolve_key("test", "key-1", {})
+    lock_path = store._lock_path(key)
+    lock_path.write_text("12345")
+    abandoned_at = time.time() - 5
+    os.utime(lock_path, (abandoned_at, abandoned_at))
+
+    assert asyncio.run(store.run("test", "key-1", {}, _Counter())) == {"n": 1}
+
+
+def test_wait_for_other_replica_has_a_deadline(tmp_path):
+    store = _store(tmp_path, wait_timeout=0.0)
+    key, _ = store._resolve_key("test", "key-1", {})
+    # Fresh lock held by another replica
+    store._lock_path(key).write_text("12345")
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(store.run("test", "key-1", {}, _Counter()))
+    assert excinfo.value.status_code == 409
+    assert "Retry-After" in excinfo.value.headers
@@ -0,0 +1,83 @@
+import os
+import time
+
+from virtual.cache import LipsyncResultCache, file_sha256, link_or_copy
+
+
+def _render(tmp_path, name, size=100):
+    output_dir = tmp_path / "videos"
+    output_dir.mkdir(exist_ok=True)
+    path = output_dir / f"{name}.mp4"
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def _key(text, **params):
+    return LipsyncResultCache.make_key(text, "0" * 64, gender=1, fps=25, **params)
+
+
+def test_key_depends_on_text_audio_and_params():
+    assert _key("hello") == _key("hello")
+    assert _key("hello") != _key("hello", resolution=384)
+    assert _key("hello") != LipsyncResultCache.make_key("hello", "1" * 64, gender=1, fps=25)
+
+
+def test_file_sha256_hashes_content(tmp_path):
+    a = _render(tmp_path, "a")
+    b = tmp_path / "b.mp4"
+    link_or_copy(a, b)
+    assert file_sha256(a) == file_sha256(b)
+
+
+def test_put_keeps_the_rendered_video(tmp_path):
+    cache = LipsyncResultCache(tmp_path / "cache", max_entries=10, max_bytes=10 ** 9)
+    video = _render(tmp_path, "a")
+    cached = cache.put(_key("a"), video)
+    assert video.exists() and cached.exists()
+    assert cache.get(_key("a")) == cached
+
+
+def test_checkout_links_to_a_new_file(tmp_path):
+    cache = LipsyncResultCache(tmp_path / "cache", max_entries=10, max_bytes=10 ** 9)
+    video = _render(tmp_path, "a")
+    cache.put(_key("a"), video)
+
+    target = tmp_path / "videos" / "hit.mp4"
+    assert cache.checkout(_key("a"), target) == target
+    assert target.read_bytes() == video.read_bytes()
+    assert cache.checkout(_key("missing"), tmp_path / "videos" / "miss.mp4") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_eviction_never_removes_videos_handed_out(tmp_path):
+    cache = LipsyncResultCache(tmp_path / "cache", max_entries=1, max_bytes=10 ** 9)
+    first = _render(tmp_path, "a")
+    cache.put(_key("a"), first)
+    target = tmp_path / "videos" / "hit.mp4"
+    cache.checkout(_key("a"), target)
+
+    cache.put(_key("b"), _render(tmp_path, "b"))
+    assert cache.get(_key("a")) is None
+    assert first.exists() and target.exists()
+
+
+def test_least_recently_used_video_is_evicted_first(tmp_path):
+    cache = LipsyncResultCache(tmp_path / "cache", max_entries=2, max_bytes=10 ** 9)
+    cache.put(_key("a"), _render(tmp_path, "a"))
+    cache.put(_key("b"), _render(tmp_path, "b"))
+    for key, accessed_at in ((_key("a"), time.time() - 20), (_key("b"), time.time() - 10)):
+        os.utime(cache.path_for(key), (accessed_at, accessed_at))
+    assert cache.get(_key("a")) is not None
+
+    cache.put(_key("c"), _render(tmp_path, "c"))
+    assert cache.get(_key("a")) is not None
+    assert cache.get(_key("b")) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_limit_is_enforced(tmp_path):
+    cache = LipsyncResultCache(tmp_path / "cache", max_entries=10, max_bytes=2500)
+    for name in "abc":
+        cache.put(_key(name), _render(tmp_path, name, size=1000))
+    assert cache.stats()["bytes"] <= 2500
+    assert cache.stats()["entries"] == 2
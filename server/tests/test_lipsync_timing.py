@@ -0,0 +1,34 @@
+from virtual.renderer import compress_vis_seq, frames_per_char, plan_timing, spans_total_frames
+
+
+def test_compress_keeps_the_frame_count():
+    spans = compress_vis_seq([1, 1, 2, 3, 3, 3], frames_per_vis=2)
+    assert spans == [(1, 4), (2, 2), (3, 6)]
+    assert spans_total_frames(spans) == 12
+    assert frames_per_char(0.01, 25) == 1
+
+
+def test_pad_extends_the_last_viseme():
+    spans = [(1, 10), (2, 5)]
+    assert plan_timing(spans, 25, 1.0) == [(1, 10), (2, 15)]
+
+
+def test_pad_cuts_at_the_audio_end():
+    spans = [(1, 10), (2, 10), (3, 10)]
+    assert plan_timing(spans, 25, 0.6) == [(1, 10), (2, 5)]
+
+
+def test_scale_fills_the_audio_in_proportion():
+    spans = [(1, 10), (2, 30)]
+    planned = plan_timing(spans, 25, 3.0, mode='scale')
+    assert spans_total_frames(planned) == 75
+    assert [vis for vis, _ in planned] == [1, 2]
+    assert planned[1][1] > planned[0][1] * 2
+
+
+def test_scale_keeps_every_viseme_and_falls_back_to_pad():
+    spans = [(vis, 10) for vis in range(5)]
+    planned = plan_timing(spans, 25, 0.2, mode='scale')
+    assert planned == [(vis, 1) for vis in range(5)]
+    # Fewer frames than visemes: truncated like pad
+    assert plan_timing(spans, 25, 0.1, mode='scale') == [(0, 3)]
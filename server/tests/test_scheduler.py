@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from system.scheduler import BATCH, INTERACTIVE, FairScheduler, _parse_tenant_weights, get_priority, get_tenant
+
+
+def _run_in_order(scheduler: FairScheduler, submissions):
+    """Hold the single worker, queue every (tenant, priority, cost) job, then return the order they ran in."""
+    gate = threading.Event()
+    order = []
+    scheduler.submit(gate.wait, tenant="blocker")
+    # Let the worker pick up the blocker before the real jobs are queued
+    time.sleep(0.05)
+    futures = [
+        scheduler.submit(order.append, name, tenant=tenant, priority=priority, cost=cost)
+        for name, tenant, priority, cost in submissions
+    ]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    return order
+
+
+def test_tenants_share_the_workers_fairly():
+    scheduler = FairScheduler(max_workers=1, tenant_max_running=1)
+    submissions = [(f"a{i}", "a", INTERACTIVE, 1.0) for i in range(6)]
+    submissions += [(f"b{i}", "b", INTERACTIVE, 1.0) for i in range(2)]
+    order = _run_in_order(scheduler, submissions)
+    # The big tenant queued first, but the small one is served in turn
+    assert order[:4] == ["a0", "b0", "a1", "b1"]
+
+
+def test_tenant_weights_scale_the_share():
+    scheduler = FairScheduler(max_workers=1, tenant_max_running=1, tenant_weights={"gold": 2.0})
+    submissions = [(f"s{i}", "silver", INTERACTIVE, 1.0) for i in range(4)]
+    submissions += [(f"g{i}", "gold", INTERACTIVE, 1.0) for i in range(4)]
+    order = _run_in_order(scheduler, submissions)
+    # Twice the weight: all four gold jobs run within the first six
+    assert sum(name.startswith("g") for name in order[:6]) == 4
+
+
+def test_larger_jobs_use_more_of_the_share():
+    scheduler = FairScheduler(max_workers=1, tenant_max_running=1)
+    submissions = [("big", "a", INTERACTIVE, 4.0), ("a-next", "a", INTERACTIVE, 1.0)]
+    submissions += [(f"b{i}", "b", INTERACTIVE, 1.0) for i in range(4)]
+    order = _run_in_order(scheduler, submissions)
+    assert order.index("a-next") > order.index("b2")
+
+
+def test_interactive_work_gets_most_of_the_workers():
+    scheduler = FairScheduler(max_workers=1, tenant_max_running=1)
+    submissions = [(f"batch{i}", f"t{i}", BATCH, 1.0) for i in range(10)]
+    submissions += [(f"live{i}", f"u{i}", INTERACTIVE, 1.0) for i in range(8)]
+    order = _run_in_order(scheduler, submissions)
+    # 4:1 split while both classes have work waiting
+    assert sum(name.startswith("live") for name in order[:10]) == 8
+
+
+def test_tenant_concurrency_cap():
+    scheduler = FairScheduler(max_workers=3, tenant_max_running=1)
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def job():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+
+    futures = [scheduler.submit(job, tenant="a") for _ in range(4)]
+    for future in futures:
+        future.result(timeout=5)
+    assert running["peak"] == 1
+
+
+def test_errors_reach_the_caller():
+    scheduler = FairScheduler(max_workers=1, tenant_max_running=1)
+
+    def fail():
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        scheduler.submit(fail).result(timeout=5)
+    assert scheduler.submit(lambda: 42).result(timeout=5) == 42
+
+
+def _request(headers=None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "headers": raw, "client": ("10.0.0.1", 1234)})
+
+
+def test_tenant_and_priority_from_headers():
+    assert get_tenant(_request({"X-Tenant-ID": "acme", "X-Session-ID": "s1"})) == "acme"
+    assert get_tenant(_request({"X-Session-ID": "s1"})) == "s1"
+    assert get_tenant(_request()) == "10.0.0.1"
+    assert get_priority(_request({"X-Priority": "Batch"}), interactive=True) == BATCH
+    assert get_priority(_request(), interactive=True) == INTERACTIVE
+    with pytest.raises(HTTPException):
+        get_priority(_request({"X-Priority": "urgent"}), interactive=True)
+
+
+def test_parse_tenant_weights_skips_bad_items():
+    assert _parse_tenant_weights("a=2, b=0.5,bad,c=x") == {"a": 2.0, "b": 0.5}
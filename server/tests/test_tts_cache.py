@@ -0,0 +1,101 @@
+import os
+import time
+from pathlib import Path
+
+from tts.cache import TTSAudioCache
+
+
+def _cache(tmp_path, max_entries=10, max_bytes=10 ** 9, ttl=3600.0) -> TTSAudioCache:
+    return TTSAudioCache(tmp_path / "cache", max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+
+
+def _generated(tmp_path, name: str, size: int = 100):
+    output_dir = tmp_path / "tts"
+    output_dir.mkdir(exist_ok=True)
+    audio = output_dir / f"{name}.mp3"
+    audio.write_bytes(b"\xff" * size)
+    subtitle = output_dir / f"{name}.srt"
+    subtitle.write_text("1\n00:00:00,000 --> 00:00:01,000\nhi\n", encoding="utf-8")
+    return audio, subtitle
+
+
+def _key(text: str) -> str:
+    return TTSAudioCache.make_key("openai", "coral", None, None, text, "local")
+
+
+def test_key_depends_on_every_input():
+    assert _key("hello") == _key("hello")
+    assert _key("hello") != _key("hello!")
+    assert _key("hello") != TTSAudioCache.make_key("openai", "coral", None, None, "hello", "whisper")
+
+
+def test_put_keeps_the_generated_files(tmp_path):
+    cache = _cache(tmp_path)
+    audio, subtitle = _generated(tmp_path, "a")
+    meta = cache.put(_key("a"), audio, subtitle, 1.5)
+    assert audio.exists() and subtitle.exists()
+    assert Path(meta["audio_path"]).parent == cache.directory
+    assert cache.get(_key("a"))["duration"] == 1.5
+
+
+def test_checkout_gives_each_request_its_own_files(tmp_path):
+    cache = _cache(tmp_path)
+    audio, subtitle = _generated(tmp_path, "a")
+    cache.put(_key("a"), audio, subtitle, 1.5)
+
+    target = tmp_path / "tts" / "hit.mp3"
+    meta = cache.checkout(_key("a"), target, target.with_suffix(".srt"))
+    assert meta["audio_path"] == str(target)
+    assert target.read_bytes() == audio.read_bytes()
+    assert cache.checkout(_key("missing"), tmp_path / "x.mp3", tmp_path / "x.srt") is None
+    assert not (tmp_path / "x.mp3").exists()
+
+
+def test_eviction_never_removes_files_handed_out(tmp_path):
+    cache = _cache(tmp_path, max_entries=1)
+    audio, subtitle = _generated(tmp_path, "a")
+    cache.put(_key("a"), audio, subtitle, 1.0)
+    target = tmp_path / "tts" / "hit.mp3"
+    cache.checkout(_key("a"), target, target.with_suffix(".srt"))
+
+    cache.put(_key("b"), *_generated(tmp_path, "b"), 1.0)
+    assert cache.get(_key("a")) is None
+    assert audio.exists() and target.exists() and target.with_suffix(".srt").exists()
+    assert cache.stats()["evictions"] == 1
+
+
+def test_least_recently_used_entry_is_evicted_first(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put(_key("a"), *_generated(tmp_path, "a"), 1.0)
+    cache.put(_key("b"), *_generated(tmp_path, "b"), 1.0)
+    # Make "a" the older entry, then touch it so "b" is least recently used
+    for key, accessed_at in ((_key("a"), time.time() - 20), (_key("b"), time.time() - 10)):
+        os.utime(cache._path(key, ".json"), (accessed_at, accessed_at))
+    assert cache.get(_key("a")) is not None
+
+    cache.put(_key("c"), *_generated(tmp_path, "c"), 1.0)
+    assert cache.get(_key("a")) is not None
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("c")) is not None
+
+
+def test_size_limit_is_enforced(tmp_path):
+    cache = _cache(tmp_path, max_bytes=2500)
+    for name in "abc":
+        cache.put(_key(name), *_generated(tmp_path, name, size=1000), 1.0)
+    assert cache.stats()["bytes"] <= 2500
+    assert cache.get(_key("c")) is not None
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = _cache(tmp_path, ttl=0.0)
+    cache.put(_key("a"), *_generated(tmp_path, "a"), 1.0)
+    time.sleep(0.01)
+    assert cache.get(_key("a")) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disabled_cache_never_hits(tmp_path):
+    cache = TTSAudioCache(tmp_path / "cache", 10, 10 ** 9, 3600, enabled=False)
+    cache.put(_key("a"), *_generated(tmp_path, "a"), 1.0)
+    assert cache.get(_key("a")) is None
@@ -0,0 +1,35 @@
+import re
+
+from tts.chunking import split_text
+
+
+MIXED = "这是第一句话。Hello world, this is a test! 第二段，包含逗号；\n\n  Another sentence here? 混合 mixed 文本。  " * 40
+
+
+def _without_whitespace(text: str) -> str:
+    return re.sub(r"\s", "", text)
+
+
+def test_chunks_keep_all_text_except_blank_runs():
+    chunks = split_text(MIXED, concurrency=4, max_chars=1500, min_chars=300)
+    assert _without_whitespace("".join(chunks)) == _without_whitespace(MIXED)
+    assert all(chunk.strip() for chunk in chunks)
+
+
+def test_chunks_fit_one_wave_within_the_size_limit():
+    chunks = split_text(MIXED, concurrency=4, max_chars=1500, min_chars=300)
+    assert 1 < len(chunks) <= 4
+    assert all(len(chunk) <= 1500 for chunk in chunks)
+
+
+def test_chunks_end_at_sentence_boundaries():
+    chunks = split_text(MIXED, concurrency=4, max_chars=1500, min_chars=300)
+    for chunk in chunks[:-1]:
+        assert chunk.rstrip()[-1] in "。！？.!?；;"
+
+
+def test_sentence_longer_than_a_chunk_is_cut():
+    text = "很长的句子没有任何标点" * 100
+    chunks = split_text(text, concurrency=4, max_chars=200, min_chars=50)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 200 for chunk in chunks)
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+from openai import AsyncOpenAI
+
+from system.health import EventLoopLagMonitor
+from tts.providers import OpenAITTSProvider, TTSProvider
+
+
+# Simulated upstream latency per call; a provider that blocks the loop shows lag close to this
+UPSTREAM_LATENCY = 0.3
+CONCURRENCY = 16
+MAX_LAG = 0.1
+PROBE_INTERVAL = 0.01
+
+SRT = "1\n00:00:00,000 --> 00:00:01,500\nHello world\n"
+
+
+async def _stub_upstream(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(UPSTREAM_LATENCY)
+    if request.url.path.endswith("/audio/speech"):
+        return httpx.Response(200, content=b"\xff\xfb" * 8192, headers={"content-type": "audio/mpeg"})
+    if request.url.path.endswith("/audio/transcriptions"):
+        return httpx.Response(200, text=SRT, headers={"content-type": "text/plain"})
+    return httpx.Response(404)
+
+
+def _stub_provider() -> OpenAITTSProvider:
+    provider = OpenAITTSProvider(api_key="test", base_url="http://stub.test/v1")
+    provider.client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://stub.test/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(_stub_upstream)),
+        max_retries=0,
+    )
+    return provider
+
+
+class _BlockingProvider(TTSProvider):
+    """Calls the upstream synchronously, the mistake the check must catch"""
+
+    async def synthesize(self, text, voice, output_path, **kwargs):
+        time.sleep(UPSTREAM_LATENCY)
+        Path(output_path).write_bytes(b"\xff\xfb")
+        return output_path
+
+    async def transcribe(self, audio_path, response_format="srt"):
+        time.sleep(UPSTREAM_LATENCY)
+        return SRT
+
+
+async def _max_lag(provider: TTSProvider, output_dir: Path, concurrency: int = CONCURRENCY) -> float:
+    """Run concurrent synthesize + transcribe calls and return the worst event-loop lag seen meanwhile."""
+    async def _one(index: int):
+        audio_path = await provider.synthesize(
+            text=f"Sentence {index}.", voice="coral", output_path=output_dir / f"speech_{index}.mp3"
+        )
+        transcript = await provider.transcribe(audio_path, response_format="srt")
+        assert "-->" in transcript
+
+    monitor = EventLoopLagMonitor(interval=PROBE_INTERVAL, window=100000)
+    monitor.start()
+    try:
+        await asyncio.gather(*(_one(i) for i in range(concurrency)))
+        # Let the probe that was sleeping through the calls record its sample
+        await asyncio.sleep(PROBE_INTERVAL * 2)
+    finally:
+        await monitor.stop()
+        await provider.aclose()
+    assert monitor.samples, "event-loop probe never ran"
+    return max(monitor.samples)
+
+
+def test_openai_provider_does_not_block_event_loop(tmp_path):
+    lag = asyncio.run(_max_lag(_stub_provider(), tmp_path))
+    assert lag < MAX_LAG, f"event loop lagged {lag:.3f}s during concurrent TTS calls"
+
+
+def test_lag_check_detects_blocking_provider(tmp_path):
+    lag = asyncio.run(_max_lag(_BlockingProvider(), tmp_path, concurrency=2))
+    assert lag >= MAX_LAG
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from tts.ratelimit import ProviderRateLimiter, TokenBucket, estimate_tokens
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    assert estimate_tokens(None) == 0
+    assert estimate_tokens("你好世界") == 4
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("你好abcd") == 3
+
+
+def test_bucket_goes_into_debt_and_reports_the_wait():
+    bucket = TokenBucket(per_minute=60, burst_seconds=1)
+    now = time.monotonic()
+    assert bucket.reserve(1, now) == 0.0
+    assert abs(bucket.reserve(1, now) - 1.0) < 1e-6
+    assert abs(bucket.reserve(1, now) - 2.0) < 1e-6
+
+
+def test_released_reservation_is_available_again():
+    bucket = TokenBucket(per_minute=60, burst_seconds=1)
+    now = time.monotonic()
+    bucket.reserve(1, now)
+    bucket.reserve(1, now)
+    bucket.release(1, now)
+    assert abs(bucket.reserve(1, now) - 1.0) < 1e-6
+
+
+def test_release_never_exceeds_capacity():
+    bucket = TokenBucket(per_minute=60, burst_seconds=1)
+    now = time.monotonic()
+    bucket.release(5, now)
+    assert bucket.tokens == bucket.capacity
+
+
+def test_calls_are_spread_to_the_rate():
+    limiter = ProviderRateLimiter(rpm=600, tpm=0)
+
+    async def main():
+        started_at = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(12)))
+        return time.monotonic() - started_at
+
+    # A burst of one second of budget (10 calls), then one call every 0.1s
+    assert 0.15 <= asyncio.run(main()) < 0.5
+    stats = limiter.stats()
+    assert stats["calls"] == 12 and stats["delayed"] == 2
+
+
+def test_cancelled_caller_returns_its_reservation():
+    limiter = ProviderRateLimiter(rpm=60, tpm=600)
+
+    async def main():
+        await limiter.acquire(10)
+        waiting = [asyncio.ensure_future(limiter.acquire(10)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        started_at = time.monotonic()
+        await limiter.acquire(10)
+        return time.monotonic() - started_at
+
+    # Without the returned reservations the next caller would wait about 6s
+    assert asyncio.run(main()) < 1.5
+    stats = limiter.stats()
+    assert stats["calls"] == 2 and stats["delayed"] == 1
+
+
+def test_pause_holds_back_every_caller():
+    limiter = ProviderRateLimiter(rpm=0, tpm=0)
+    limiter.pause(0.2)
+
+    async def main():
+        started_at = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(main()) >= 0.15
+    assert limiter.stats()["throttled"] == 1
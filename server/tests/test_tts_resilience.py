@@ -0,0 +1,146 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from tts import resilience
+from tts.providers import TTSProvider
+from tts.resilience import CircuitBreaker, CircuitOpenError, HedgeDeadlines, ResilientProvider, backoff_delay
+
+
+class _ProviderError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+class _FakeProvider(TTSProvider):
+    """Fails the first `failures` calls with `status`; call i sleeps latencies[i] first"""
+
+    def __init__(self, failures: int = 0, status: int = 503, latencies=()):
+        self.failures = failures
+        self.status = status
+        self.latencies = list(latencies)
+        self.calls = 0
+
+    async def synthesize(self, text, voice, output_path, **kwargs):
+        self.calls += 1
+        call = self.calls
+        if call <= len(self.latencies):
+            await asyncio.sleep(self.latencies[call - 1])
+        if call <= self.failures:
+            raise _ProviderError(self.status)
+        Path(output_path).write_text(f"call {call}")
+        return output_path
+
+    async def transcribe(self, audio_path, response_format="srt"):
+        return "1\n00:00:00,000 --> 00:00:01,000\nhi\n"
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(resilience, "RETRY_MAX_DELAY", 0.02)
+
+
+def _resilient(provider, **kwargs) -> ResilientProvider:
+    kwargs.setdefault("hedging", False)
+    return ResilientProvider(provider, "fake", **kwargs)
+
+
+def test_backoff_honours_retry_after():
+    assert 0 <= backoff_delay(3, _ProviderError(503)) <= 0.02
+    assert backoff_delay(0, _ProviderError(429, {"retry-after": "2"})) == 2.0
+    assert backoff_delay(0, _ProviderError(429, {"retry-after-ms": "1500"})) == 1.5
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker("fake", failure_threshold=2, reset_timeout=0.1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.state()["state"] == "open"
+
+    time.sleep(0.15)
+    breaker.before_call()
+    # Only one probe while half-open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state()["state"] == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker("fake", failure_threshold=1, reset_timeout=0.1)
+    breaker.record_failure()
+    time.sleep(0.15)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state()["state"] == "open"
+    assert breaker.state()["opened_total"] == 2
+
+
+def test_transient_errors_are_retried(tmp_path):
+    provider = _FakeProvider(failures=2)
+    resilient = _resilient(provider, max_attempts=3)
+    output = asyncio.run(resilient.synthesize("hello", "coral", tmp_path / "out.mp3"))
+    assert output.read_text() == "call 3"
+    assert resilient.stats()["retries"] == 2
+    assert not list(tmp_path.glob(".*.part"))
+
+
+def test_client_errors_are_not_retried(tmp_path):
+    provider = _FakeProvider(failures=1, status=400)
+    resilient = _resilient(provider, max_attempts=3)
+    with pytest.raises(_ProviderError):
+        asyncio.run(resilient.synthesize("hello", "coral", tmp_path / "out.mp3"))
+    assert provider.calls == 1
+    # The provider answered, so its circuit stays closed
+    assert resilient.breaker.state()["consecutive_failures"] == 0
+
+
+def test_open_circuit_fails_fast(tmp_path):
+    provider = _FakeProvider(failures=100)
+    resilient = _resilient(provider, max_attempts=1, breaker=CircuitBreaker("fake", failure_threshold=2))
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(_ProviderError):
+                await resilient.synthesize("hello", "coral", tmp_path / "out.mp3")
+        with pytest.raises(CircuitOpenError):
+            await resilient.synthesize("hello", "coral", tmp_path / "out.mp3")
+
+    asyncio.run(main())
+    assert provider.calls == 2
+
+
+def test_hedge_deadline_needs_samples():
+    deadlines = HedgeDeadlines(percentile=90, min_delay=0.01, min_samples=10)
+    for i in range(9):
+        deadlines.record("synthesize", 100, 0.1)
+    assert deadlines.deadline("synthesize", 100) is None
+    deadlines.record("synthesize", 100, 1.0)
+    assert deadlines.deadline("synthesize", 100) == 1.0
+    # Other size classes have their own samples
+    assert deadlines.deadline("synthesize", 5000) is None
+
+
+def test_slow_call_is_hedged(tmp_path):
+    provider = _FakeProvider(latencies=[2.0, 0.0])
+    resilient = _resilient(provider, hedging=True)
+    resilient.deadlines = HedgeDeadlines(percentile=95, min_delay=0.05, min_samples=5)
+    for _ in range(5):
+        resilient.deadlines.record("synthesize", len("hello"), 0.05)
+
+    started_at = time.monotonic()
+    output = asyncio.run(resilient.synthesize("hello", "coral", tmp_path / "out.mp3"))
+    assert time.monotonic() - started_at < 1.0
+    assert output.read_text() == "call 2"
+    stats = resilient.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert not list(tmp_path.glob(".*.part"))
@@ -0,0 +1,148 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from tts import resilience, routing
+from tts.providers import TTSProvider
+from tts.routing import RouteBackend, RoutedProvider, parse_routes
+
+
+class _ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _Backend(TTSProvider):
+    """Answers after `latency`, or fails with `status` while it is set; records the voices it was asked for"""
+
+    def __init__(self, latency: float = 0.0, status: int = None):
+        self.latency = latency
+        self.status = status
+        self.voices = []
+
+    async def synthesize(self, text, voice, output_path, **kwargs):
+        self.voices.append(voice)
+        await asyncio.sleep(self.latency)
+        if self.status is not None:
+            raise _ProviderError(self.status)
+        Path(output_path).write_text(voice)
+        return output_path
+
+    async def transcribe(self, audio_path, response_format="srt"):
+        return "srt"
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(resilience, "RETRY_MAX_DELAY", 0.02)
+
+
+def _router(*backends: RouteBackend) -> RoutedProvider:
+    return RoutedProvider("openai", list(backends), explore=0.0)
+
+
+def test_parse_routes():
+    routes = parse_routes(json.dumps({"OpenAI": [
+        {"name": "primary", "api_key": "k1"},
+        {"base_url": "http://backup", "voices": {"coral": "nova"}},
+    ]}))
+    primary, backup = routes["openai"]
+    assert primary == {"name": "primary", "channel": "openai", "credentials": {"api_key": "k1"},
+                       "voices": None, "models": None}
+    assert backup["name"] == "2" and backup["credentials"] == {"base_url": "http://backup"}
+    assert parse_routes("  ") == {}
+
+
+@pytest.mark.parametrize("raw", [
+    "[]",
+    '{"openai": []}',
+    '{"openai": ["primary"]}',
+    '{"openai": [{"name": "a"}, {"name": "a"}]}',
+])
+def test_parse_routes_rejects_malformed_config(raw):
+    with pytest.raises(ValueError):
+        parse_routes(raw)
+
+
+def test_calls_go_to_the_faster_backend(tmp_path):
+    slow, fast = _Backend(latency=0.05), _Backend()
+    router = _router(RouteBackend("slow", slow), RouteBackend("fast", fast))
+    for backend, seconds in zip(router.backends, (0.05, 0.001)):
+        backend.in_flight += 1
+        backend.finish(True, seconds, chars=5)
+
+    async def main():
+        for i in range(5):
+            await router.synthesize("hello", "coral", tmp_path / f"{i}.mp3")
+
+    asyncio.run(main())
+    assert len(fast.voices) == 5 and slow.voices == []
+    assert router.stats()["backends"][1]["calls"] == 6
+
+
+def test_calls_in_flight_spread_the_load(tmp_path):
+    a, b = _Backend(latency=0.05), _Backend(latency=0.05)
+    router = _router(RouteBackend("a", a), RouteBackend("b", b))
+
+    async def main():
+        await asyncio.gather(*(router.synthesize("hello", "coral", tmp_path / f"{i}.mp3") for i in range(4)))
+
+    asyncio.run(main())
+    assert len(a.voices) == len(b.voices) == 2
+
+
+def test_transient_failure_fails_over(tmp_path):
+    broken, healthy = _Backend(status=503), _Backend()
+    router = _router(RouteBackend("broken", broken), RouteBackend("healthy", healthy))
+    # Make the broken backend look best so it is tried first
+    router.backends[0].latency = 0.001
+    router.backends[1].latency = 1.0
+
+    output = asyncio.run(router.synthesize("hello", "coral", tmp_path / "out.mp3"))
+    assert output.read_text() == "coral"
+    assert len(broken.voices) == 1 and len(healthy.voices) == 1
+    stats = router.stats()
+    assert stats["failovers"] == 1
+    assert stats["backends"][0]["errors"] == 1 and stats["backends"][0]["error_rate"] > 0
+
+
+def test_client_errors_do_not_fail_over(tmp_path):
+    rejecting, healthy = _Backend(status=400), _Backend()
+    router = _router(RouteBackend("rejecting", rejecting), RouteBackend("healthy", healthy))
+    router.backends[0].latency = 0.001
+    router.backends[1].latency = 1.0
+
+    with pytest.raises(_ProviderError):
+        asyncio.run(router.synthesize("hello", "coral", tmp_path / "out.mp3"))
+    assert healthy.voices == []
+
+
+def test_voices_are_translated_and_restricted(tmp_path):
+    general, mapped = _Backend(), _Backend()
+    router = _router(RouteBackend("general", general),
+                     RouteBackend("mapped", mapped, voices={"coral": "nova"}))
+    router.backends[0].latency = 1.0
+    router.backends[1].latency = 0.001
+
+    async def main():
+        await router.synthesize("hello", "coral", tmp_path / "a.mp3")
+        # Only the general backend serves voices missing from the map
+        await router.synthesize("hello", "alloy", tmp_path / "b.mp3")
+
+    asyncio.run(main())
+    assert mapped.voices == ["nova"]
+    assert general.voices == ["alloy"]
+
+
+def test_error_rate_decays_while_idle(monkeypatch):
+    backend = RouteBackend("a", _Backend(), alpha=1.0)
+    backend.in_flight = 1
+    backend.finish(False)
+    assert backend.error_rate == pytest.approx(1.0, abs=0.01)
+    monkeypatch.setattr(routing, "ROUTE_ERROR_HALF_LIFE", 0.05)
+    asyncio.run(asyncio.sleep(0.1))
+    assert backend.error_rate < 0.3
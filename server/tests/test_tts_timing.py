@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from tts.timing import ANALYSIS_SAMPLE_RATE, build_cues, detect_silences, split_cues, text_width
+
+
+def _audio(*parts):
+    """Concatenate (seconds, loud) parts into a 16 kHz test signal"""
+    chunks = []
+    for seconds, loud in parts:
+        count = int(seconds * ANALYSIS_SAMPLE_RATE)
+        if loud:
+            t = np.arange(count) / ANALYSIS_SAMPLE_RATE
+            chunks.append((np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16))
+        else:
+            chunks.append(np.zeros(count, dtype=np.int16))
+    return np.concatenate(chunks)
+
+
+def test_cues_fit_the_width():
+    text = "这是一段很长的中文旁白，需要被切成多个字幕，每一条都不能超过最大显示宽度。" * 3
+    cues = split_cues(text, max_width=20)
+    assert len(cues) > 1
+    assert all(text_width(cue) <= 20 for cue in cues)
+    assert "".join(cues) == text
+
+
+def test_cues_cover_the_duration_in_order():
+    cues = build_cues("Hello there. This is a test, with a clause. Bye.", 6.0, max_width=20)
+    assert cues[0][0] == pytest.approx(0.0) and cues[-1][1] == pytest.approx(6.0)
+    for (_, end, _), (start, _, _) in zip(cues, cues[1:]):
+        assert end <= start + 1e-9
+    assert all(start < end for start, end, _ in cues)
+
+
+def test_empty_text_or_audio_has_no_cues():
+    assert build_cues("", 3.0) == []
+    assert build_cues("Hello.", 0.0) == []
+
+
+def test_detect_silences():
+    samples = _audio((0.3, False), (1.0, True), (0.5, False), (1.0, True))
+    silences = detect_silences(samples, ANALYSIS_SAMPLE_RATE)
+    assert silences[0] == pytest.approx((0.0, 0.3), abs=0.03)
+    assert silences[1] == pytest.approx((1.3, 1.8), abs=0.03)
+
+
+def test_boundaries_snap_to_pauses_and_silence_is_trimmed():
+    # Leading silence, a short sentence, a long pause, a long sentence, trailing silence
+    samples = _audio((0.4, False), (1.0, True), (0.6, False), (3.0, True), (0.4, False))
+    duration = len(samples) / ANALYSIS_SAMPLE_RATE
+    cues = build_cues("Short one. This second sentence is a lot longer.", duration, samples, ANALYSIS_SAMPLE_RATE)
+    assert len(cues) == 2
+    assert cues[0][0] == pytest.approx(0.4, abs=0.03)
+    assert cues[0][1] == pytest.approx(1.4, abs=0.03)
+    assert cues[1][0] == pytest.approx(2.0, abs=0.03)
+    assert cues[1][1] == pytest.approx(5.0, abs=0.03)
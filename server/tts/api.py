@@ -1,12 +1,36 @@
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse
+import asyncio
+import math
+import os
+import re
+import time
+from fastapi import APIRouter, HTTPException, Request, Response, Header
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pathlib import Path
-from openai import OpenAI
-from tts.schemas import TTSRequest, TTSResponse
+from typing import Optional
+import aiofiles
+from tts.schemas import (
+    SubtitleMode,
+    TTSBatchItemResult,
+    TTSBatchRequest,
+    TTSRequest,
+    TTSResponse,
+    TTSStreamStatusResponse
+)
 from tts.providers import TTSProviderFactory
+from tts.registry import provider_registry
+from tts.resilience import CircuitOpenError
+from tts.ratelimit import retry_after_seconds
+from tts.cache import TTSAudioCache
+from tts.chunking import CHUNK_MAX_CHARS, CHUNK_THRESHOLD_CHARS, split_text, synthesize_chunked
+from tts.streaming import COMPLETED, FAILED, FINALIZING, StreamRecordStore
+from tts.timing import DEFAULT_SUBTITLE_MODE, local_subtitles
+from system.admission import tts_admission
+from system.idempotency import idempotency_store
 from tts.utils import (
     get_current_time,
     get_tts_directory,
+    get_tts_cache_directory,
     generate_audio_filename,
     generate_subtitle_filename,
     get_audio_duration,
@@ -18,6 +42,32 @@ router = APIRouter(
     tags=["tts"]
 )
 
+# Content-addressed audio + subtitle cache shared by all replicas
+tts_cache = TTSAudioCache(
+    get_tts_cache_directory(),
+    max_entries=int(os.getenv("TTS_CACHE_MAX_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("TTS_CACHE_MAX_MB", "5120")) * 1024 * 1024,
+    ttl=float(os.getenv("TTS_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+    enabled=os.getenv("TTS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+)
+
+# Items of one batch in flight at the same time; the rate limiter spaces the provider calls
+BATCH_CONCURRENCY = int(os.getenv("TTS_BATCH_CONCURRENCY", "4"))
+# Items of all batches together hold at most half of the TTS admission slots, so batches cannot
+# starve interactive /tts callers
+_batch_slots = asyncio.Semaphore(max(tts_admission.max_running // 2, 1))
+# Attempts per batch item when the service or the provider answers 429
+_BATCH_ATTEMPTS = 4
+# Longest Retry-After a batch item waits before its next attempt
+_BATCH_MAX_RETRY_WAIT = 60.0
+
+# Status records of /tts/stream syntheses (duration and subtitles arrive after the audio)
+stream_records = StreamRecordStore(
+    Path("uploads") / "aividfromppt" / "tts" / "streams",
+    ttl=float(os.getenv("TTS_STREAM_RECORD_TTL_SECONDS", str(24 * 3600))),
+)
+_background_tasks = set()
+
 
 @router.post(
     "/synthesize",
@@ -33,8 +83,13 @@ router = APIRouter(
     The API will return:
     - MP3 audio file URL
     - Audio duration in seconds
+    - SRT subtitle file URL
     - File metadata
     
+    Subtitles (`subtitle_mode`):
+    - local: the request text is split into cues timed from the audio (syllable weights snapped to pauses), no extra API call
+    - whisper: the audio is transcribed by the provider (slower, extra cost)
+    
     Example usage:
     ```json
     {
@@ -45,32 +100,184 @@ router = APIRouter(
         "instructions": "Speak in a cheerful tone."
     }
     ```
+    
+    Idempotency:
+    - Send an `Idempotency-Key` header to make retries safe: a duplicate attaches to the in-flight call
+      or replays the stored result (`Idempotent-Replayed: true`)
+    - Without the header, identical bodies only attach to an in-flight call; results are not replayed
     """
 )
 async def synthesize_speech(
     request: Request,
-    tts_request: TTSRequest
+    response: Response,
+    tts_request: TTSRequest,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")
 ):
     """
     Synthesize speech from text.
     
+    Retries with the same Idempotency-Key attach to the running synthesis or replay
+    its stored result instead of calling the provider again; identical bodies without a key only attach
+    to the running synthesis.
+    
     Args:
         request: FastAPI request object (to get base URL)
+        response: FastAPI response object (to mark replayed results)
         tts_request: TTS request parameters
+        idempotency_key: Optional Idempotency-Key header
     
     Returns:
         TTSResponse: TTS result with audio file URL and metadata
     """
-    try:
-        # Create TTS provider
-        provider = TTSProviderFactory.create_provider(tts_request.channel)
-        
-        # Get output directory and generate filename
-        output_dir = get_tts_directory()
-        filename = generate_audio_filename()
-        output_path = output_dir / filename
-        
-        # Synthesize speech
+    result = await idempotency_store.run(
+        scope="tts.synthesize",
+        idempotency_key=idempotency_key,
+        payload=tts_request.model_dump(mode="json"),
+        compute=lambda: _run_synthesis(request, tts_request),
+        response=response,
+        validate=lambda r: Path(r["file_path"]).exists()
+    )
+    return TTSResponse(**result)
+
+
+def _file_url(request: Request, path: str) -> str:
+    base_url = str(request.base_url).rstrip('/')
+    return f"{base_url}/api/v1/tts/files/{path}"
+
+
+def _build_response(request: Request, tts_request: TTSRequest, audio_path: str, subtitle_path: Optional[str],
+                    duration: float, file_size: int) -> TTSResponse:
+    return TTSResponse(
+        success=True,
+        file_path=audio_path,
+        file_url=_file_url(request, audio_path),
+        duration=duration,
+        file_size=file_size,
+        channel=tts_request.channel,
+        voice=tts_request.voice,
+        subtitle_path=subtitle_path,
+        subtitle_url=_file_url(request, subtitle_path) if subtitle_path else None,
+        oral_broadcast=tts_request.text,
+        created_at=get_current_time(),
+    )
+
+
+def _provider_error(e: Exception) -> HTTPException:
+    """Map a provider or synthesis exception to the HTTP error returned to the client."""
+    if isinstance(e, ValueError):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    if getattr(e, "status_code", None) == 429:
+        retry_after = retry_after_seconds(e) or 5
+        return HTTPException(
+            status_code=429,
+            detail="TTS provider rate limit exceeded, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+    return HTTPException(status_code=500, detail=f"TTS synthesis failed: {str(e)}")
+
+
+def _subtitle_mode(tts_request: TTSRequest) -> SubtitleMode:
+    return tts_request.subtitle_mode or DEFAULT_SUBTITLE_MODE
+
+
+def _content_key(tts_request: TTSRequest):
+    """Fields that determine the audio and subtitles, and the TTS cache key derived from them"""
+    content = {
+        "channel": tts_request.channel.value,
+        "voice": tts_request.voice,
+        "model": tts_request.model,
+        "instructions": tts_request.instructions,
+        "text": tts_request.text,
+        "subtitle_mode": _subtitle_mode(tts_request).value,
+    }
+    return content, TTSAudioCache.make_key(**content)
+
+
+async def _checkout_cached(cache_key: str) -> Optional[dict]:
+    """
+    Give the request its own link (or copy) of a cached entry in the TTS directory.
+    
+    Args:
+        cache_key: TTS cache key of the request
+    
+    Returns:
+        dict: Cache metadata pointing at the per-request files, or None on a miss
+    """
+    if not tts_cache.enabled:
+        return None
+    filename = generate_audio_filename()
+    output_path = get_tts_directory() / filename
+    subtitle_path = output_path.parent / generate_subtitle_filename(filename)
+    return await asyncio.to_thread(tts_cache.checkout, cache_key, output_path, subtitle_path)
+
+
+async def _cached_response(request: Request, tts_request: TTSRequest, cache_key: str) -> Optional[TTSResponse]:
+    cached = await _checkout_cached(cache_key)
+    if cached is None:
+        return None
+    return _build_response(
+        request, tts_request, cached["audio_path"], cached["subtitle_path"], cached["duration"], cached["file_size"]
+    )
+
+
+async def _run_synthesis(request: Request, tts_request: TTSRequest) -> TTSResponse:
+    """
+    Return cached audio and subtitles for the request, or synthesize them once for all identical concurrent requests.
+    
+    Requests with the same cache key (even with different Idempotency-Keys) attach to the in-flight synthesis
+    in this process, or wait for the replica holding the claim lock on the shared volume and then read its
+    result from the TTS cache. Nothing is stored besides the TTS cache, so its TTL and limits apply.
+    
+    Args:
+        request: FastAPI request object (to get base URL)
+        tts_request: TTS request parameters
+    
+    Returns:
+        TTSResponse: TTS result with audio file URL and metadata
+    """
+    content, cache_key = _content_key(tts_request)
+    # Cache hits skip admission, the provider and transcription entirely
+    cached = await _cached_response(request, tts_request, cache_key)
+    if cached is not None:
+        return cached
+
+    async def compute():
+        # The replica that held the claim before this one may have just cached the result
+        return await _cached_response(request, tts_request, cache_key) or await _synthesize(
+            request, tts_request, cache_key
+        )
+
+    # No Idempotency-Key: identical requests only share the in-flight synthesis, no result is stored
+    result = await idempotency_store.run(
+        scope="tts.content",
+        idempotency_key=None,
+        payload=content,
+        compute=compute
+    )
+    return TTSResponse(**result)
+
+
+async def _synthesize_single(provider, tts_request: TTSRequest, output_path: Path, subtitle_output_path: Path):
+    """
+    Synthesize the whole text in one provider call, then generate its subtitles.
+    
+    Args:
+        provider: TTS provider
+        tts_request: TTS request parameters
+        output_path: MP3 output path
+        subtitle_output_path: SRT output path
+    
+    Returns:
+        tuple: (duration, file size, subtitle path or None if subtitle generation failed)
+    """
+    # Synthesize speech (the registry's provider schedules it within the account's RPM/TPM budget)
+    async with provider_registry.latency.measure(tts_request.channel, "synthesize"):
         await provider.synthesize(
             text=tts_request.text,
             voice=tts_request.voice,
@@ -78,69 +285,414 @@ async def synthesize_speech(
             model=tts_request.model,
             instructions=tts_request.instructions
         )
+    
+    # Check if file was created
+    if not output_path.exists():
+        raise HTTPException(status_code=500, detail="Failed to generate audio file")
+    
+    # Get audio metadata (mutagen reads the file synchronously)
+    duration = await asyncio.to_thread(get_audio_duration, output_path)
+    file_size = get_file_size(output_path)
+    
+    subtitle_path = await _generate_subtitles(provider, tts_request, output_path, subtitle_output_path, duration)
+    return duration, file_size, subtitle_path
+
+
+async def _generate_subtitles(provider, tts_request: TTSRequest, audio_path: Path,
+                              subtitle_output_path: Path, duration: float) -> Optional[Path]:
+    """
+    Generate the subtitle file, locally from the request text or with the provider's transcription.
+    
+    Args:
+        provider: TTS provider
+        tts_request: TTS request parameters
+        audio_path: Synthesized audio file
+        subtitle_output_path: SRT output path
+        duration: Audio duration in seconds
+    
+    Returns:
+        Path: Subtitle path, or None if subtitle generation failed
+    """
+    try:
+        if _subtitle_mode(tts_request) == SubtitleMode.LOCAL:
+            transcript = await local_subtitles(tts_request.text, audio_path, duration)
+        else:
+            # Call transcription API
+            async with provider_registry.latency.measure(tts_request.channel, "transcribe"):
+                transcript = await provider.transcribe(audio_path, response_format="srt")
         
-        # Check if file was created
-        if not output_path.exists():
-            raise HTTPException(status_code=500, detail="Failed to generate audio file")
-        
-        # Get audio metadata
-        duration = get_audio_duration(output_path)
-        file_size = get_file_size(output_path)
-        
-        # Generate file URL
-        base_url = str(request.base_url).rstrip('/')
-        relative_path = str(output_path)
-        file_url = f"{base_url}/api/v1/tts/files/{relative_path}"
+        # Save subtitle file
+        async with aiofiles.open(subtitle_output_path, "w", encoding="utf-8") as f:
+            await f.write(transcript)
         
-        # Generate subtitle using OpenAI transcription
-        subtitle_path = None
-        subtitle_url = None
+        return subtitle_output_path
+    except Exception as e:
+        # Log error but don't fail the request if subtitle generation fails
+        # Subtitle fields will remain None
+        print(f"Warning: Failed to generate subtitle: {str(e)}")
+        return None
+
+
+async def _synthesize(request: Request, tts_request: TTSRequest, cache_key: str) -> TTSResponse:
+    """
+    Call the TTS provider, then generate subtitles for the audio and store both in the cache.
+    Texts longer than TTS_CHUNK_THRESHOLD_CHARS are split at sentence boundaries and synthesized in parallel.
+    
+    Args:
+        request: FastAPI request object (to get base URL)
+        tts_request: TTS request parameters
+        cache_key: TTS cache key of the request
+    
+    Returns:
+        TTSResponse: TTS result with audio file URL and metadata
+    """
+    # Wait for a TTS slot, or fail fast with 429 when the service is saturated
+    async with tts_admission.admit():
         try:
-            # Initialize OpenAI client
-            client = OpenAI()
-            
-            # Generate subtitle filename
-            subtitle_filename = generate_subtitle_filename(filename)
-            subtitle_output_path = output_dir / subtitle_filename
-            
-            # Call OpenAI transcription API
-            with open(output_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="srt"
+            # Shared provider with a warm connection pool
+            provider = provider_registry.get_provider(tts_request.channel)
+
+            # Get output directory and generate filename
+            output_dir = get_tts_directory()
+            filename = generate_audio_filename()
+            output_path = output_dir / filename
+
+            subtitle_output_path = output_dir / generate_subtitle_filename(filename)
+            chunks = split_text(tts_request.text) if len(tts_request.text) > CHUNK_THRESHOLD_CHARS else []
+
+            if len(chunks) > 1:
+                # Long text: chunks are synthesized and subtitled in parallel, then stitched
+                duration = await synthesize_chunked(
+                    provider,
+                    chunks,
+                    voice=tts_request.voice,
+                    output_path=output_path,
+                    subtitle_path=subtitle_output_path,
+                    latency=provider_registry.latency,
+                    channel=tts_request.channel,
+                    subtitle_mode=_subtitle_mode(tts_request),
+                    model=tts_request.model,
+                    instructions=tts_request.instructions
+                )
+                file_size = get_file_size(output_path)
+                subtitle_path = subtitle_output_path if subtitle_output_path.exists() else None
+                if subtitle_path is None:
+                    print("Warning: Failed to generate subtitle for one or more chunks")
+            else:
+                duration, file_size, subtitle_path = await _synthesize_single(
+                    provider, tts_request, output_path, subtitle_output_path
                 )
-            
-            # Save subtitle file
-            with open(subtitle_output_path, "w", encoding="utf-8") as f:
-                f.write(transcript)
-            
-            # Generate subtitle URL
-            subtitle_path = str(subtitle_output_path)
-            subtitle_url = f"{base_url}/api/v1/tts/files/{subtitle_path}"
+
+            # Only complete results are cached, so failed subtitle generation is retried next time
+            # The cache keeps its own link or copy, so the returned files are never evicted
+            if subtitle_path is not None and tts_cache.enabled:
+                await asyncio.to_thread(tts_cache.put, cache_key, output_path, subtitle_path, duration)
+
+            return _build_response(
+                request,
+                tts_request,
+                str(output_path),
+                str(subtitle_path) if subtitle_path is not None else None,
+                duration,
+                file_size
+            )
+
+        except HTTPException:
+            raise
         except Exception as e:
-            # Log error but don't fail the request if subtitle generation fails
-            # Subtitle fields will remain None
-            print(f"Warning: Failed to generate subtitle: {str(e)}")
-        
-        return TTSResponse(
-            success=True,
-            file_path=relative_path,
-            file_url=file_url,
-            duration=duration,
-            file_size=file_size,
-            channel=tts_request.channel,
-            voice=tts_request.voice,
-            subtitle_path=subtitle_path,
-            subtitle_url=subtitle_url,
-            oral_broadcast=tts_request.text,
-            created_at=get_current_time(),
+            raise _provider_error(e)
+
+
+@router.post(
+    "/batch",
+    operation_id="synthesize_speech_batch",
+    summary="Batch Text to Speech",
+    description="""
+    Synthesize every narration of a deck in one request.
+    
+    Items are scheduled server-side: up to TTS_BATCH_CONCURRENCY run at a time (and all batches together use at
+    most half of the TTS admission slots, leaving the rest to interactive calls), and every provider call
+    waits for the account's request (TTS_RATE_LIMIT_RPM) and token (TTS_RATE_LIMIT_TPM) budget, so the
+    batch runs as fast as the provider allows without hitting 429s. Cached and duplicate narrations
+    are served without calling the provider.
+    
+    The response is NDJSON streamed in item order, one TTSBatchItemResult line per item as soon as it
+    and all items before it are finished: `{"index": 0, "status": "completed", "result": {...}}` or
+    `{"index": 1, "status": "failed", "status_code": 500, "error": "..."}`. A failed item does not stop the batch.
+    """,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One TTSBatchItemResult per line"}}
+)
+async def synthesize_batch(request: Request, batch: TTSBatchRequest):
+    """
+    Synthesize a batch of narrations.
+    
+    Args:
+        request: FastAPI request object (to get base URL)
+        batch: Batch request
+    
+    Returns:
+        StreamingResponse: NDJSON item results in order
+    """
+    tts_requests = [
+        TTSRequest(
+            channel=batch.channel,
+            voice=item.voice or batch.voice,
+            text=item.text,
+            model=batch.model,
+            instructions=item.instructions if item.instructions is not None else batch.instructions,
+            subtitle_mode=batch.subtitle_mode
         )
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        for item in batch.items
+    ]
+    semaphore = asyncio.Semaphore(max(BATCH_CONCURRENCY, 1))
+
+    async def _run_item(index: int, tts_request: TTSRequest) -> TTSBatchItemResult:
+        async with semaphore, _batch_slots:
+            for attempt in range(_BATCH_ATTEMPTS):
+                try:
+                    result = await _run_synthesis(request, tts_request)
+                    return TTSBatchItemResult(index=index, status="completed", result=result)
+                except HTTPException as e:
+                    # Busy service or provider rate limit: wait as told and try again
+                    if e.status_code != 429 or attempt == _BATCH_ATTEMPTS - 1:
+                        return TTSBatchItemResult(
+                            index=index, status="failed", status_code=e.status_code, error=str(e.detail)
+                        )
+                    retry_after = float((e.headers or {}).get("Retry-After", 1))
+                    await asyncio.sleep(min(retry_after, _BATCH_MAX_RETRY_WAIT))
+                except Exception as e:
+                    return TTSBatchItemResult(index=index, status="failed", status_code=500, error=str(e))
+
+    tasks = [asyncio.ensure_future(_run_item(i, r)) for i, r in enumerate(tts_requests)]
+
+    async def body():
+        try:
+            for task in tasks:
+                item = await task
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop items that have not finished (finished ones stay cached)
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson",
+        headers={"X-TTS-Batch-Size": str(len(tasks))}
+    )
+
+
+@router.post(
+    "/stream",
+    operation_id="stream_speech",
+    summary="Streaming Text to Speech",
+    description="""
+    Synthesize speech and stream the MP3 to the client as the provider produces it (chunked response),
+    for low time-to-first-audio in interactive previews.
+    
+    The audio is written to disk at the same time. Duration, subtitles and caching are finished after
+    the stream ends; poll the URL in the `X-TTS-Status-URL` header (`GET /tts/streams/{stream_id}`) for them.
+    
+    Response headers:
+    - `X-TTS-Stream-Id`: Stream ID
+    - `X-TTS-File-Path`: Path of the audio file being written
+    - `X-TTS-Status-URL`: Status URL with the final TTSResponse once completed
+    - `X-TTS-Cache`: `hit` when the audio is served from the TTS cache
+    
+    Text is limited to TTS_CHUNK_MAX_CHARS characters; use `/tts/synthesize` for long text.
+    """,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"audio/mpeg": {}}, "description": "MP3 audio stream"}}
+)
+async def stream_speech(request: Request, tts_request: TTSRequest):
+    """
+    Stream synthesized speech.
+    
+    Args:
+        request: FastAPI request object (to get base URL)
+        tts_request: TTS request parameters
+    
+    Returns:
+        StreamingResponse: MP3 audio stream (FileResponse on a cache hit)
+    """
+    if len(tts_request.text) > CHUNK_MAX_CHARS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Streaming supports at most {CHUNK_MAX_CHARS} characters, use /tts/synthesize for long text"
+        )
+
+    _, cache_key = _content_key(tts_request)
+    cached = await _checkout_cached(cache_key)
+    if cached is not None:
+        result = _build_response(
+            request, tts_request, cached["audio_path"], cached["subtitle_path"], cached["duration"], cached["file_size"]
+        )
+        record = await asyncio.to_thread(
+            stream_records.create, status=COMPLETED, file_path=cached["audio_path"], result=result.model_dump()
+        )
+        return FileResponse(
+            cached["audio_path"],
+            media_type="audio/mpeg",
+            headers=_stream_headers(request, record, cache="hit")
+        )
+
+    output_dir = get_tts_directory()
+    filename = generate_audio_filename()
+    output_path = output_dir / filename
+    subtitle_output_path = output_dir / generate_subtitle_filename(filename)
+    started_at = time.perf_counter()
+
+    async def body():
+        # The generator owns the TTS slot and the upstream stream, so both are released whenever it is closed,
+        # even if the response body never starts. It yields the stream record first, then the audio.
+        async with tts_admission.admit():
+            provider = provider_registry.get_provider(tts_request.channel)
+            audio = provider.stream(
+                text=tts_request.text,
+                voice=tts_request.voice,
+                model=tts_request.model,
+                instructions=tts_request.instructions
+            )
+            stream_id = None
+            completed = False
+            try:
+                try:
+                    first_chunk = await audio.__anext__()
+                except StopAsyncIteration:
+                    raise HTTPException(status_code=500, detail="Failed to generate audio file")
+                provider_registry.latency.record(tts_request.channel, "first_audio", time.perf_counter() - started_at)
+                record = await asyncio.to_thread(stream_records.create, file_path=str(output_path))
+                stream_id = record["stream_id"]
+                yield record
+
+                # Tee every chunk to disk while forwarding it to the client
+                async with aiofiles.open(output_path, "wb") as f:
+                    await f.write(first_chunk)
+                    yield first_chunk
+                    async for chunk in audio:
+                        await f.write(chunk)
+                        yield chunk
+                completed = True
+            finally:
+                await audio.aclose()
+                if stream_id is not None:
+                    provider_registry.latency.record(
+                        tts_request.channel, "stream", time.perf_counter() - started_at, ok=completed
+                    )
+                    if completed:
+                        _spawn(_finalize_stream(
+                            request, tts_request, provider, stream_id, cache_key, output_path, subtitle_output_path
+                        ))
+                    else:
+                        # Client went away, the response was never sent, or the provider failed mid-stream
+                        stream_records.update(stream_id, status=FAILED, error="Stream interrupted")
+                        output_path.unlink(missing_ok=True)
+
+    # Hold a TTS slot and wait for the first chunk before responding, so 429 and provider errors
+    # still get a proper status code
+    stream = body()
+    try:
+        record = await stream.__anext__()
+    except HTTPException:
+        raise
+    except Exception as e:
+        provider_registry.latency.record(tts_request.channel, "first_audio", time.perf_counter() - started_at, ok=False)
+        raise _provider_error(e)
+
+    async def release():
+        # No-op once the body has run; otherwise releases the slot and the upstream stream
+        await stream.aclose()
+
+    return StreamingResponse(
+        stream,
+        media_type="audio/mpeg",
+        headers=_stream_headers(request, record, cache="miss"),
+        background=BackgroundTask(release)
+    )
+
+
+def _stream_headers(request: Request, record: dict, cache: str) -> dict:
+    base_url = str(request.base_url).rstrip('/')
+    return {
+        "X-TTS-Stream-Id": record["stream_id"],
+        "X-TTS-File-Path": record["file_path"],
+        "X-TTS-Status-URL": f"{base_url}/api/v1/tts/streams/{record['stream_id']}",
+        "X-TTS-Cache": cache,
+    }
+
+
+def _spawn(coro) -> None:
+    """Run a coroutine in the background, keeping a reference until it finishes."""
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _finalize_stream(request: Request, tts_request: TTSRequest, provider, stream_id: str, cache_key: str,
+                           output_path: Path, subtitle_output_path: Path) -> None:
+    """
+    Measure, subtitle and cache a completed stream, then publish the result in its record.
+    
+    Args:
+        request: FastAPI request object (to get base URL)
+        tts_request: TTS request parameters
+        provider: TTS provider that produced the audio
+        stream_id: Stream ID
+        cache_key: TTS cache key of the request
+        output_path: Streamed MP3 file
+        subtitle_output_path: SRT output path
+    """
+    try:
+        await asyncio.to_thread(stream_records.update, stream_id, status=FINALIZING)
+        duration = await asyncio.to_thread(get_audio_duration, output_path)
+        file_size = get_file_size(output_path)
+        subtitle_path = await _generate_subtitles(provider, tts_request, output_path, subtitle_output_path, duration)
+
+        # The streamed file path was already handed out, so the cache gets a link or copy
+        if subtitle_path is not None and tts_cache.enabled:
+            await asyncio.to_thread(tts_cache.put, cache_key, output_path, subtitle_path, duration)
+
+        result = _build_response(
+            request,
+            tts_request,
+            str(output_path),
+            str(subtitle_path) if subtitle_path is not None else None,
+            duration,
+            file_size
+        )
+        await asyncio.to_thread(stream_records.update, stream_id, status=COMPLETED, result=result.model_dump())
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"TTS synthesis failed: {str(e)}")
+        print(f"Warning: Failed to finalize TTS stream {stream_id}: {str(e)}")
+        await asyncio.to_thread(stream_records.update, stream_id, status=FAILED, error=str(e))
+
+
+@router.get(
+    "/streams/{stream_id}",
+    response_model=TTSStreamStatusResponse,
+    operation_id="get_tts_stream_status",
+    summary="Get Streaming TTS Status",
+    description="""
+    Get the status of a streamed synthesis: `streaming`, `finalizing`, `completed` (with the full
+    TTSResponse including duration and subtitles) or `failed`.
+    """
+)
+async def get_stream_status(stream_id: str):
+    """
+    Get streamed synthesis status.
+    
+    Args:
+        stream_id: Stream ID from the X-TTS-Stream-Id header
+    
+    Returns:
+        TTSStreamStatusResponse: Stream status and final result
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", stream_id):
+        raise HTTPException(status_code=404, detail="Stream not found")
+    record = await asyncio.to_thread(stream_records.get, stream_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Stream not found")
+    return TTSStreamStatusResponse(**record)
 
 
 @router.get(
@@ -208,3 +760,41 @@ async def get_supported_channels():
         "count": len(channels)
     }
 
+
+@router.get(
+    "/providers",
+    operation_id="get_tts_provider_stats",
+    summary="Get TTS Provider Pool and Latency Stats",
+    description="""
+    Get the pooled provider instances, connection pool limits, startup warm-up results, rate limiter state
+    (RPM/TPM budgets, delayed calls, provider 429s), retry/hedge counters and circuit breaker state, routing
+    state of channels spread over several backends (TTS_ROUTES: latency/error averages, failovers), and
+    provider-side latency (calls, errors, avg/p50/p95/max seconds) per channel and operation.
+    """
+)
+async def get_provider_stats():
+    """
+    Get TTS provider registry stats.
+    
+    Returns:
+        dict: Pool configuration, pooled instances, warm-up timings and latency per channel
+    """
+    return provider_registry.stats()
+
+
+@router.get(
+    "/cache",
+    operation_id="get_tts_cache_stats",
+    summary="Get TTS Cache Stats",
+    description="""
+    Get the content-addressed TTS cache usage (entries, bytes, limits) and hit/miss counters of this replica.
+    """
+)
+async def get_cache_stats():
+    """
+    Get TTS cache stats.
+    
+    Returns:
+        dict: Entry count, bytes, limits, TTL, hits, misses, hit rate, stores and evictions
+    """
+    return await asyncio.to_thread(tts_cache.stats)
@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class TTSAudioCache:
+    """
+    Content-addressed cache of synthesized audio and subtitles.
+
+    Entries are keyed by hash(channel, voice, model, instructions, text, subtitle mode) and stored on the shared
+    volume as tts_<key>.mp3 / .srt / .json, so every replica shares them. The JSON metadata is written
+    last and marks a complete entry; its modification time is the last access time used for LRU eviction.
+    Only MP3 synthesis output is cached.
+
+    The cache holds its own hard link (or copy) of every file: responses always point at per-request files
+    in the dated TTS directory, so eviction never removes a file a client was given.
+    """
+
+    PREFIX = "tts_"
+
+    def __init__(self, directory: Path, max_entries: int, max_bytes: int, ttl: float, enabled: bool = True):
+        """
+        Initialize TTS cache.
+
+        Args:
+            directory: Cache directory on the shared volume
+            max_entries: Maximum number of cached entries
+            max_bytes: Maximum total size of cached files
+            ttl: Seconds after creation an entry is served (narration is re-synthesized after that)
+            enabled: Whether lookups and stores are performed
+        """
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(channel: str, voice: str, model: Optional[str], instructions: Optional[str], text: str,
+                 subtitle_mode: str) -> str:
+        """
+        Build the cache key for a synthesis request.
+
+        Args:
+            channel: TTS channel
+            voice: Voice name
+            model: TTS model
+            instructions: Voice instructions
+            text: Text to synthesize
+            subtitle_mode: How the cached subtitles were timed
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        canonical = json.dumps(
+            {
+                "channel": channel,
+                "voice": voice,
+                "model": model,
+                "instructions": instructions,
+                "text": text,
+                "subtitle_mode": subtitle_mode,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{self.PREFIX}{key}{suffix}"
+
+    def _read_meta(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key, ".json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached entry and refresh its access time.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            dict: audio_path, subtitle_path, duration, file_size and created_at, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        meta = self._read_meta(key)
+        if (
+            meta is None
+            or time.time() - meta.get("created_at", 0) > self.ttl
+            or not Path(meta["audio_path"]).exists()
+            or not Path(meta["subtitle_path"]).exists()
+        ):
+            self._count("misses")
+            return None
+        try:
+            os.utime(self._path(key, ".json"))
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return meta
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path) -> None:
+        # Hard link when possible (no extra space), otherwise copy; then atomically rename into place
+        tmp = Path(f"{target}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+
+    def checkout(self, key: str, audio_path: Path, subtitle_path: Path) -> Optional[dict]:
+        """
+        Look up a cached entry and link (or copy) its files to per-request paths.
+
+        Args:
+            key: Cache key from make_key()
+            audio_path: Per-request MP3 path to create
+            subtitle_path: Per-request SRT path to create
+
+        Returns:
+            dict: Entry metadata with audio_path / subtitle_path set to the new files, or None on a miss
+        """
+        meta = self.get(key)
+        if meta is None:
+            return None
+        try:
+            self._link_or_copy(Path(meta["audio_path"]), Path(audio_path))
+            self._link_or_copy(Path(meta["subtitle_path"]), Path(subtitle_path))
+        except FileNotFoundError:
+            # Evicted between lookup and link
+            Path(audio_path).unlink(missing_ok=True)
+            return None
+        return {**meta, "audio_path": str(audio_path), "subtitle_path": str(subtitle_path)}
+
+    def put(self, key: str, audio_path: Path, subtitle_path: Path, duration: float) -> dict:
+        """
+        Store a link (or copy) of freshly generated audio and subtitle files; the generated files stay in place.
+
+        Args:
+            key: Cache key from make_key()
+            audio_path: Generated MP3 file
+            subtitle_path: Generated SRT file
+            duration: Audio duration in seconds
+
+        Returns:
+            dict: Metadata of the stored entry (same shape as get())
+        """
+        cached_audio = self._path(key, Path(audio_path).suffix)
+        cached_subtitle = self._path(key, Path(subtitle_path).suffix)
+        self._link_or_copy(audio_path, cached_audio)
+        self._link_or_copy(subtitle_path, cached_subtitle)
+        meta = {
+            "audio_path": str(cached_audio),
+            "subtitle_path": str(cached_subtitle),
+            "duration": duration,
+            "file_size": cached_audio.stat().st_size,
+            "created_at": time.time(),
+        }
+        meta_path = self._path(key, ".json")
+        tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, meta_path)
+        self._count("stores")
+        self.evict()
+        return meta
+
+    def _entries(self) -> list:
+        """(last access, created_at, total bytes, key) for every entry; the MP3 mtime is its creation time"""
+        entries = []
+        for meta_path in self.directory.glob(f"{self.PREFIX}*.json"):
+            key = meta_path.stem[len(self.PREFIX):]
+            try:
+                accessed_at = meta_path.stat().st_mtime
+                audio = self._path(key, ".mp3").stat()
+            except FileNotFoundError:
+                continue
+            size = meta_path.stat().st_size + audio.st_size
+            try:
+                size += self._path(key, ".srt").stat().st_size
+            except FileNotFoundError:
+                pass
+            entries.append((accessed_at, audio.st_mtime, size, key))
+        return entries
+
+    def _remove(self, key: str) -> None:
+        # Metadata first, so a concurrent get() never sees an entry with missing files
+        for suffix in (".json", ".mp3", ".srt"):
+            try:
+                self._path(key, suffix).unlink()
+            except FileNotFoundError:
+                pass
+        self._count("evictions")
+
+    def evict(self) -> None:
+        """Remove expired entries, then least recently used ones until count and size are within limits."""
+        now = time.time()
+        entries = []
+        for entry in sorted(self._entries()):
+            if now - entry[1] > self.ttl:
+                self._remove(entry[3])
+            else:
+                entries.append(entry)
+        total_bytes = sum(size for _, _, size, _ in entries)
+        count = len(entries)
+        for _, _, size, key in entries:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+            count -= 1
+            total_bytes -= size
+
+    def stats(self) -> dict:
+        """
+        Get cache hit rate and usage.
+
+        Returns:
+            dict: Entry count, bytes, limits, hits, misses, hit rate, stores and evictions
+        """
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(entries),
+                "bytes": sum(size for _, _, size, _ in entries),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,185 @@
+import asyncio
+import math
+import os
+import shutil
+import tempfile
+import wave
+from pathlib import Path
+from typing import List, Optional
+
+import aiofiles
+import numpy as np
+
+from tts.providers import TTSProvider
+from tts.schemas import SubtitleMode
+from tts.subtitles import format_srt, merge_srt
+from tts.text import CLAUSE_END, SENTENCE_END, pack, split_at
+from tts.timing import DEFAULT_SUBTITLE_MODE, SUBTITLE_SILENCE_REFINE, build_cues
+
+
+# Texts longer than this are synthesized in parallel chunks
+CHUNK_THRESHOLD_CHARS = int(os.getenv("TTS_CHUNK_THRESHOLD_CHARS", "600"))
+# Upper bound per chunk (OpenAI accepts at most 4096 characters per call)
+CHUNK_MAX_CHARS = int(os.getenv("TTS_CHUNK_MAX_CHARS", "1500"))
+# Chunks synthesized at the same time for one request
+CHUNK_CONCURRENCY = int(os.getenv("TTS_CHUNK_CONCURRENCY", "4"))
+
+
+def split_text(text: str, concurrency: int = CHUNK_CONCURRENCY, max_chars: int = CHUNK_MAX_CHARS,
+               min_chars: int = CHUNK_THRESHOLD_CHARS // 2) -> List[str]:
+    """
+    Split long text into roughly equal chunks at sentence boundaries.
+
+    Chunks aim at len(text) / concurrency characters so all of them finish at about the same time,
+    but never exceed max_chars and, when possible, are not shorter than min_chars (very short
+    chunks lose prosody). Sentences longer than a chunk are split at clause breaks, then hard-cut.
+
+    Args:
+        text: Text to split
+        concurrency: Number of chunks synthesized at the same time
+        max_chars: Maximum characters per chunk
+        min_chars: Preferred minimum characters per chunk
+
+    Returns:
+        list: Chunks in order; joined they equal the input text except that whitespace-only runs
+            between sentences (blank lines, trailing spaces) are dropped
+    """
+    sentences = split_at(SENTENCE_END, text)
+    target = min(max_chars, max(math.ceil(len(text) / max(concurrency, 1)), min_chars))
+    while True:
+        pieces = []
+        for sentence in sentences:
+            if len(sentence) <= target:
+                pieces.append(sentence)
+                continue
+            for clause in pack(split_at(CLAUSE_END, sentence), target):
+                pieces.extend(clause[i:i + target] for i in range(0, len(clause), target))
+        chunks = pack(pieces, target)
+        # Uneven sentence lengths can leave one chunk too many for a single wave; grow the target
+        if len(chunks) <= concurrency or target >= max_chars:
+            return chunks
+        target = min(max_chars, target + max(target // 10, 1))
+
+
+def _write_wav(path: Path, pcm: bytes, sample_rate: int) -> None:
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+
+
+async def _encode_mp3(pcm_paths: List[Path], sample_rate: int, output_path: Path) -> None:
+    """Feed the chunk PCM back to back into one FFmpeg MP3 encode, so joins have no encoder padding."""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+        "-c:a", "libmp3lame", "-b:a", "128k",
+        str(output_path),
+        stdin=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr_task = asyncio.ensure_future(process.stderr.read())
+    try:
+        for pcm_path in pcm_paths:
+            async with aiofiles.open(pcm_path, "rb") as f:
+                while True:
+                    block = await f.read(1024 * 1024)
+                    if not block:
+                        break
+                    process.stdin.write(block)
+                    await process.stdin.drain()
+        process.stdin.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    stderr = await stderr_task
+    if await process.wait() != 0:
+        raise RuntimeError(f"FFmpeg failed to encode stitched audio: {stderr.decode(errors='replace')}")
+
+
+async def synthesize_chunked(provider: TTSProvider, chunks: List[str], voice: str, output_path: Path,
+                             subtitle_path: Optional[Path], latency=None, channel: str = None,
+                             concurrency: int = CHUNK_CONCURRENCY, subtitle_mode: str = DEFAULT_SUBTITLE_MODE,
+                             **kwargs) -> float:
+    """
+    Synthesize chunks concurrently as raw PCM, stitch them into one MP3 and merge the per-chunk subtitles.
+
+    Args:
+        provider: TTS provider (must support PCM output)
+        chunks: Text chunks from split_text()
+        voice: Voice name
+        output_path: MP3 output path
+        subtitle_path: SRT output path (None to skip subtitles)
+        latency: Optional ProviderLatencyStats recording each provider call
+        channel: Channel name used for latency stats
+        concurrency: Maximum chunks in flight
+        subtitle_mode: local (time each chunk's text from its PCM) or whisper (transcribe each chunk);
+            defaults to TTS_SUBTITLE_MODE like single-call synthesis
+        **kwargs: Additional provider parameters (model, instructions)
+
+    Returns:
+        float: Audio duration in seconds (exact, from the sample count)
+
+    Raises:
+        ValueError: If the provider cannot return PCM
+    """
+    sample_rate = provider.PCM_SAMPLE_RATE
+    if not sample_rate:
+        raise ValueError(f"{type(provider).__name__} does not support long text (no PCM output)")
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    work_dir = Path(tempfile.mkdtemp(prefix="tts_chunks_", dir=output_path.parent))
+
+    async def _measure(operation, coro):
+        if latency is None:
+            return await coro
+        async with latency.measure(channel, operation):
+            return await coro
+
+    async def _run_chunk(index: int, text: str):
+        pcm_path = work_dir / f"{index:04d}.pcm"
+        async with semaphore:
+            await _measure("synthesize", provider.synthesize(
+                text=text, voice=voice, output_path=pcm_path, response_format="pcm", **kwargs
+            ))
+            if subtitle_path is None:
+                return pcm_path, None
+            async with aiofiles.open(pcm_path, "rb") as f:
+                pcm = await f.read()
+            if subtitle_mode == SubtitleMode.LOCAL:
+                samples = np.frombuffer(pcm[:len(pcm) // 2 * 2], dtype="<i2") if SUBTITLE_SILENCE_REFINE else None
+                cues = await asyncio.to_thread(build_cues, text, len(pcm) / 2 / sample_rate, samples, sample_rate)
+                return pcm_path, format_srt(cues)
+            # Whisper needs a container; wrap the PCM in a WAV header
+            wav_path = work_dir / f"{index:04d}.wav"
+            await asyncio.to_thread(_write_wav, wav_path, pcm, sample_rate)
+            try:
+                transcript = await _measure("transcribe", provider.transcribe(wav_path, response_format="srt"))
+            except Exception as e:
+                print(f"Warning: Failed to transcribe chunk {index}: {str(e)}")
+                transcript = None
+            return pcm_path, transcript
+
+    tasks = [asyncio.ensure_future(_run_chunk(i, text)) for i, text in enumerate(chunks)]
+    try:
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # One failed chunk fails the request; stop the others before the work directory is removed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        pcm_paths = [pcm_path for pcm_path, _ in results]
+        await _encode_mp3(pcm_paths, sample_rate, output_path)
+
+        # 16-bit mono: two bytes per sample
+        durations = [pcm_path.stat().st_size / 2 / sample_rate for pcm_path in pcm_paths]
+        transcripts = [transcript for _, transcript in results]
+        if subtitle_path is not None and all(t is not None for t in transcripts):
+            offsets = [sum(durations[:i]) for i in range(len(durations))]
+            async with aiofiles.open(subtitle_path, "w", encoding="utf-8") as f:
+                await f.write(merge_srt(list(zip(transcripts, offsets))))
+        return sum(durations)
+    finally:
+        await asyncio.to_thread(shutil.rmtree, work_dir, True)
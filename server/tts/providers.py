@@ -1,13 +1,19 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Tuple
-from openai import OpenAI
-import os
+from typing import AsyncIterator
+from openai import APIConnectionError, AsyncOpenAI, DefaultAsyncHttpxClient
+import aiofiles
+import httpx
+import tempfile
 
 
 class TTSProvider(ABC):
     """Abstract base class for TTS providers"""
     
+    # Sample rate of raw 16-bit mono PCM returned for response_format='pcm' (None if unsupported).
+    # Long texts are synthesized in parallel chunks as PCM so they can be stitched without gaps.
+    PCM_SAMPLE_RATE = None
+    
     @abstractmethod
     async def synthesize(
         self,
@@ -30,18 +36,92 @@ class TTSProvider(ABC):
         """
         pass
 
+    async def stream(self, text: str, voice: str, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Synthesize speech and yield the audio bytes as the provider produces them.
+        
+        Providers without a streaming API fall back to synthesizing the whole file first.
+        
+        Args:
+            text: Text to convert to speech
+            voice: Voice name/ID
+            **kwargs: Additional provider-specific parameters
+        
+        Yields:
+            bytes: Consecutive pieces of the audio file
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "speech"
+            await self.synthesize(text=text, voice=voice, output_path=output_path, **kwargs)
+            async with aiofiles.open(output_path, 'rb') as f:
+                while True:
+                    chunk = await f.read(64 * 1024)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    async def transcribe(self, audio_path: Path, response_format: str = 'srt') -> str:
+        """
+        Transcribe an audio file (used to generate subtitles).
+        
+        Args:
+            audio_path: Path to audio file
+            response_format: Transcription format (srt, vtt, text)
+        
+        Returns:
+            str: Transcript in the requested format
+        
+        Raises:
+            NotImplementedError: If the provider has no speech-to-text
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support transcription")
+
+    def is_transient_error(self, error: Exception) -> bool:
+        """
+        Check whether a failed call may succeed if retried.
+        
+        Args:
+            error: Exception raised by a provider call
+        
+        Returns:
+            bool: True for rate limits (429), server errors (5xx), timeouts and connection errors
+        """
+        status = getattr(error, "status_code", None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+        return isinstance(error, (TimeoutError, ConnectionError, httpx.TransportError))
+
+    async def warm_up(self) -> None:
+        """
+        Open a connection to the provider ahead of the first request (TCP/TLS handshake).
+        """
+        pass
+
+    async def aclose(self) -> None:
+        """
+        Release network resources held by the provider (connection pools etc.).
+        """
+        pass
+
 
 class OpenAITTSProvider(TTSProvider):
     """OpenAI TTS provider implementation"""
     
-    def __init__(self, api_key: str = None):
+    PCM_SAMPLE_RATE = 24000
+    
+    def __init__(self, api_key: str = None, base_url: str = None, pool_limits: httpx.Limits = None,
+                 max_retries: int = 2):
         """
         Initialize OpenAI TTS provider.
         
         Args:
             api_key: OpenAI API key (if not provided, uses OPENAI_API_KEY env var)
+            base_url: API base URL (if not provided, uses OPENAI_BASE_URL env var or the public API)
+            pool_limits: HTTP connection pool limits (if not provided, uses the OpenAI client defaults)
+            max_retries: Client-side retries of the OpenAI SDK (the registry passes 0 and retries itself)
         """
-        self.client = OpenAI(api_key=api_key) if api_key else OpenAI()
+        http_client = DefaultAsyncHttpxClient(limits=pool_limits) if pool_limits else None
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=max_retries)
     
     async def synthesize(
         self,
@@ -57,30 +137,80 @@ class OpenAITTSProvider(TTSProvider):
             text: Text to convert to speech
             voice: Voice name (alloy, echo, fable, onyx, nova, shimmer, coral)
             output_path: Path to save audio file
-            **kwargs: Additional parameters (model, instructions, etc.)
+            **kwargs: Additional parameters (model, instructions, response_format, etc.)
         
         Returns:
             Path: Path to generated audio file
         """
+        # Write the streamed response to file without blocking the event loop
+        async with aiofiles.open(output_path, 'wb') as f:
+            async for chunk in self.stream(text, voice, **kwargs):
+                await f.write(chunk)
+        
+        return output_path
+
+    async def stream(self, text: str, voice: str, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Stream speech from OpenAI TTS as it is generated.
+        
+        Args:
+            text: Text to convert to speech
+            voice: Voice name (alloy, echo, fable, onyx, nova, shimmer, coral)
+            **kwargs: Additional parameters (model, instructions, response_format, etc.)
+        
+        Yields:
+            bytes: Consecutive pieces of the audio file
+        """
         model = kwargs.get('model', 'gpt-4o-mini-tts')
         instructions = kwargs.get('instructions')
+        response_format = kwargs.get('response_format', 'mp3')
         
         # Prepare request parameters
         request_params = {
             'model': model,
             'voice': voice,
             'input': text,
+            'response_format': response_format,
         }
         
         # Add instructions if provided
         if instructions:
             request_params['instructions'] = instructions
         
-        # Stream response to file
-        with self.client.audio.speech.with_streaming_response.create(**request_params) as response:
-            response.stream_to_file(str(output_path))
+        async with self.client.audio.speech.with_streaming_response.create(**request_params) as response:
+            async for chunk in response.iter_bytes():
+                yield chunk
+
+    async def transcribe(self, audio_path: Path, response_format: str = 'srt') -> str:
+        """
+        Transcribe an audio file with Whisper.
         
-        return output_path
+        Args:
+            audio_path: Path to audio file
+            response_format: Transcription format (srt, vtt, text)
+        
+        Returns:
+            str: Transcript in the requested format
+        """
+        async with aiofiles.open(audio_path, 'rb') as f:
+            audio_bytes = await f.read()
+        
+        return await self.client.audio.transcriptions.create(
+            model="whisper-1",
+            file=(Path(audio_path).name, audio_bytes),
+            response_format=response_format
+        )
+
+    def is_transient_error(self, error: Exception) -> bool:
+        # Connection errors and timeouts of the SDK carry no status code
+        return isinstance(error, APIConnectionError) or super().is_transient_error(error)
+
+    async def warm_up(self) -> None:
+        # Cheapest authenticated request; leaves a keep-alive connection in the pool
+        await self.client.with_options(max_retries=0).models.list()
+
+    async def aclose(self) -> None:
+        await self.client.close()
 
 
 class TTSProviderFactory:
@@ -0,0 +1,223 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from tts.text import CJK
+
+
+# Provider account limits per replica (set a little below the account limit divided by the replica count);
+# 0 disables a budget
+RATE_LIMIT_RPM = float(os.getenv("TTS_RATE_LIMIT_RPM", "500"))
+RATE_LIMIT_TPM = float(os.getenv("TTS_RATE_LIMIT_TPM", "0"))
+# Bucket capacity in seconds of budget: an idle account may burst this much at once. Providers may enforce
+# per-minute limits over shorter periods (60 RPM as one request per second), so keep this small
+RATE_LIMIT_BURST_SECONDS = float(os.getenv("TTS_RATE_LIMIT_BURST_SECONDS", "1"))
+
+# Pause after a provider 429 without a usable Retry-After header
+_DEFAULT_RETRY_AFTER = 5.0
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Estimate the provider tokens of a text for the TPM budget.
+
+    CJK characters count as one token each, other text as one token per four characters.
+
+    Args:
+        text: Input text (None counts as 0)
+
+    Returns:
+        int: Estimated tokens
+    """
+    if not text:
+        return 0
+    cjk = len(CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate; reservations may go into debt and wait it out"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = RATE_LIMIT_BURST_SECONDS):
+        """
+        Initialize token bucket.
+
+        Args:
+            per_minute: Refill rate per minute
+            burst_seconds: Capacity, in seconds of refill
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take amount from the bucket. Caller holds the limiter lock.
+
+        Args:
+            amount: Tokens to take
+            now: Current monotonic time
+
+        Returns:
+            float: Seconds until the reservation is covered (0 if it is already)
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def release(self, amount: float, now: float) -> None:
+        """
+        Give back a reservation that will not be used. Caller holds the limiter lock.
+
+        Args:
+            amount: Tokens reserved
+            now: Current monotonic time
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate + amount)
+        self._updated_at = now
+
+
+class ProviderRateLimiter:
+    """
+    Request (RPM) and token (TPM) budgets of one provider account.
+
+    Calls reserve their budget in arrival order and sleep until it is covered, so a burst of work is
+    spread to exactly the configured rate instead of running into the provider's 429s. A 429 that gets
+    through anyway pauses every caller for the provider's Retry-After.
+    """
+
+    def __init__(self, rpm: float = RATE_LIMIT_RPM, tpm: float = RATE_LIMIT_TPM):
+        """
+        Initialize provider rate limiter.
+
+        Args:
+            rpm: Requests per minute (0 disables)
+            tpm: Input tokens per minute (0 disables)
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.delayed = 0
+        self.waited_seconds = 0.0
+        self.throttled = 0
+
+    def _reserve(self, tokens: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            delay = max(self._paused_until - now, 0.0)
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            self.calls += 1
+            if delay > 0:
+                self.delayed += 1
+                self.waited_seconds += delay
+            return delay
+
+    def _release(self, tokens: int, delay: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._requests is not None:
+                self._requests.release(1, now)
+            if self._tokens is not None:
+                self._tokens.release(tokens, now)
+            self.calls -= 1
+            self.delayed -= 1
+            self.waited_seconds -= delay
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until one request of the given size fits the budgets.
+
+        A caller cancelled while waiting (client gone, losing hedge) returns its reservation.
+
+        Args:
+            tokens: Estimated input tokens of the request
+        """
+        delay = self._reserve(tokens)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._release(tokens, delay)
+                raise
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller for a while (after the provider answered 429).
+
+        Args:
+            seconds: Pause length
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.throttled += 1
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0):
+        """
+        Acquire budget for one provider call and pause the account if the call is rate limited anyway.
+
+        Args:
+            tokens: Estimated input tokens of the request
+        """
+        await self.acquire(tokens)
+        try:
+            yield
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                self.pause(retry_after_seconds(e) or _DEFAULT_RETRY_AFTER)
+            raise
+
+    def stats(self) -> dict:
+        """
+        Get limits and throttling counters.
+
+        Returns:
+            dict: Limits, calls, delayed calls, total wait and provider 429 count
+        """
+        with self._lock:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "calls": self.calls,
+                "delayed": self.delayed,
+                "waited_seconds": round(self.waited_seconds, 3),
+                "throttled": self.throttled,
+                "paused_for_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 3),
+            }
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After header of a provider error response.
+
+    Args:
+        error: Provider exception (e.g. openai.RateLimitError)
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or not a number
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name in ("retry-after-ms", "retry-after"):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        return seconds / 1000 if name == "retry-after-ms" else seconds
+    return None
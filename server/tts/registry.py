@@ -0,0 +1,293 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from system.health import register_circuit_source
+from tts.providers import TTSProvider, TTSProviderFactory
+from tts.ratelimit import ProviderRateLimiter
+from tts.resilience import ResilientProvider
+from tts.routing import RouteBackend, RoutedProvider, load_routes
+
+
+# Connection pool shared by all requests to one provider instance
+POOL_MAX_CONNECTIONS = int(os.getenv("TTS_POOL_MAX_CONNECTIONS", "100"))
+POOL_MAX_KEEPALIVE = int(os.getenv("TTS_POOL_MAX_KEEPALIVE", "20"))
+# Idle connections are kept this long so the next call skips the TCP/TLS handshake
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("TTS_POOL_KEEPALIVE_EXPIRY", "60"))
+# Comma-separated channels whose default provider is created and connected at startup
+WARMUP_CHANNELS = [c.strip() for c in os.getenv("TTS_WARMUP_CHANNELS", "openai").split(",") if c.strip()]
+WARMUP_TIMEOUT = float(os.getenv("TTS_WARMUP_TIMEOUT", "10"))
+
+# Number of recent calls kept per channel and operation for latency percentiles
+_LATENCY_WINDOW = 200
+
+
+class ProviderLatencyStats:
+    """Rolling latency and error counters per provider channel and operation"""
+
+    def __init__(self, window: int = _LATENCY_WINDOW):
+        """
+        Initialize latency stats.
+
+        Args:
+            window: Number of recent successful calls kept for percentiles
+        """
+        self.window = window
+        self._series: Dict[Tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, channel: str, operation: str) -> dict:
+        key = (channel, operation)
+        if key not in self._series:
+            self._series[key] = {"calls": 0, "errors": 0, "samples": deque(maxlen=self.window)}
+        return self._series[key]
+
+    def record(self, channel: str, operation: str, seconds: float, ok: bool = True) -> None:
+        """
+        Record one provider call.
+
+        Args:
+            channel: Provider channel
+            operation: Provider operation (synthesize, transcribe, ...)
+            seconds: Call duration
+            ok: Whether the call succeeded (only successful calls count toward latency)
+        """
+        with self._lock:
+            entry = self._entry(channel, operation)
+            entry["calls"] += 1
+            if ok:
+                entry["samples"].append(seconds)
+            else:
+                entry["errors"] += 1
+
+    @asynccontextmanager
+    async def measure(self, channel: str, operation: str):
+        """
+        Time an async block as one provider call; exceptions count as errors.
+
+        Args:
+            channel: Provider channel
+            operation: Provider operation
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(channel, operation, time.perf_counter() - started_at, ok=False)
+            raise
+        self.record(channel, operation, time.perf_counter() - started_at)
+
+    def stats(self) -> dict:
+        """
+        Get latency summary.
+
+        Returns:
+            dict: Channel -> operation -> calls, errors, avg/p50/p95/max seconds over the window
+        """
+        result = {}
+        with self._lock:
+            for (channel, operation), entry in self._series.items():
+                samples = sorted(entry["samples"])
+                summary = {"calls": entry["calls"], "errors": entry["errors"]}
+                if samples:
+                    summary.update({
+                        "avg_seconds": round(sum(samples) / len(samples), 4),
+                        "p50_seconds": round(samples[len(samples) // 2], 4),
+                        "p95_seconds": round(samples[min(int(0.95 * len(samples)), len(samples) - 1)], 4),
+                        "max_seconds": round(samples[-1], 4),
+                    })
+                result.setdefault(channel, {})[operation] = summary
+        return result
+
+
+class TTSProviderRegistry:
+    """
+    Long-lived provider instances, one per channel and credentials, each with a keep-alive connection pool.
+
+    Providers are handed out wrapped in ResilientProvider (rate limiting, retries, hedging, circuit breaker),
+    so callers make plain provider calls. Their circuits are reported by the health endpoints as tts.<channel>.
+    Channels with a TTS_ROUTES pool get a RoutedProvider spreading calls over the pool's accounts instead.
+    """
+
+    def __init__(self, pool_limits: httpx.Limits, routes: Optional[dict] = None):
+        """
+        Initialize provider registry.
+
+        Args:
+            pool_limits: Connection pool limits passed to every provider
+            routes: Channel -> backend specs from parse_routes() (defaults to TTS_ROUTES)
+        """
+        self.pool_limits = pool_limits
+        self.routes = load_routes() if routes is None else routes
+        self.latency = ProviderLatencyStats()
+        self._providers: Dict[tuple, ResilientProvider] = {}
+        self._routers: Dict[str, RoutedProvider] = {}
+        self._limiters: Dict[tuple, ProviderRateLimiter] = {}
+        self._lock = threading.Lock()
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.warmed_up = {}
+
+    @staticmethod
+    def _key(channel: str, credentials: dict) -> tuple:
+        return (channel.lower(), tuple(sorted(credentials.items())))
+
+    def get_provider(self, channel: str, **credentials) -> TTSProvider:
+        """
+        Get the shared provider for a channel, creating it on first use.
+
+        Without explicit credentials, a channel configured in TTS_ROUTES gets the router over its pool.
+
+        Args:
+            channel: Provider channel name
+            **credentials: Provider initialization parameters (api_key, base_url, ...)
+
+        Returns:
+            TTSProvider: Shared resilient or routed provider instance (do not close it)
+
+        Raises:
+            ValueError: If channel is not supported
+        """
+        if not credentials and channel.lower() in self.routes:
+            return self._get_router(channel.lower())
+        return self._get_account(channel, credentials)
+
+    def _get_account(self, channel: str, credentials: dict, name: Optional[str] = None,
+                     **options) -> ResilientProvider:
+        key = self._key(channel, credentials)
+        provider = self._providers.get(key)
+        if provider is not None:
+            return provider
+        limiter = self.get_limiter(channel, **credentials)
+        with self._lock:
+            provider = self._providers.get(key)
+            if provider is None:
+                # Retries are done by the wrapper (with backoff, circuit and rate limiter), not by the SDK
+                inner = TTSProviderFactory.create_provider(
+                    channel, pool_limits=self.pool_limits, max_retries=0, **credentials
+                )
+                if name is None:
+                    count = sum(1 for c, _ in self._providers if c == key[0])
+                    name = f"tts.{key[0]}" if count == 0 else f"tts.{key[0]}.{count + 1}"
+                provider = ResilientProvider(inner, name, limiter=limiter, **options)
+                register_circuit_source(name, provider.breaker.state)
+                self._providers[key] = provider
+        return provider
+
+    def _get_router(self, route: str) -> RoutedProvider:
+        router = self._routers.get(route)
+        if router is not None:
+            return router
+        backends = []
+        for spec in self.routes[route]:
+            # The router retries by failing over between backends, so each backend makes a single attempt
+            provider = self._get_account(
+                spec["channel"], spec["credentials"], name=f"tts.{route}.{spec['name']}", max_attempts=1
+            )
+            backends.append(RouteBackend(spec["name"], provider, voices=spec["voices"], models=spec["models"]))
+        with self._lock:
+            return self._routers.setdefault(route, RoutedProvider(route, backends))
+
+    def get_limiter(self, channel: str, **credentials) -> ProviderRateLimiter:
+        """
+        Get the rate limiter of a provider account (same channel and credentials as get_provider()).
+
+        Args:
+            channel: Provider channel name
+            **credentials: Provider initialization parameters (api_key, base_url, ...)
+
+        Returns:
+            ProviderRateLimiter: Shared limiter with the TTS_RATE_LIMIT_* budgets
+        """
+        key = self._key(channel, credentials)
+        limiter = self._limiters.get(key)
+        if limiter is not None:
+            return limiter
+        with self._lock:
+            return self._limiters.setdefault(key, ProviderRateLimiter())
+
+    async def _warm_up(self, channels: list) -> None:
+        for channel in channels:
+            started_at = time.perf_counter()
+            try:
+                provider = self.get_provider(channel)
+                await asyncio.wait_for(provider.warm_up(), timeout=WARMUP_TIMEOUT)
+                self.warmed_up[channel] = round(time.perf_counter() - started_at, 3)
+                print(f"TTS provider warmed up: {channel} ({self.warmed_up[channel]}s)")
+            except Exception as e:
+                # The first request will connect on demand instead
+                print(f"Warning: TTS provider warm-up failed ({channel}): {e!r}")
+
+    def start_warm_up(self, channels: list = None) -> None:
+        """
+        Create the default providers and open their connections in the background (called from the app lifespan).
+
+        Args:
+            channels: Channels to warm up (defaults to TTS_WARMUP_CHANNELS)
+        """
+        channels = WARMUP_CHANNELS if channels is None else channels
+        if channels and (self._warmup_task is None or self._warmup_task.done()):
+            self._warmup_task = asyncio.get_running_loop().create_task(self._warm_up(channels))
+
+    async def aclose(self) -> None:
+        """
+        Close every pooled provider (called on shutdown).
+        """
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        with self._lock:
+            providers = list(self._providers.values())
+            self._providers.clear()
+            self._routers.clear()
+        for provider in providers:
+            try:
+                await provider.aclose()
+            except Exception as e:
+                print(f"Warning: failed to close TTS provider: {e!r}")
+
+    def stats(self) -> dict:
+        """
+        Get pool configuration, pooled providers, rate limits, retry/hedge/circuit counters, routing state
+        and provider-side latency.
+
+        Returns:
+            dict: Registry state
+        """
+        with self._lock:
+            instances = {}
+            for channel, _ in self._providers:
+                instances[channel] = instances.get(channel, 0) + 1
+            rate_limits = {}
+            for (channel, _), limiter in self._limiters.items():
+                rate_limits.setdefault(channel, []).append(limiter.stats())
+            resilience = {}
+            for (channel, _), provider in self._providers.items():
+                resilience.setdefault(channel, []).append(provider.stats())
+            routers = dict(self._routers)
+        return {
+            "pool": {
+                "max_connections": self.pool_limits.max_connections,
+                "max_keepalive_connections": self.pool_limits.max_keepalive_connections,
+                "keepalive_expiry": self.pool_limits.keepalive_expiry,
+            },
+            "instances": instances,
+            "warmed_up": dict(self.warmed_up),
+            "rate_limits": rate_limits,
+            "resilience": resilience,
+            "routes": {route: router.stats() for route, router in routers.items()},
+            "latency": self.latency.stats(),
+        }
+
+
+provider_registry = TTSProviderRegistry(
+    httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    )
+)
@@ -0,0 +1,447 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from tts.providers import TTSProvider
+from tts.ratelimit import ProviderRateLimiter, estimate_tokens, retry_after_seconds
+
+
+# Attempts per provider call (first try included) on 429, 5xx, timeouts and connection errors
+RETRY_ATTEMPTS = int(os.getenv("TTS_RETRY_ATTEMPTS", "3"))
+# Full-jitter exponential backoff: sleep uniform(0, min(max, base * 2^attempt)), at least Retry-After
+RETRY_BASE_DELAY = float(os.getenv("TTS_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("TTS_RETRY_MAX_DELAY", "8"))
+
+# Fire a duplicate request when a call runs past this percentile of recent latencies for similar input
+HEDGE_ENABLED = os.getenv("TTS_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("TTS_HEDGE_PERCENTILE", "95"))
+# Never hedge earlier than this, and only once this many latencies of the size class are known
+HEDGE_MIN_DELAY = float(os.getenv("TTS_HEDGE_MIN_DELAY", "1.0"))
+HEDGE_MIN_SAMPLES = int(os.getenv("TTS_HEDGE_MIN_SAMPLES", "20"))
+# Extra spend cap: hedges may add at most this share of calls (plus a small burst)
+HEDGE_BUDGET_RATIO = float(os.getenv("TTS_HEDGE_BUDGET_RATIO", "0.1"))
+_HEDGE_BUDGET_BURST = 5.0
+
+# Consecutive failed calls that open the circuit, and how long it stays open before a probe call
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("TTS_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("TTS_CIRCUIT_RESET_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Latency samples kept per operation and size class
+_DEADLINE_WINDOW = 200
+
+
+def backoff_delay(attempt: int, error: Exception) -> float:
+    """
+    Full-jitter exponential backoff before the next attempt.
+
+    Args:
+        attempt: Zero-based number of the attempt that failed
+        error: Exception of the failed attempt (its Retry-After header is honoured)
+
+    Returns:
+        float: Seconds to wait
+    """
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    return max(delay, retry_after_seconds(error) or 0.0)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    status_code = 503
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"TTS provider {name} is unavailable (circuit open), retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    Opens after CIRCUIT_FAILURE_THRESHOLD consecutive transient failures, rejects calls while open, then
+    lets a single probe call through (half-open) and closes again when it succeeds.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_SECONDS):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            name: Provider name used in errors and health output
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe call
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened_total = 0
+        self.rejected_total = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Admit one call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe already in flight
+        """
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == CLOSED or (self._state == HALF_OPEN and not self._probing):
+                self._probing = self._state == HALF_OPEN
+                return
+            self.rejected_total += 1
+            retry_after = max(self.reset_timeout - (time.monotonic() - self._opened_at), 1.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy provider (client errors count too)."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a transient failure (5xx, timeout, connection error)."""
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened_total += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled before it finished (e.g. a hedge that lost)."""
+        with self._lock:
+            self._probing = False
+
+    def state(self) -> dict:
+        """
+        Get the circuit state for the health endpoints.
+
+        Returns:
+            dict: state, consecutive failures, open/reject counters and seconds until the next probe
+        """
+        with self._lock:
+            state = self._state
+            if state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                state = HALF_OPEN
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened_total": self.opened_total,
+                "rejected_total": self.rejected_total,
+                "retry_in_seconds": round(max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0), 1)
+                if state == OPEN else 0.0,
+            }
+
+
+class HedgeDeadlines:
+    """Recent call latencies per operation and input size class, giving the percentile deadline for hedging"""
+
+    def __init__(self, percentile: float = HEDGE_PERCENTILE, min_delay: float = HEDGE_MIN_DELAY,
+                 min_samples: int = HEDGE_MIN_SAMPLES, window: int = _DEADLINE_WINDOW):
+        """
+        Initialize hedge deadlines.
+
+        Args:
+            percentile: Latency percentile after which a call is hedged
+            min_delay: Lower bound of the deadline in seconds
+            min_samples: Samples required in a size class before it is hedged
+            window: Samples kept per size class
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self._samples: Dict[Tuple[str, int], deque] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def size_class(size: int) -> int:
+        """Power-of-two bucket of the input size (characters or bytes); latency grows with input length."""
+        return max(int(size), 1).bit_length()
+
+    def record(self, operation: str, size: int, seconds: float) -> None:
+        """
+        Record the latency of a successful call.
+
+        Args:
+            operation: Provider operation
+            size: Input size
+            seconds: Call duration
+        """
+        key = (operation, self.size_class(size))
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def deadline(self, operation: str, size: int) -> Optional[float]:
+        """
+        Get the hedge deadline for a call.
+
+        Args:
+            operation: Provider operation
+            size: Input size
+
+        Returns:
+            float: Seconds after which to hedge, or None if too few samples are known
+        """
+        with self._lock:
+            samples = self._samples.get((operation, self.size_class(size)))
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+        return max(ordered[index], self.min_delay)
+
+
+class ResilientProvider(TTSProvider):
+    """
+    Wraps a provider with per-account rate limiting, jittered retries, hedged requests and a circuit breaker.
+
+    Every provider request (retries and hedges included) goes through the rate limiter and the circuit
+    breaker. A call running past the percentile deadline of similar calls gets one duplicate request,
+    first success wins and the other is cancelled; hedges are capped at HEDGE_BUDGET_RATIO of calls.
+    The registry hands out providers wrapped this way.
+    """
+
+    def __init__(self, provider: TTSProvider, name: str, limiter: Optional[ProviderRateLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None, max_attempts: int = RETRY_ATTEMPTS,
+                 hedging: bool = HEDGE_ENABLED):
+        """
+        Initialize resilient provider.
+
+        Args:
+            provider: Provider making the actual requests (created without client-side retries)
+            name: Provider name for errors and health output
+            limiter: Rate limiter of the provider account (None for no limit)
+            breaker: Circuit breaker (a new one if not given)
+            max_attempts: Attempts per call, first try included
+            hedging: Whether slow calls are hedged
+        """
+        self.provider = provider
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker or CircuitBreaker(name)
+        self.max_attempts = max(max_attempts, 1)
+        self.hedging = hedging
+        self.deadlines = HedgeDeadlines()
+        self.PCM_SAMPLE_RATE = provider.PCM_SAMPLE_RATE
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._hedge_budget = _HEDGE_BUDGET_BURST
+        self._lock = threading.Lock()
+
+    def is_transient_error(self, error: Exception) -> bool:
+        return self.provider.is_transient_error(error)
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self._hedge_budget < 1:
+                return False
+            self._hedge_budget -= 1
+            self.hedges += 1
+            return True
+
+    async def _attempt(self, request: Callable[[], Awaitable], tokens: Optional[int],
+                       sent: Optional[asyncio.Event] = None):
+        """
+        One provider request through the circuit breaker and, for speech (tokens given), the rate limiter.
+        sent is set once the request leaves the rate limiter.
+        """
+        self.breaker.before_call()
+        try:
+            if tokens is not None and self.limiter is not None:
+                async with self.limiter.limit(tokens):
+                    if sent is not None:
+                        sent.set()
+                    result = await request()
+            else:
+                if sent is not None:
+                    sent.set()
+                result = await request()
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception as e:
+            # Rate limits say nothing about provider health; client errors mean it answered
+            status = getattr(e, "status_code", None)
+            if self.is_transient_error(e) and status != 429:
+                self.breaker.record_failure()
+            elif status == 429:
+                self.breaker.abandon()
+            else:
+                self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _first_success(self, tasks: list):
+        """Wait for the first task that succeeds and cancel the rest; raise the primary's error if all fail."""
+        pending = set(tasks)
+        errors = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    errors[task] = task.exception()
+            raise errors.get(tasks[0]) or next(iter(errors.values()))
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _hedged(self, operation: str, size: int, request: Callable[[int], Awaitable],
+                      tokens: Optional[int]):
+        sent = asyncio.Event()
+        primary = asyncio.ensure_future(self._attempt(lambda: request(0), tokens, sent))
+        deadline = self.deadlines.deadline(operation, size) if self.hedging else None
+        try:
+            # Time spent waiting for the rate limiter is not provider latency
+            waiting = asyncio.ensure_future(sent.wait())
+            await asyncio.wait({primary, waiting}, return_when=asyncio.FIRST_COMPLETED)
+            waiting.cancel()
+            started_at = time.monotonic()
+            if deadline is not None:
+                await asyncio.wait({primary}, timeout=deadline)
+            if primary.done() or deadline is None or not self._take_hedge():
+                result = await primary
+            else:
+                hedge = asyncio.ensure_future(self._attempt(lambda: request(1), tokens))
+                result = await self._first_success([primary, hedge])
+        finally:
+            if not primary.done():
+                primary.cancel()
+                await asyncio.gather(primary, return_exceptions=True)
+        self.deadlines.record(operation, size, time.monotonic() - started_at)
+        return result
+
+    async def _call(self, operation: str, size: int, request: Callable[[int], Awaitable],
+                    tokens: Optional[int] = None):
+        """
+        Run a provider call with hedging and retries.
+
+        Args:
+            operation: Provider operation (for hedge deadlines)
+            size: Input size (for hedge deadlines)
+            request: Makes the request; its argument is 0 for the primary and 1 for the hedge
+            tokens: Estimated input tokens charged to the rate limiter (None for no rate limit)
+        """
+        with self._lock:
+            self.calls += 1
+            self._hedge_budget = min(self._hedge_budget + HEDGE_BUDGET_RATIO, _HEDGE_BUDGET_BURST)
+        for attempt in range(self.max_attempts):
+            try:
+                return await self._hedged(operation, size, request, tokens)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if attempt == self.max_attempts - 1 or not self.is_transient_error(e):
+                    raise
+                with self._lock:
+                    self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, e))
+
+    async def synthesize(self, text: str, voice: str, output_path: Path, **kwargs) -> Path:
+        output_path = Path(output_path)
+        parts = [output_path.with_name(f".{output_path.name}.{i}.part") for i in range(2)]
+
+        async def request(i: int) -> Path:
+            # Primary and hedge write separate files; the winner is moved into place
+            await self.provider.synthesize(text=text, voice=voice, output_path=parts[i], **kwargs)
+            return parts[i]
+
+        tokens = estimate_tokens(text) + estimate_tokens(kwargs.get("instructions"))
+        try:
+            part = await self._call("synthesize", len(text), request, tokens)
+            os.replace(part, output_path)
+        finally:
+            for part in parts:
+                part.unlink(missing_ok=True)
+        return output_path
+
+    async def stream(self, text: str, voice: str, **kwargs) -> AsyncIterator[bytes]:
+        # Only the request up to the first chunk is retried (nothing has been sent yet); no hedging
+        tokens = estimate_tokens(text) + estimate_tokens(kwargs.get("instructions"))
+        with self._lock:
+            self.calls += 1
+        for attempt in range(self.max_attempts):
+            audio = self.provider.stream(text, voice, **kwargs)
+            try:
+                first_chunk = await self._attempt(audio.__anext__, tokens)
+                break
+            except StopAsyncIteration:
+                await audio.aclose()
+                return
+            except Exception as e:
+                await audio.aclose()
+                if isinstance(e, CircuitOpenError) or attempt == self.max_attempts - 1 \
+                        or not self.is_transient_error(e):
+                    raise
+                with self._lock:
+                    self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, e))
+        try:
+            yield first_chunk
+            async for chunk in audio:
+                yield chunk
+        except Exception as e:
+            if self.is_transient_error(e):
+                self.breaker.record_failure()
+            raise
+        finally:
+            await audio.aclose()
+
+    async def transcribe(self, audio_path: Path, response_format: str = 'srt') -> str:
+        size = Path(audio_path).stat().st_size
+        return await self._call(
+            "transcribe", size, lambda i: self.provider.transcribe(audio_path, response_format=response_format)
+        )
+
+    async def warm_up(self) -> None:
+        await self.provider.warm_up()
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+    def stats(self) -> dict:
+        """
+        Get retry, hedging and circuit counters.
+
+        Returns:
+            dict: calls, retries, hedges, hedge wins and circuit state
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "circuit": self.breaker.state(),
+            }
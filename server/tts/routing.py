@@ -0,0 +1,318 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from tts.providers import TTSProvider
+from tts.resilience import RETRY_ATTEMPTS, CircuitOpenError, backoff_delay
+
+
+# Provider pools per request channel, as JSON, e.g.
+# {"openai": [{"name": "primary"}, {"name": "backup", "api_key_env": "BACKUP_OPENAI_API_KEY", "base_url": "..."}]}
+# Backends may set channel (defaults to the pool's), api_key or api_key_env, base_url, and voices / models maps
+ROUTES_JSON = os.getenv("TTS_ROUTES", "")
+# Weight of the newest call in the per-backend latency and error moving averages
+ROUTE_EWMA_ALPHA = float(os.getenv("TTS_ROUTE_EWMA_ALPHA", "0.2"))
+# Share of calls sent to a random backend first, so a recovered backend is noticed
+ROUTE_EXPLORE_RATIO = float(os.getenv("TTS_ROUTE_EXPLORE_RATIO", "0.05"))
+# The error average halves over this many seconds without calls, so a failed backend that gets no traffic
+# is tried again
+ROUTE_ERROR_HALF_LIFE = float(os.getenv("TTS_ROUTE_ERROR_HALF_LIFE", "30"))
+
+# Latency is compared per this many input characters (shorter texts count as this long)
+_LATENCY_UNIT_CHARS = 100
+
+
+def parse_routes(raw: str) -> Dict[str, List[dict]]:
+    """
+    Parse the TTS_ROUTES configuration.
+
+    Args:
+        raw: JSON object mapping request channels to lists of backends
+
+    Returns:
+        dict: Channel -> backend specs with name, channel, credentials, voices and models
+
+    Raises:
+        ValueError: If the configuration is malformed
+    """
+    if not raw.strip():
+        return {}
+    config = json.loads(raw)
+    if not isinstance(config, dict):
+        raise ValueError("TTS_ROUTES must be a JSON object mapping channels to lists of backends")
+    routes = {}
+    for channel, backends in config.items():
+        if not isinstance(backends, list) or not backends:
+            raise ValueError(f"TTS_ROUTES[{channel!r}] must be a non-empty list of backends")
+        specs = []
+        for index, backend in enumerate(backends):
+            if not isinstance(backend, dict):
+                raise ValueError(f"TTS_ROUTES[{channel!r}][{index}] must be an object")
+            credentials = {k: backend[k] for k in ("api_key", "base_url") if backend.get(k)}
+            if backend.get("api_key_env"):
+                credentials["api_key"] = os.getenv(backend["api_key_env"])
+            specs.append({
+                "name": str(backend.get("name") or index + 1),
+                "channel": str(backend.get("channel") or channel).lower(),
+                "credentials": credentials,
+                "voices": backend.get("voices"),
+                "models": backend.get("models"),
+            })
+        names = [spec["name"] for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"TTS_ROUTES[{channel!r}] has duplicate backend names")
+        routes[channel.lower()] = specs
+    return routes
+
+
+def load_routes() -> Dict[str, List[dict]]:
+    """
+    Load TTS_ROUTES, ignoring it with a warning if it is malformed.
+
+    Returns:
+        dict: Channel -> backend specs (empty if routing is not configured)
+    """
+    try:
+        return parse_routes(ROUTES_JSON)
+    except ValueError as e:
+        print(f"Warning: ignoring invalid TTS_ROUTES: {e}")
+        return {}
+
+
+class RouteBackend:
+    """One provider account of a route, with live latency and error moving averages"""
+
+    def __init__(self, name: str, provider: TTSProvider, voices: Optional[dict] = None,
+                 models: Optional[dict] = None, alpha: float = ROUTE_EWMA_ALPHA):
+        """
+        Initialize route backend.
+
+        Args:
+            name: Backend name within the route
+            provider: Provider making the calls (a ResilientProvider from the registry)
+            voices: Requested voice -> this backend's equivalent voice; if given, only these voices are served
+            models: Requested model -> this backend's model
+            alpha: Weight of the newest call in the moving averages
+        """
+        self.name = name
+        self.provider = provider
+        self.voices = voices
+        self.models = models
+        self.alpha = alpha
+        # Seconds per _LATENCY_UNIT_CHARS of input, None until the first successful synthesis
+        self.latency: Optional[float] = None
+        self._error_rate = 0.0
+        self._error_updated_at = time.monotonic()
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+
+    def serves(self, voice: Optional[str]) -> bool:
+        return voice is None or not self.voices or voice in self.voices
+
+    def translate(self, voice: str, kwargs: dict) -> tuple:
+        """Map the requested voice and model to this backend's equivalents."""
+        if self.voices:
+            voice = self.voices.get(voice, voice)
+        if self.models and kwargs.get("model") in self.models:
+            kwargs = {**kwargs, "model": self.models[kwargs["model"]]}
+        return voice, kwargs
+
+    def circuit_state(self) -> str:
+        breaker = getattr(self.provider, "breaker", None)
+        return breaker.state()["state"] if breaker is not None else "closed"
+
+    @property
+    def error_rate(self) -> float:
+        idle = time.monotonic() - self._error_updated_at
+        return self._error_rate * 0.5 ** (idle / ROUTE_ERROR_HALF_LIFE) if ROUTE_ERROR_HALF_LIFE > 0 else self._error_rate
+
+    def score(self, default_latency: float) -> float:
+        """
+        Expected cost of the next call; lower is better.
+
+        Latency per unit of text, multiplied by the calls already in flight and inflated by the recent error rate.
+        """
+        latency = self.latency if self.latency is not None else default_latency
+        return latency * (1 + self.in_flight) / max(1.0 - self.error_rate, 0.05)
+
+    def finish(self, ok: Optional[bool], seconds: Optional[float] = None, chars: Optional[int] = None) -> None:
+        """
+        Record the end of a call. Caller holds the router lock.
+
+        Args:
+            ok: True for success, False for a provider failure, None for errors that say nothing about the backend
+            seconds: Duration of a successful synthesis (updates the latency average)
+            chars: Input characters of that synthesis
+        """
+        self.in_flight -= 1
+        if ok is None:
+            return
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self._error_rate = self.error_rate + self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        self._error_updated_at = time.monotonic()
+        if ok and seconds is not None and chars is not None:
+            sample = seconds * _LATENCY_UNIT_CHARS / max(chars, _LATENCY_UNIT_CHARS)
+            self.latency = sample if self.latency is None else self.latency + self.alpha * (sample - self.latency)
+
+
+class RoutedProvider(TTSProvider):
+    """
+    Spreads calls for one channel over several equivalent providers or accounts.
+
+    Each call goes to the backend with the lowest expected cost (latency EWMA per unit of text, calls in flight,
+    error EWMA); backends with an open circuit go last. Transient failures fail over to the next backend, and
+    once every backend has failed, the router backs off before going round again. The registry returns a
+    RoutedProvider for channels configured in TTS_ROUTES.
+    """
+
+    def __init__(self, channel: str, backends: List[RouteBackend], attempts: int = RETRY_ATTEMPTS,
+                 explore: float = ROUTE_EXPLORE_RATIO):
+        """
+        Initialize routed provider.
+
+        Args:
+            channel: Request channel the route serves
+            backends: Backends of the route
+            attempts: Attempts per call across backends (at least one per backend)
+            explore: Share of calls that try a random backend first
+        """
+        self.channel = channel
+        self.backends = backends
+        self.attempts = max(attempts, len(backends))
+        self.explore = explore
+        # Chunks of one text may be synthesized by different backends, so they must share the PCM format
+        rates = {backend.provider.PCM_SAMPLE_RATE for backend in backends}
+        self.PCM_SAMPLE_RATE = rates.pop() if len(rates) == 1 else None
+        self.failovers = 0
+        self._lock = threading.Lock()
+
+    def is_transient_error(self, error: Exception) -> bool:
+        return self.backends[0].provider.is_transient_error(error)
+
+    def _ranked(self, voice: Optional[str]) -> List[RouteBackend]:
+        eligible = [backend for backend in self.backends if backend.serves(voice)]
+        if not eligible:
+            raise ValueError(f"No {self.channel} TTS backend serves voice {voice!r}")
+        # Ties are broken randomly
+        random.shuffle(eligible)
+        with self._lock:
+            measured = [backend.latency for backend in eligible if backend.latency is not None]
+            default_latency = min(measured) if measured else 1.0
+            ranked = sorted(eligible, key=lambda b: (b.circuit_state() == "open", b.score(default_latency)))
+        if len(ranked) > 1 and random.random() < self.explore:
+            ranked.insert(0, ranked.pop(random.randrange(1, len(ranked))))
+        return ranked
+
+    async def _route(self, voice: Optional[str], call: Callable[[RouteBackend], Awaitable],
+                     chars: Optional[int] = None):
+        """
+        Run call on the best backend, failing over to the next on transient errors.
+
+        Args:
+            voice: Requested voice (None if any backend will do)
+            call: Makes the provider call on a backend
+            chars: Input characters, to update the backend latency average (None to leave it)
+        """
+        ranked = self._ranked(voice)
+        error = None
+        for attempt in range(self.attempts):
+            backend = ranked[attempt % len(ranked)]
+            if attempt >= len(ranked):
+                # Every backend has failed once; back off before going round again
+                await asyncio.sleep(backoff_delay(attempt - len(ranked), error))
+            with self._lock:
+                backend.in_flight += 1
+            started_at = time.monotonic()
+            try:
+                result = await call(backend)
+            except asyncio.CancelledError:
+                with self._lock:
+                    backend.finish(None)
+                raise
+            except Exception as e:
+                failed = isinstance(e, CircuitOpenError) or backend.provider.is_transient_error(e)
+                with self._lock:
+                    backend.finish(False if failed else None)
+                # Client errors would fail anywhere; a backend without the operation may be skipped
+                if not (failed or isinstance(e, NotImplementedError)) or attempt == self.attempts - 1:
+                    raise
+                error = e
+                if len(ranked) > 1:
+                    with self._lock:
+                        self.failovers += 1
+                continue
+            with self._lock:
+                backend.finish(True, time.monotonic() - started_at, chars)
+            return result
+
+    async def synthesize(self, text: str, voice: str, output_path: Path, **kwargs) -> Path:
+        async def call(backend: RouteBackend) -> Path:
+            backend_voice, backend_kwargs = backend.translate(voice, kwargs)
+            return await backend.provider.synthesize(
+                text=text, voice=backend_voice, output_path=output_path, **backend_kwargs
+            )
+
+        return await self._route(voice, call, chars=len(text))
+
+    async def stream(self, text: str, voice: str, **kwargs) -> AsyncIterator[bytes]:
+        # Fails over only up to the first chunk (nothing has been sent yet)
+        async def start(backend: RouteBackend) -> tuple:
+            backend_voice, backend_kwargs = backend.translate(voice, kwargs)
+            audio = backend.provider.stream(text, backend_voice, **backend_kwargs)
+            try:
+                return audio, await audio.__anext__()
+            except BaseException:
+                await audio.aclose()
+                raise
+
+        try:
+            audio, first_chunk = await self._route(voice, start)
+        except StopAsyncIteration:
+            return
+        try:
+            yield first_chunk
+            async for chunk in audio:
+                yield chunk
+        finally:
+            await audio.aclose()
+
+    async def transcribe(self, audio_path: Path, response_format: str = 'srt') -> str:
+        return await self._route(
+            None, lambda backend: backend.provider.transcribe(audio_path, response_format=response_format)
+        )
+
+    async def warm_up(self) -> None:
+        results = await asyncio.gather(
+            *(backend.provider.warm_up() for backend in self.backends), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+    def stats(self) -> dict:
+        """
+        Get per-backend routing state.
+
+        Returns:
+            dict: failovers and, per backend, latency/error averages, calls in flight, calls, errors and circuit state
+        """
+        with self._lock:
+            backends = [{
+                "name": backend.name,
+                "latency_seconds_per_100_chars": round(backend.latency, 4) if backend.latency is not None else None,
+                "error_rate": round(backend.error_rate, 4),
+                "in_flight": backend.in_flight,
+                "calls": backend.calls,
+                "errors": backend.errors,
+            } for backend in self.backends]
+            failovers = self.failovers
+        for entry, backend in zip(backends, self.backends):
+            entry["circuit"] = backend.circuit_state()
+        return {"failovers": failovers, "backends": backends}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 
@@ -23,13 +23,28 @@ class OpenAIVoice(str, Enum):
     CORAL = "coral"
 
 
+class SubtitleMode(str, Enum):
+    """How subtitle timings are produced"""
+    LOCAL = "local"  # Split the known text into cues and time them from the audio itself
+    WHISPER = "whisper"  # Transcribe the audio with the provider (slower, extra API cost)
+
+
 class TTSRequest(BaseModel):
     """TTS request model"""
     channel: TTSChannel = Field(..., description="TTS provider channel")
     voice: str = Field(..., description="Voice name/ID for the selected channel")
-    text: str = Field(..., min_length=1, max_length=4096, description="Text to convert to speech")
+    text: str = Field(
+        ...,
+        min_length=1,
+        max_length=100000,
+        description="Text to convert to speech (long text is synthesized in parallel chunks)"
+    )
     model: Optional[str] = Field(default="gpt-4o-mini-tts", description="TTS model to use (OpenAI specific)")
     instructions: Optional[str] = Field(default=None, description="Additional instructions for voice tone/style")
+    subtitle_mode: Optional[SubtitleMode] = Field(
+        default=None,
+        description="Subtitle timing: local (no transcription call) or whisper; defaults to TTS_SUBTITLE_MODE"
+    )
     
     class Config:
         json_schema_extra = {
@@ -38,7 +53,8 @@ class TTSRequest(BaseModel):
                 "voice": "coral",
                 "text": "Today is a wonderful day to build something people love!",
                 "model": "gpt-4o-mini-tts",
-                "instructions": "Speak in a cheerful and positive tone."
+                "instructions": "Speak in a cheerful and positive tone.",
+                "subtitle_mode": "local"
             }
         }
 
@@ -74,3 +90,78 @@ class TTSResponse(BaseModel):
             }
         }
 
+
+class TTSStreamStatusResponse(BaseModel):
+    """Streaming TTS status model"""
+    stream_id: str = Field(..., description="Stream ID from the X-TTS-Stream-Id header")
+    status: str = Field(..., description="streaming, finalizing, completed or failed")
+    file_path: Optional[str] = Field(default=None, description="Relative path to the streamed audio file")
+    result: Optional[TTSResponse] = Field(default=None, description="Full TTS result once completed")
+    error: Optional[str] = Field(default=None, description="Error message if failed")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "stream_id": "3f2b9c0d4e5f4a6b8c7d9e0f1a2b3c4d",
+                "status": "completed",
+                "file_path": "uploads/aividfromppt/tts/2025/01/15/abc123.mp3",
+                "result": {
+                    "success": True,
+                    "file_path": "uploads/aividfromppt/tts/2025/01/15/abc123.mp3",
+                    "file_url": "http://example.com/api/v1/tts/files/uploads/aividfromppt/tts/2025/01/15/abc123.mp3",
+                    "duration": 5.2,
+                    "file_size": 83200,
+                    "channel": "openai",
+                    "voice": "coral",
+                    "subtitle_path": "uploads/aividfromppt/tts/2025/01/15/abc123.srt",
+                    "subtitle_url": "http://example.com/api/v1/tts/files/uploads/aividfromppt/tts/2025/01/15/abc123.srt",
+                    "oral_broadcast": "Today is a wonderful day to build something people love!",
+                    "created_at": "2025-01-15 10:30:45"
+                },
+                "error": None
+            }
+        }
+
+
+class TTSBatchItem(BaseModel):
+    """One narration of a batch TTS request"""
+    text: str = Field(..., min_length=1, max_length=100000, description="Text to convert to speech")
+    voice: Optional[str] = Field(default=None, description="Voice override for this item")
+    instructions: Optional[str] = Field(default=None, description="Instructions override for this item")
+
+
+class TTSBatchRequest(BaseModel):
+    """Batch TTS request model (e.g. every slide narration of a deck)"""
+    channel: TTSChannel = Field(..., description="TTS provider channel")
+    voice: str = Field(..., description="Voice name/ID used by items without their own voice")
+    model: Optional[str] = Field(default="gpt-4o-mini-tts", description="TTS model to use (OpenAI specific)")
+    instructions: Optional[str] = Field(default=None, description="Instructions used by items without their own")
+    subtitle_mode: Optional[SubtitleMode] = Field(
+        default=None,
+        description="Subtitle timing: local (no transcription call) or whisper; defaults to TTS_SUBTITLE_MODE"
+    )
+    items: List[TTSBatchItem] = Field(..., min_length=1, max_length=500, description="Narrations in order")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "channel": "openai",
+                "voice": "coral",
+                "model": "gpt-4o-mini-tts",
+                "instructions": "Speak in a clear, friendly teaching tone.",
+                "items": [
+                    {"text": "Welcome to today's lesson."},
+                    {"text": "First, let's look at what machine learning is."},
+                    {"text": "Thanks for watching!", "voice": "nova"}
+                ]
+            }
+        }
+
+
+class TTSBatchItemResult(BaseModel):
+    """Result of one batch item (one NDJSON line of the batch response)"""
+    index: int = Field(..., description="Position of the item in the request")
+    status: str = Field(..., description="completed or failed")
+    result: Optional[TTSResponse] = Field(default=None, description="TTS result if completed")
+    status_code: Optional[int] = Field(default=None, description="HTTP status of the failure")
+    error: Optional[str] = Field(default=None, description="Error message if failed")
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+
+STREAMING = "streaming"
+FINALIZING = "finalizing"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# How often expired records are swept
+_SWEEP_INTERVAL = 600.0
+
+
+class StreamRecordStore:
+    """
+    Status records of streamed syntheses, one JSON file per stream on the shared volume.
+
+    The audio is sent to the client while it is generated; duration, subtitles and caching are
+    finished afterwards and the record is where the client (on any replica) picks them up.
+    """
+
+    def __init__(self, directory: Path, ttl: float):
+        """
+        Initialize stream record store.
+
+        Args:
+            directory: Directory for the records
+            ttl: Seconds a record is kept after its last update
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def _path(self, stream_id: str) -> Path:
+        return self.directory / f"{stream_id}.json"
+
+    def _write(self, record: dict) -> None:
+        path = self._path(record["stream_id"])
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def get(self, stream_id: str) -> Optional[dict]:
+        """
+        Read a stream record.
+
+        Args:
+            stream_id: Stream ID returned in the X-TTS-Stream-Id header
+
+        Returns:
+            dict: Record, or None if unknown or expired
+        """
+        try:
+            with open(self._path(stream_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def create(self, **fields) -> dict:
+        """
+        Create a record in the streaming state.
+
+        Args:
+            **fields: Extra fields stored with the record
+
+        Returns:
+            dict: New record including its stream_id
+        """
+        record = {
+            "stream_id": uuid.uuid4().hex,
+            "status": STREAMING,
+            "created_at": time.time(),
+            "result": None,
+            "error": None,
+            **fields,
+        }
+        self._write(record)
+        self._sweep_expired()
+        return record
+
+    def update(self, stream_id: str, **fields) -> dict:
+        """
+        Update fields of a record.
+
+        Args:
+            stream_id: Stream ID
+            **fields: Fields to set
+
+        Returns:
+            dict: Updated record
+        """
+        with self._lock:
+            record = self.get(stream_id) or {"stream_id": stream_id}
+            record.update(fields)
+            self._write(record)
+            return record
+
+    def _sweep_expired(self) -> None:
+        now = time.time()
+        if now - self._last_sweep < _SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        for path in self.directory.glob("*.json"):
+            try:
+                if now - path.stat().st_mtime > self.ttl:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
@@ -0,0 +1,81 @@
+import re
+from typing import List, Tuple
+
+
+_TIME_LINE = re.compile(
+    r"(\d+):(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{3})"
+)
+
+
+def seconds_to_srt_time(seconds: float) -> str:
+    """
+    Convert seconds to SRT time format.
+
+    Args:
+        seconds: Time in seconds
+
+    Returns:
+        str: Time formatted as 'HH:MM:SS,mmm'
+    """
+    total_ms = max(int(round(seconds * 1000)), 0)
+    h, rest = divmod(total_ms, 3600 * 1000)
+    m, rest = divmod(rest, 60 * 1000)
+    s, ms = divmod(rest, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def parse_srt(srt_text: str) -> List[Tuple[float, float, str]]:
+    """
+    Parse SRT content.
+
+    Args:
+        srt_text: SRT file content
+
+    Returns:
+        list: (start seconds, end seconds, text) cues in file order
+    """
+    cues = []
+    for block in re.split(r"\n\s*\n", srt_text.replace("\r\n", "\n").strip()):
+        lines = block.split("\n")
+        for i, line in enumerate(lines):
+            match = _TIME_LINE.search(line)
+            if match:
+                g = [int(v) for v in match.groups()]
+                start = g[0] * 3600 + g[1] * 60 + g[2] + g[3] / 1000
+                end = g[4] * 3600 + g[5] * 60 + g[6] + g[7] / 1000
+                cues.append((start, end, "\n".join(lines[i + 1:]).strip()))
+                break
+    return cues
+
+
+def format_srt(cues: List[Tuple[float, float, str]]) -> str:
+    """
+    Format cues as SRT content, numbered from 1.
+
+    Args:
+        cues: (start seconds, end seconds, text) cues
+
+    Returns:
+        str: SRT file content
+    """
+    blocks = [
+        f"{number}\n{seconds_to_srt_time(start)} --> {seconds_to_srt_time(end)}\n{text}"
+        for number, (start, end, text) in enumerate(cues, start=1)
+    ]
+    return "\n\n".join(blocks) + "\n" if blocks else ""
+
+
+def merge_srt(parts: List[Tuple[str, float]]) -> str:
+    """
+    Merge per-chunk subtitles into one SRT, shifting each chunk by its start time.
+
+    Args:
+        parts: (SRT content, chunk start offset in seconds) in playback order
+
+    Returns:
+        str: Merged SRT content
+    """
+    cues = []
+    for srt_text, offset in parts:
+        cues.extend((start + offset, end + offset, text) for start, end, text in parse_srt(srt_text))
+    return format_srt(cues)
@@ -0,0 +1,59 @@
+import re
+from typing import Callable, List
+
+
+# Sentence ends: CJK punctuation (with trailing closing quotes/brackets), Latin punctuation followed by
+# whitespace, or line breaks
+SENTENCE_END = re.compile(r"(?<=[。！？；…!?;])[”’」』）)\"']*|(?<=[.!?])[\"')\]]*(?=\s)|\n+")
+# Clause breaks used to split a sentence that is too long
+CLAUSE_END = re.compile(r"(?<=[，、：,:])")
+# CJK ideographs, kana and hangul: one syllable (and roughly one provider token) per character
+CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+# Word boundaries (after whitespace) used to split a clause that is still too long
+WORD_END = re.compile(r"(?<=\s)(?=\S)")
+
+
+def split_at(pattern: re.Pattern, text: str) -> List[str]:
+    """
+    Split text after every match of pattern, dropping blank pieces.
+
+    Args:
+        pattern: Boundary pattern (SENTENCE_END, CLAUSE_END or WORD_END)
+        text: Text to split
+
+    Returns:
+        list: Pieces in order; joined they equal the input text minus blank pieces
+    """
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        end = match.end()
+        if end > start:
+            pieces.append(text[start:end])
+            start = end
+    pieces.append(text[start:])
+    return [p for p in pieces if p.strip()]
+
+
+def pack(pieces: List[str], target: int, measure: Callable[[str], int] = len) -> List[str]:
+    """
+    Greedily join consecutive pieces into groups of at most target size.
+
+    Args:
+        pieces: Pieces in order
+        target: Maximum size of a group (a single larger piece forms its own group)
+        measure: Size of a piece, characters by default
+
+    Returns:
+        list: Joined groups in order
+    """
+    groups = []
+    current = ""
+    for piece in pieces:
+        if current and measure(current) + measure(piece) > target:
+            groups.append(current)
+            current = ""
+        current += piece
+    if current:
+        groups.append(current)
+    return groups
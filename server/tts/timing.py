@@ -0,0 +1,284 @@
+import asyncio
+import math
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from tts.schemas import SubtitleMode
+from tts.subtitles import format_srt
+from tts.text import CJK, CLAUSE_END, SENTENCE_END, WORD_END, pack, split_at
+
+
+# Subtitle timing when the request does not choose: local (no transcription call) or whisper
+DEFAULT_SUBTITLE_MODE = SubtitleMode(os.getenv("TTS_SUBTITLE_MODE", SubtitleMode.LOCAL.value))
+# Maximum display width of one subtitle cue (CJK characters count as 2)
+SUBTITLE_MAX_CUE_WIDTH = int(os.getenv("TTS_SUBTITLE_MAX_CUE_WIDTH", "48"))
+# Snap cue boundaries to pauses detected in the decoded audio
+SUBTITLE_SILENCE_REFINE = os.getenv("TTS_SUBTITLE_SILENCE_REFINE", "true").lower() in ("1", "true", "yes")
+
+# Sample rate audio is decoded at for silence detection
+ANALYSIS_SAMPLE_RATE = 16000
+# Silence detection: 20ms RMS frames, quieter than -35 dB below the loud (95th percentile) frames, at least 150ms
+_FRAME_SECONDS = 0.02
+_SILENCE_DB = -35.0
+_MIN_SILENCE_SECONDS = 0.15
+
+# Pause after a cue, in syllables, by its closing punctuation
+_SENTENCE_PAUSE = 1.5
+_CLAUSE_PAUSE = 0.6
+
+_WORD = re.compile(r"[^\W\d_]+|\d+")
+_VOWEL_GROUP = re.compile(r"[aeiouyàáâäæãåāèéêëēìíîïīòóôöœõōùúûüū]+")
+
+
+def _char_width(char: str) -> int:
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+def text_width(text: str) -> int:
+    """Display width of text (CJK characters count as 2)."""
+    return sum(_char_width(c) for c in text)
+
+
+def _hard_cut(text: str, max_width: int) -> List[str]:
+    parts = []
+    current = ""
+    for char in text:
+        if current and text_width(current) + _char_width(char) > max_width:
+            parts.append(current)
+            current = ""
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _split_cues(text: str, max_width: int) -> List[Tuple[str, float]]:
+    """(cue text, pause weight after it) in reading order"""
+    cues = []
+    for sentence in split_at(SENTENCE_END, text):
+        if text_width(sentence.strip()) <= max_width:
+            cues.append((sentence.strip(), _SENTENCE_PAUSE))
+            continue
+        pieces = []
+        for clause in split_at(CLAUSE_END, sentence):
+            if text_width(clause) <= max_width:
+                pieces.append(clause)
+                continue
+            for word in split_at(WORD_END, clause):
+                pieces.extend(_hard_cut(word, max_width) if text_width(word) > max_width else [word])
+        groups = [group.strip() for group in pack(pieces, max_width, measure=text_width)]
+        for i, group in enumerate(groups):
+            if i == len(groups) - 1:
+                pause = _SENTENCE_PAUSE
+            elif CLAUSE_END.search(group[-1:] + " "):
+                pause = _CLAUSE_PAUSE
+            else:
+                pause = 0.0
+            cues.append((group, pause))
+    return [(cue, pause) for cue, pause in cues if cue]
+
+
+def split_cues(text: str, max_width: int = SUBTITLE_MAX_CUE_WIDTH) -> List[str]:
+    """
+    Split narration text into subtitle cues.
+
+    Every sentence starts a new cue; sentences wider than max_width are split at clause breaks,
+    then between words, then hard-cut.
+
+    Args:
+        text: Narration text
+        max_width: Maximum display width of a cue
+
+    Returns:
+        list: Cue texts in reading order, whitespace-trimmed
+    """
+    return [cue for cue, _ in _split_cues(text, max_width)]
+
+
+def speech_weight(text: str) -> float:
+    """
+    Estimate how long text takes to read, in syllables.
+
+    CJK characters count as one syllable, Latin words by vowel groups, numbers per digit.
+
+    Args:
+        text: Cue text
+
+    Returns:
+        float: Estimated syllable count (at least 1)
+    """
+    syllables = len(CJK.findall(text))
+    for word in _WORD.findall(CJK.sub(" ", text)):
+        if word.isdigit():
+            syllables += len(word)
+        else:
+            syllables += max(len(_VOWEL_GROUP.findall(word.lower())), 1)
+    return float(max(syllables, 1))
+
+
+def _allocate(weights: List[float], pauses: List[float], start: float, end: float) -> List[Tuple[float, float]]:
+    """Spread cues over [start, end] in proportion to their weights, leaving pauses between them."""
+    total = sum(weights) + sum(pauses[:-1])
+    scale = max(end - start, 0.0) / total
+    spans = []
+    cursor = start
+    for i, weight in enumerate(weights):
+        cue_end = cursor + weight * scale
+        spans.append((cursor, cue_end))
+        cursor = cue_end + (pauses[i] * scale if i < len(weights) - 1 else 0.0)
+    return spans
+
+
+def detect_silences(samples: np.ndarray, sample_rate: int) -> List[Tuple[float, float]]:
+    """
+    Find pauses in mono audio with a frame energy threshold.
+
+    Args:
+        samples: Mono samples (any numeric dtype)
+        sample_rate: Sample rate of samples
+
+    Returns:
+        list: (start, end) seconds of each pause, in order; leading and trailing silence are
+        included regardless of their length
+    """
+    frame = max(int(sample_rate * _FRAME_SECONDS), 1)
+    count = len(samples) // frame
+    if count == 0:
+        return []
+    frames = samples[:count * frame].astype(np.float32).reshape(count, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    reference = float(np.percentile(rms, 95))
+    if reference <= 0:
+        return [(0.0, count * frame / sample_rate)]
+    silent = rms < reference * 10 ** (_SILENCE_DB / 20)
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    frame_seconds = frame / sample_rate
+    min_frames = math.ceil(_MIN_SILENCE_SECONDS / frame_seconds)
+    silences = []
+    for start, end in zip(edges[0::2], edges[1::2]):
+        if end - start >= min_frames or start == 0 or end == count:
+            silences.append((start * frame_seconds, end * frame_seconds))
+    return silences
+
+
+def build_cues(text: str, duration: float, samples: Optional[np.ndarray] = None,
+               sample_rate: Optional[int] = None, max_width: int = SUBTITLE_MAX_CUE_WIDTH
+               ) -> List[Tuple[float, float, str]]:
+    """
+    Time subtitle cues for known narration text without transcription.
+
+    Cues get time in proportion to their syllable weight. When samples are given, leading and trailing
+    silence are trimmed and each cue boundary at a sentence or clause break is snapped to the nearest
+    detected pause; cues between two snapped pauses are spread proportionally within them, so estimation
+    errors do not accumulate.
+
+    Args:
+        text: Narration text that was synthesized
+        duration: Audio duration in seconds
+        samples: Optional decoded mono audio for pause detection
+        sample_rate: Sample rate of samples
+        max_width: Maximum display width of a cue
+
+    Returns:
+        list: (start seconds, end seconds, text) cues
+    """
+    split = _split_cues(text, max_width)
+    if not split or duration <= 0:
+        return []
+    texts = [cue for cue, _ in split]
+    # Commas inside a cue are read with short pauses too
+    weights = [speech_weight(cue) + _CLAUSE_PAUSE * len(CLAUSE_END.findall(cue[:-1])) for cue in texts]
+    pauses = [pause for _, pause in split]
+
+    silences = detect_silences(samples, sample_rate) if samples is not None and sample_rate else []
+    start, end = 0.0, duration
+    if silences and silences[0][0] <= 0 and silences[0][1] < duration:
+        start = silences[0][1]
+        silences = silences[1:]
+    if silences and silences[-1][1] >= duration - _FRAME_SECONDS * 2 and silences[-1][0] > start:
+        end = silences[-1][0]
+        silences = silences[:-1]
+
+    cues = []
+    # First cue of the segment starting at `start`; segments end at snapped pauses
+    segment = 0
+    for index in range(len(texts) - 1):
+        # Cues cut mid-sentence between words have no pause to snap to
+        if not silences or pauses[index] == 0:
+            continue
+        spans = _allocate(weights[segment:], pauses[segment:], start, end)
+        current, following = spans[index - segment], spans[index - segment + 1]
+        # Boundary after the current cue: the middle of the expected pause
+        boundary = (current[1] + following[0]) / 2
+        tolerance = max(0.3, 0.5 * min(current[1] - current[0], following[1] - following[0]))
+        # Nearest pause, favouring longer ones: a sentence break is read with a longer pause than a comma
+        candidates = [
+            (abs((s + e) / 2 - boundary) - (e - s), s, e) for s, e in silences
+            if s > current[0] and abs((s + e) / 2 - boundary) <= tolerance
+        ]
+        if not candidates:
+            continue
+        _, pause_start, pause_end = min(candidates)
+        spans = _allocate(weights[segment:index + 1], pauses[segment:index + 1], start, pause_start)
+        cues.extend((s, e, t) for (s, e), t in zip(spans, texts[segment:index + 1]))
+        segment, start = index + 1, pause_end
+        silences = [(s, e) for s, e in silences if s >= pause_end]
+    spans = _allocate(weights[segment:], pauses[segment:], start, end)
+    cues.extend((s, e, t) for (s, e), t in zip(spans, texts[segment:]))
+    return cues
+
+
+async def decode_audio(audio_path: Path, sample_rate: int = ANALYSIS_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an audio file to mono 16-bit samples with FFmpeg.
+
+    Args:
+        audio_path: Audio file
+        sample_rate: Output sample rate
+
+    Returns:
+        np.ndarray: int16 samples
+
+    Raises:
+        RuntimeError: If FFmpeg fails
+    """
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-v", "error", "-i", str(audio_path),
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed to decode audio: {stderr.decode(errors='replace')}")
+    return np.frombuffer(stdout, dtype="<i2")
+
+
+async def local_subtitles(text: str, audio_path: Path, duration: float,
+                          refine: bool = SUBTITLE_SILENCE_REFINE) -> str:
+    """
+    Generate SRT for synthesized audio from its known text, without a transcription call.
+
+    Args:
+        text: Narration text that was synthesized
+        audio_path: Synthesized audio file
+        duration: Audio duration in seconds
+        refine: Decode the audio and snap cue boundaries to pauses
+
+    Returns:
+        str: SRT content
+    """
+    samples = None
+    if refine:
+        try:
+            samples = await decode_audio(audio_path)
+        except Exception as e:
+            print(f"Warning: Failed to decode audio for subtitle timing: {str(e)}")
+    cues = await asyncio.to_thread(build_cues, text, duration, samples, ANALYSIS_SAMPLE_RATE)
+    return format_srt(cues)
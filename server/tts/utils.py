@@ -30,6 +30,19 @@ def get_tts_directory() -> Path:
     return tts_dir
 
 
+def get_tts_cache_directory() -> Path:
+    """
+    Get TTS cache directory (content-addressed audio and subtitles, shared by all replicas).
+    Creates directory if it doesn't exist.
+    
+    Returns:
+        Path: Path to TTS cache directory
+    """
+    cache_dir = Path("uploads") / "aividfromppt" / "tts" / "cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
 def generate_audio_filename(extension: str = "mp3") -> str:
     """
     Generate unique audio filename.
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request, Response, Header
+from fastapi.responses import FileResponse, JSONResponse
 from pathlib import Path
+from typing import Optional
 import os
 import uuid
 import shutil
@@ -12,15 +13,22 @@ from video.schemas import SynthesizeRequest, SynthesizeResponse, HealthResponse
 from video.downloader import download_segment_files
 from video.synthesizer import synthesize_video
 from video.utils import get_video_output_directory, get_video_temp_directory
+from system.admission import video_admission, get_system_load, MIN_FREE_DISK_MB
+from system.health import get_binaries
+from system.idempotency import idempotency_store
+from system.scheduler import scheduler, get_tenant, get_priority
 
 router = APIRouter(
     prefix="/video",
     tags=["video"]
 )
 
-# Thread pool executor for blocking operations
+# Thread pool executor for blocking downloads; rendering goes through the fair-share scheduler
 executor = ThreadPoolExecutor(max_workers=4)
 
+# Decks up to this many segments are treated as interactive previews unless X-Priority says otherwise
+INTERACTIVE_MAX_SEGMENTS = 3
+
 
 @router.post(
     "/synthesize",
@@ -42,6 +50,15 @@ executor = ThreadPoolExecutor(max_workers=4)
     2. The finished segment videos are then concatenated in order without crossfade transitions
     3. Each subtitle file starts from 0 seconds (independent timing for each segment)
 
+    Scheduling:
+    - Renders are fair-queued per tenant (`X-Tenant-ID`, then `X-Session-ID`, then client address)
+    - `X-Priority: interactive | batch` selects the priority class; small decks default to interactive
+
+    Idempotency:
+    - Send an `Idempotency-Key` header to make retries safe: a duplicate attaches to the in-flight job
+      or replays the stored result (`Idempotent-Replayed: true`)
+    - Without the header, identical bodies only attach to an in-flight job; results are not replayed
+
     Returns:
     - video_id: Unique identifier for the synthesized video
     - video_url: URL to stream/watch the video
@@ -50,87 +67,131 @@ executor = ThreadPoolExecutor(max_workers=4)
 )
 async def synthesize(
     request: Request,
-    synthesize_request: SynthesizeRequest
+    response: Response,
+    synthesize_request: SynthesizeRequest,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")
 ):
     """
     Synthesize video from multiple image and audio segments.
 
+    Retries with the same Idempotency-Key attach to the running synthesis or replay
+    its stored result instead of rendering again; identical bodies without a key only attach
+    to the running synthesis.
+
     Args:
         request: FastAPI request object (to get base URL)
+        response: FastAPI response object (to mark replayed results)
         synthesize_request: Video synthesis request with segments
+        idempotency_key: Optional Idempotency-Key header
 
     Returns:
         SynthesizeResponse: Synthesis result with video URLs
     """
-    try:
-        segments = synthesize_request.segments
-        
-        # Sort segments by order
-        segments.sort(key=lambda x: x.order)
-        
-        # Generate unique filename: timestamp_UUID first 8 characters
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_id = str(uuid.uuid4())[:8]
-        output_filename = f"{timestamp}_{unique_id}.mp4"
-        output_dir = get_video_output_directory()
-        output_path = output_dir / output_filename
-        
-        # Create independent temporary directory for current request
-        temp_dir = get_video_temp_directory()
-        request_temp_dir = temp_dir / f"req_{timestamp}_{unique_id}"
-        request_temp_dir.mkdir(parents=True, exist_ok=True)
-        print(f"Created temporary directory: {request_temp_dir}")
-        
-        # Download all material files to independent temporary directory
-        print(f"Starting to download material files... Output filename: {output_filename}")
-        downloaded_segments = []
-        
-        # Convert Pydantic models to dict for downloader
-        for segment in segments:
-            segment_dict = {
-                'image_url': segment.image_url,
-                'audio_url': segment.audio_url,
-                'video_url': segment.video_url,
-                'subtitle_url': segment.subtitle_url
-            }
-            # Run download in thread pool (blocking operation)
-            files = await asyncio.get_event_loop().run_in_executor(
-                executor,
-                download_segment_files,
-                segment_dict,
-                str(request_temp_dir)
-            )
-            downloaded_segments.append(files)
-        
-        # Synthesize video (blocking operation)
-        result_path = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            synthesize_video,
-            downloaded_segments,
-            str(output_path)
-        )
-        
-        # Clean up temporary files
+    tenant = get_tenant(request)
+    priority = get_priority(request, interactive=len(synthesize_request.segments) <= INTERACTIVE_MAX_SEGMENTS)
+
+    result = await idempotency_store.run(
+        scope="video.synthesize",
+        idempotency_key=idempotency_key,
+        payload=synthesize_request.model_dump(mode="json"),
+        compute=lambda: _run_synthesis(request, synthesize_request, tenant, priority),
+        response=response,
+        validate=lambda r: (get_video_output_directory() / f"{r['video_id']}.mp4").exists()
+    )
+    return SynthesizeResponse(**result)
+
+
+async def _run_synthesis(
+    request: Request,
+    synthesize_request: SynthesizeRequest,
+    tenant: str,
+    priority: str
+) -> SynthesizeResponse:
+    """
+    Download segment materials and synthesize the video.
+
+    Args:
+        request: FastAPI request object (to get base URL)
+        synthesize_request: Video synthesis request with segments
+        tenant: Tenant the render is billed to in the fair-share scheduler
+        priority: Scheduler priority class
+
+    Returns:
+        SynthesizeResponse: Synthesis result with video URLs
+    """
+    # Wait for a synthesis slot, or fail fast with 429 when the service is saturated
+    async with video_admission.admit():
         try:
-            shutil.rmtree(request_temp_dir)
-            print(f"Cleaned up temporary directory: {request_temp_dir}")
+            segments = synthesize_request.segments
+
+            # Sort segments by order
+            segments.sort(key=lambda x: x.order)
+
+            # Generate unique filename: timestamp_UUID first 8 characters
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            unique_id = str(uuid.uuid4())[:8]
+            output_filename = f"{timestamp}_{unique_id}.mp4"
+            output_dir = get_video_output_directory()
+            output_path = output_dir / output_filename
+
+            # Create independent temporary directory for current request
+            temp_dir = get_video_temp_directory()
+            request_temp_dir = temp_dir / f"req_{timestamp}_{unique_id}"
+            request_temp_dir.mkdir(parents=True, exist_ok=True)
+            print(f"Created temporary directory: {request_temp_dir}")
+
+            # Download all material files to independent temporary directory
+            print(f"Starting to download material files... Output filename: {output_filename}")
+            downloaded_segments = []
+
+            # Convert Pydantic models to dict for downloader
+            for segment in segments:
+                segment_dict = {
+                    'image_url': segment.image_url,
+                    'audio_url': segment.audio_url,
+                    'video_url': segment.video_url,
+                    'subtitle_url': segment.subtitle_url
+                }
+                # Run download in thread pool (blocking operation)
+                files = await asyncio.get_event_loop().run_in_executor(
+                    executor,
+                    download_segment_files,
+                    segment_dict,
+                    str(request_temp_dir)
+                )
+                downloaded_segments.append(files)
+
+            # Synthesize video (blocking operation, fair-queued against other tenants)
+            result_path = await scheduler.run(
+                synthesize_video,
+                downloaded_segments,
+                str(output_path),
+                tenant=tenant,
+                priority=priority,
+                cost=len(downloaded_segments)
+            )
+
+            # Clean up temporary files
+            try:
+                shutil.rmtree(request_temp_dir)
+                print(f"Cleaned up temporary directory: {request_temp_dir}")
+            except Exception as e:
+                print(f"Failed to clean up temporary directory: {e}")
+
+            # Get server base URL
+            base_url = str(request.base_url).rstrip('/')
+
+            # Return online access links
+            return SynthesizeResponse(
+                success=True,
+                video_id=output_filename.replace('.mp4', ''),
+                video_url=f"{base_url}/api/v1/video/files/{output_filename}",
+                download_url=f"{base_url}/api/v1/video/download/{output_filename}",
+                message="视频合成成功"
+            )
+
         except Exception as e:
-            print(f"Failed to clean up temporary directory: {e}")
-        
-        # Get server base URL
-        base_url = str(request.base_url).rstrip('/')
-        
-        # Return online access links
-        return SynthesizeResponse(
-            success=True,
-            video_id=output_filename.replace('.mp4', ''),
-            video_url=f"{base_url}/api/v1/video/files/{output_filename}",
-            download_url=f"{base_url}/api/v1/video/download/{output_filename}",
-            message="视频合成成功"
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"视频合成失败: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"视频合成失败: {str(e)}")
 
 
 @router.get(
@@ -208,18 +269,36 @@ async def download_video_file(filename: str):
     description="""
     Health check endpoint for video synthesis service.
     
-    Returns service status information.
-    """
+    Checks that ffmpeg/ffprobe are installed, the synthesis queue has room and the
+    output volume has free space. Returns 503 with status "degraded" otherwise.
+    """,
+    responses={503: {"model": HealthResponse, "description": "Video service is degraded"}}
 )
 async def health():
     """
     Health check endpoint.
     
     Returns:
-        HealthResponse: Service status information
+        HealthResponse: Service status information (HTTP 503 when degraded)
     """
-    return HealthResponse(
-        status="ok",
-        message="视频合成服务运行正常"
-    )
+    binaries = get_binaries()
+    queue = video_admission.stats()
+    disk_free_mb = get_system_load()["disk_free_mb"]
 
+    problems = [name for name in ("ffmpeg", "ffprobe") if not binaries.get(name)]
+    if queue["saturated"]:
+        problems.append("queue full")
+    if disk_free_mb < MIN_FREE_DISK_MB:
+        problems.append("low disk space")
+
+    response = HealthResponse(
+        status="ok" if not problems else "degraded",
+        message="视频合成服务运行正常" if not problems else f"视频合成服务不可用: {', '.join(problems)}",
+        checks={
+            "ffmpeg": bool(binaries.get("ffmpeg")),
+            "ffprobe": bool(binaries.get("ffprobe")),
+            "queue": {key: queue[key] for key in ("running", "max_running", "queued", "max_queued")},
+            "disk_free_mb": disk_free_mb,
+        }
+    )
+    return JSONResponse(status_code=200 if not problems else 503, content=response.model_dump())
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 
 class VideoSegment(BaseModel):
@@ -70,14 +70,21 @@ class SynthesizeResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     """Health check response model"""
-    status: str = Field(..., description="Service status")
+    status: str = Field(..., description="Service status ('ok' or 'degraded')")
     message: str = Field(..., description="Status message")
+    checks: Optional[Dict[str, Any]] = Field(default=None, description="Binary, queue and disk checks behind the status")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "status": "ok",
-                "message": "视频合成服务运行正常"
+                "message": "视频合成服务运行正常",
+                "checks": {
+                    "ffmpeg": True,
+                    "ffprobe": True,
+                    "queue": {"running": 1, "max_running": 2, "queued": 0, "max_queued": 4},
+                    "disk_free_mb": 20480
+                }
             }
         }
 
@@ -6,6 +6,38 @@ Responsible for combining multiple image segments with audio into a complete vid
 import os
 import subprocess
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# x264 settings for segment encodes, selectable per synthesis run
+ENCODE_PROFILES = {
+    'default': {'preset': 'medium', 'crf': '23'},
+    'fast': {'preset': 'veryfast', 'crf': '23'},
+    'draft': {'preset': 'ultrafast', 'crf': '28'},
+}
+
+# Width of the digital human overlay on the 1920x1080 background (1/5 of the width)
+OVERLAY_WIDTH = 384
+
+_timings_lock = threading.Lock()
+
+
+def _record_timing(timings, stage, started_at):
+    """
+    Add the time elapsed since started_at to a per-stage timings dict
+
+    Args:
+        timings (dict): Stage name -> accumulated seconds, or None to skip
+        stage (str): Stage name
+        started_at (float): time.perf_counter() value when the stage began
+    """
+    if timings is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    with _timings_lock:
+        timings[stage] = timings.get(stage, 0.0) + elapsed
 
 
 def parse_srt_file(srt_path):
@@ -100,13 +132,14 @@ def get_video_info(video_path):
         video_path (str): Video file path
 
     Returns:
-        dict: Video information with keys 'width', 'height', 'duration'
+        dict: Video information with keys 'width', 'height', 'duration', 'codec_name' and 'alpha'
+            (True for VP9 streams flagged with alpha_mode, which need the libvpx decoder)
     """
     cmd = [
         'ffprobe',
         '-v', 'error',
         '-select_streams', 'v:0',
-        '-show_entries', 'stream=width,height,duration',
+        '-show_entries', 'stream=width,height,duration,codec_name:stream_tags=alpha_mode',
         '-of', 'json',
         video_path
     ]
@@ -118,7 +151,9 @@ def get_video_info(video_path):
     return {
         'width': stream['width'],
         'height': stream['height'],
-        'duration': float(stream.get('duration', 0))
+        'duration': float(stream.get('duration', 0) or 0),
+        'codec_name': stream.get('codec_name'),
+        'alpha': str(stream.get('tags', {}).get('alpha_mode', '0')) == '1'
     }
 
 
@@ -178,7 +213,8 @@ def seconds_to_ass_time(seconds):
     return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
 
 
-def process_single_segment(image_path, audio_path, output_path, video_path=None, subtitle_path=None):
+def process_single_segment(image_path, audio_path, output_path, video_path=None, subtitle_path=None,
+                           encode_profile='default', timings=None):
     """
     Process a single segment: convert image to video with audio duration, optionally overlay digital human video, add subtitles
 
@@ -188,12 +224,21 @@ def process_single_segment(image_path, audio_path, output_path, video_path=None,
         output_path (str): Output video file path
         video_path (str): Digital human video file path (optional)
         subtitle_path (str): Subtitle file path (optional)
+        encode_profile (str): Key of ENCODE_PROFILES used for x264 settings
+        timings (dict): Optional dict that accumulates per-stage seconds
+            ('probe', 'encode', 'subtitles')
 
     Returns:
         str: Output video file path
     """
+    if encode_profile not in ENCODE_PROFILES:
+        raise ValueError(f"Unknown encode profile: {encode_profile}. Supported: {list(ENCODE_PROFILES.keys())}")
+    profile = ENCODE_PROFILES[encode_profile]
+
     # Get audio duration
+    started_at = time.perf_counter()
     audio_duration = get_audio_duration(audio_path)
+    _record_timing(timings, 'probe', started_at)
     print(f"Audio duration: {audio_duration} seconds")
 
     # Build FFmpeg command
@@ -202,37 +247,46 @@ def process_single_segment(image_path, audio_path, output_path, video_path=None,
         # Complex filter for overlaying digital human video
         # 1. Create background video from image
         # 2. Loop/trim digital human video to match audio duration
-        # 3. Scale digital human video to 1/5 of background width
-        # 4. Overlay at bottom-right corner
+        # 3. Scale digital human video to 1/5 of background width (skipped for pre-sized clips)
+        # 4. Overlay at bottom-right corner (alpha channel, if any, lets the slide show through)
 
-        # First, get video info to calculate scaling
+        # First, get video info to decide on scaling and decoding
+        started_at = time.perf_counter()
         video_info = get_video_info(video_path)
+        _record_timing(timings, 'probe', started_at)
+
+        # Clips rendered at overlay size (e.g. /virtual/generate-video with resolution=384) are used as-is
+        human_scale = "" if video_info['width'] == OVERLAY_WIDTH else f",scale={OVERLAY_WIDTH}:-1"
 
         # Build complex filter
         filter_complex = (
             # Input 0 (image): loop and scale to create background
             "[0:v]loop=loop=-1:size=1:start=0,scale=1920:1080,setsar=1,fps=24[bg];"
             # Input 1 (digital human video): trim or loop to match duration
-            f"[1:v]trim=duration={audio_duration},setpts=PTS-STARTPTS,"
+            f"[1:v]trim=duration={audio_duration},setpts=PTS-STARTPTS"
             # Scale to 1/5 of background width (384 pixels), maintain aspect ratio
-            "scale=384:-1[human];"
+            f"{human_scale}[human];"
             # Overlay human video on background at bottom-right with 20px padding
             "[bg][human]overlay=W-w-20:H-h-20[outv]"
         )
 
+        # FFmpeg's native VP9 decoder drops the alpha plane; libvpx keeps it
+        human_decoder = ['-c:v', 'libvpx-vp9'] if video_info['alpha'] and video_info['codec_name'] == 'vp9' else []
+
         cmd = [
             'ffmpeg',
             '-y',  # Overwrite output file
             '-loop', '1',  # Loop image
             '-i', image_path,  # Input 0: background image
+            *human_decoder,
             '-i', video_path,  # Input 1: digital human video
             '-i', audio_path,  # Input 2: audio
             '-filter_complex', filter_complex,
             '-map', '[outv]',  # Use filtered video
             '-map', '2:a',  # Use audio from input 2
             '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
+            '-preset', profile['preset'],
+            '-crf', profile['crf'],
             '-c:a', 'aac',
             '-b:a', '192k',
             '-t', str(audio_duration),  # Duration from audio
@@ -248,8 +302,8 @@ def process_single_segment(image_path, audio_path, output_path, video_path=None,
             '-i', image_path,  # Input: background image
             '-i', audio_path,  # Input: audio
             '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
+            '-preset', profile['preset'],
+            '-crf', profile['crf'],
             '-tune', 'stillimage',
             '-c:a', 'aac',
             '-b:a', '192k',
@@ -261,7 +315,9 @@ def process_single_segment(image_path, audio_path, output_path, video_path=None,
 
     # Execute FFmpeg command
     print(f"Executing FFmpeg command...")
+    started_at = time.perf_counter()
     result = subprocess.run(cmd, capture_output=True, text=True)
+    _record_timing(timings, 'encode', started_at)
 
     if result.returncode != 0:
         print(f"FFmpeg stderr: {result.stderr}")
@@ -269,6 +325,7 @@ def process_single_segment(image_path, audio_path, output_path, video_path=None,
 
     # If subtitles are provided, add them using drawtext filter (most reliable for Chinese)
     if subtitle_path:
+        started_at = time.perf_counter()
         temp_output = output_path + '.temp.mp4'
         os.rename(output_path, temp_output)
 
@@ -360,8 +417,8 @@ def process_single_segment(image_path, audio_path, output_path, video_path=None,
             '-i', temp_output,
             '-vf', vf_filter,
             '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
+            '-preset', profile['preset'],
+            '-crf', profile['crf'],
             '-c:a', 'copy',
             output_path
         ]
@@ -377,12 +434,14 @@ def process_single_segment(image_path, audio_path, output_path, video_path=None,
         else:
             # Remove temporary file
             os.remove(temp_output)
+        _record_timing(timings, 'subtitles', started_at)
 
     print(f"Segment processed successfully: {output_path}")
     return output_path
 
 
-def synthesize_video(segments_data, output_path="output/final_video.mp4", transition_duration=0):
+def synthesize_video(segments_data, output_path="output/final_video.mp4", transition_duration=0,
+                     encode_profile='default', max_workers=1, timings=None):
     """
     Synthesize final video from image and audio segments
 
@@ -398,6 +457,10 @@ def synthesize_video(segments_data, output_path="output/final_video.mp4", transi
             - subtitle_path: Subtitle file path (optional, starts from 0s for each segment)
         output_path (str): Output video file path
         transition_duration (float): Transition duration (seconds), default 0 (no transition)
+        encode_profile (str): Key of ENCODE_PROFILES used for segment encodes
+        max_workers (int): Number of segments encoded concurrently, default 1 (sequential)
+        timings (dict): Optional dict that accumulates per-stage seconds
+            ('probe', 'encode', 'subtitles', 'concat')
 
     Returns:
         str: Output video file path
@@ -412,32 +475,45 @@ def synthesize_video(segments_data, output_path="output/final_video.mp4", transi
     temp_dir = os.path.join(os.path.dirname(output_dir) or '.', 'temp')
     os.makedirs(temp_dir, exist_ok=True)
 
+    # Prefix temp files with the output name so concurrent syntheses sharing temp_dir don't collide
+    temp_prefix = os.path.splitext(os.path.basename(output_path))[0]
+
     # Step 1: Process and save each segment individually
-    segment_video_paths = []
     total_segments = len(segments_data)
+    segment_video_paths = [
+        os.path.join(temp_dir, f'{temp_prefix}_segment_{i}.mp4')
+        for i in range(1, total_segments + 1)
+    ]
 
-    for i, segment in enumerate(segments_data, 1):
+    def process(i, segment):
         print(f"Processing segment {i}/{total_segments}...")
 
-        # Output path for this segment in temp directory
-        segment_output_path = os.path.join(temp_dir, f'segment_{i}.mp4')
-
         # Process single segment completely
         process_single_segment(
             image_path=segment['image_path'],
             audio_path=segment['audio_path'],
-            output_path=segment_output_path,
+            output_path=segment_video_paths[i - 1],
             video_path=segment.get('video_path'),
-            subtitle_path=segment.get('subtitle_path')
+            subtitle_path=segment.get('subtitle_path'),
+            encode_profile=encode_profile,
+            timings=timings
         )
 
-        segment_video_paths.append(segment_output_path)
+    if max_workers > 1 and total_segments > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(process, i, segment) for i, segment in enumerate(segments_data, 1)]
+            for future in futures:
+                future.result()
+    else:
+        for i, segment in enumerate(segments_data, 1):
+            process(i, segment)
 
     # Step 2: Concatenate all segments using FFmpeg concat demuxer
     print("Concatenating all segments...")
+    started_at = time.perf_counter()
 
     # Create concat file list in temp directory
-    concat_file_path = os.path.join(temp_dir, 'concat_list.txt')
+    concat_file_path = os.path.join(temp_dir, f'{temp_prefix}_concat_list.txt')
     with open(concat_file_path, 'w', encoding='utf-8') as f:
         for seg_path in segment_video_paths:
             # Use absolute path to avoid issues
@@ -461,6 +537,7 @@ def synthesize_video(segments_data, output_path="output/final_video.mp4", transi
     if result.returncode != 0:
         print(f"FFmpeg concatenation stderr: {result.stderr}")
         raise RuntimeError(f"FFmpeg concatenation failed with return code {result.returncode}")
+    _record_timing(timings, 'concat', started_at)
 
     # Clean up temporary segment files
     print("Cleaning up temporary segment files...")
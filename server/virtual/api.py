@@ -1,14 +1,35 @@
 import re, itertools
+import asyncio
 import uuid
 import tempfile
 import os
 import requests
 import subprocess
 from pypinyin import lazy_pinyin, Style
-from fastapi import APIRouter, FastAPI, HTTPException, Request
-from virtual.shcemas import GenerateVideoRequest, GenerateVideoResponse
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response, Header, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from virtual.shcemas import (
+    GenerateVideoRequest,
+    GenerateVideoResponse,
+    BatchGenerateVideoRequest,
+    BatchGenerateVideoResponse,
+    BatchItemResult,
+    CacheStatsResponse,
+    JobSubmitResponse,
+    JobStatusResponse,
+)
+from virtual.renderer import render_lipsync_video, compress_vis_seq, frames_per_char, plan_timing, OUTPUT_FORMATS
+from virtual.clips import render_lipsync_from_clips, prewarm
+from virtual.cache import LipsyncResultCache, file_sha256
+from virtual.jobs import LipsyncJobQueue, COMPLETED, FAILED
+from system.admission import virtual_admission, get_pressure_reasons
+from system.idempotency import idempotency_store
+from system.scheduler import scheduler, get_tenant, get_priority
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import gc
+from contextlib import nullcontext
 import shutil
 
 router = APIRouter(prefix="/virtual", tags=["virtual"])
@@ -16,6 +37,50 @@ router = APIRouter(prefix="/virtual", tags=["virtual"])
 VIRTUAL_VIDEOS_DIR = Path("uploads") / "aividfromppt" / "videos"
 VIRTUAL_VIDEOS_DIR.mkdir(parents=True, exist_ok=True)
 
+# 渲染方式：pipe = NumPy 生成帧并通过管道写入单个 FFmpeg 进程；
+# clips = 用预编码的口型过渡片段 -c copy 拼接；segments = 每个口型单独编码后拼接（旧实现）
+LIPSYNC_RENDERER = os.getenv("LIPSYNC_RENDERER", "pipe")
+LIPSYNC_RENDERERS = ("pipe", "clips", "segments")
+# 时长规划：pad = 保持每字时长，用最后一个口型补足或截断到音频长度；scale = 按比例缩放各口型铺满音频
+LIPSYNC_TIMING = os.getenv("LIPSYNC_TIMING", "pad")
+LIPSYNC_TIMINGS = ("pad", "scale")
+# 启动时在后台预生成默认参数下的口型片段库
+LIPSYNC_CLIP_PREWARM = os.getenv("LIPSYNC_CLIP_PREWARM", "false").lower() in ("1", "true", "yes")
+
+LIP_DIR = Path(__file__).parent / 'mouse-sort'
+
+# 接口使用的渲染参数（也是结果缓存键的一部分）
+LIPSYNC_FPS = 30
+LIPSYNC_BLEND_N = 5
+# 输出视频最长边像素数（pipe / clips 渲染方式），不设置时保持口型图原始大小
+LIPSYNC_RESOLUTION = int(os.getenv("LIPSYNC_RESOLUTION", "0")) or None
+# pipe 渲染方式丢弃重复帧输出可变帧率视频
+LIPSYNC_VFR = os.getenv("LIPSYNC_VFR", "true").lower() in ("1", "true", "yes")
+
+# 结果缓存：相同文本 + 音频内容 + 参数直接返回已生成的视频
+result_cache = LipsyncResultCache(
+    VIRTUAL_VIDEOS_DIR,
+    max_entries=int(os.getenv("VIRTUAL_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("VIRTUAL_CACHE_MAX_MB", "10240")) * 1024 * 1024,
+    enabled=os.getenv("VIRTUAL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+)
+
+# 异步任务：记录保存在共享存储上，本副本最多同时排队 LIPSYNC_JOB_MAX_PENDING 个任务
+job_queue = LipsyncJobQueue(
+    Path("uploads") / "aividfromppt" / "virtual_jobs",
+    max_pending=int(os.getenv("LIPSYNC_JOB_MAX_PENDING", "64")),
+    ttl=float(os.getenv("LIPSYNC_JOB_TTL_SECONDS", str(24 * 3600))),
+)
+
+# 音频下载和哈希计算用的线程池（渲染在调度器的工作线程上执行）
+_io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lipsync-io")
+
+# 文本不超过该长度的请求默认按交互优先级调度（可用 X-Priority 覆盖）
+INTERACTIVE_MAX_CHARS = 200
+
+# 批量接口单次最多的条目数
+BATCH_MAX_ITEMS = int(os.getenv("LIPSYNC_BATCH_MAX_ITEMS", "100"))
+
 # ----------  口型表 ----------
 VIS_MAP = {
     'b': '00',
@@ -212,6 +277,9 @@ def create_segment_video(
     关键：使用FFmpeg的blend滤镜直接处理图片混合
     """
     try:
+        # 按帧数而不是时长截取，保证片段帧数与时长规划完全一致
+        total_frames = int(round(duration * fps))
+
         if is_first:
             # 第一个片段：只显示第一张图片
             cmd = [
@@ -219,12 +287,14 @@ def create_segment_video(
                 '-y',
                 '-loop',
                 '1',
+                '-framerate',
+                str(fps),
                 '-i',
                 img_a,
-                '-t',
-                str(duration),
+                '-frames:v',
+                str(total_frames),
                 '-vf',
-                f'fps={fps},format=yuv420p',
+                'format=yuv420p',
                 '-c:v',
                 'libx264',
                 '-preset',
@@ -235,7 +305,6 @@ def create_segment_video(
             ]
         else:
             # 后续片段：从img_a过渡到img_b
-            total_frames = int(duration * fps)
             blend_frames = min(blend_n, total_frames)
             still_frames = total_frames - blend_frames
 
@@ -246,12 +315,14 @@ def create_segment_video(
                     '-y',
                     '-loop',
                     '1',
+                    '-framerate',
+                    str(fps),
                     '-i',
                     img_b,
-                    '-t',
-                    str(duration),
+                    '-frames:v',
+                    str(total_frames),
                     '-vf',
-                    f'fps={fps},format=yuv420p',
+                    'format=yuv420p',
                     '-c:v',
                     'libx264',
                     '-preset',
@@ -263,7 +334,6 @@ def create_segment_video(
             else:
                 # 使用FFmpeg blend滤镜创建混合效果
                 blend_duration = blend_frames / fps
-                still_duration = still_frames / fps
 
                 # 创建混合部分
                 temp_blend = output_path.replace('.mp4', '_blend.mp4')
@@ -274,18 +344,20 @@ def create_segment_video(
                     '-y',
                     '-loop',
                     '1',
-                    '-t',
-                    str(blend_duration),
+                    '-framerate',
+                    str(fps),
                     '-i',
                     img_a,
                     '-loop',
                     '1',
-                    '-t',
-                    str(blend_duration),
+                    '-framerate',
+                    str(fps),
                     '-i',
                     img_b,
                     '-filter_complex',
-                    f'[0:v][1:v]blend=all_expr=\'A*(1-T/{blend_duration})+B*T/{blend_duration}\':shortest=1,fps={fps},format=yuv420p',
+                    f'[0:v][1:v]blend=all_expr=\'A*(1-T/{blend_duration})+B*T/{blend_duration}\',format=yuv420p',
+                    '-frames:v',
+                    str(blend_frames),
                     '-c:v',
                     'libx264',
                     '-preset',
@@ -307,12 +379,14 @@ def create_segment_video(
                         '-y',
                         '-loop',
                         '1',
+                        '-framerate',
+                        str(fps),
                         '-i',
                         img_b,
-                        '-t',
-                        str(still_duration),
+                        '-frames:v',
+                        str(still_frames),
                         '-vf',
-                        f'fps={fps},format=yuv420p',
+                        'format=yuv420p',
                         '-c:v',
                         'libx264',
                         '-preset',
@@ -377,13 +451,14 @@ def create_segment_video(
 
 
 def generate_video_ffmpeg_fast(
-    vis_seq, fps, char_interval, blend_n, lip_dir, audio_path, output_video, temp_dir
+    spans, fps, blend_n, lip_dir, audio_path, output_video, temp_dir
 ):
     """
-    极速版本：每个口型片段独立生成，然后合并
+    极速版本：每段口型（连续相同口型已合并）独立生成，然后与音频一次合并
+    spans 应已由 plan_timing 按音频时长分配好帧数
     """
     try:
-        print(f"开始生成视频，共 {len(vis_seq)} 个口型片段...")
+        print(f"开始生成视频，共 {len(spans)} 个口型片段...")
 
         # 创建片段目录
         segments_dir = os.path.join(temp_dir, 'segments')
@@ -392,8 +467,9 @@ def generate_video_ffmpeg_fast(
         segment_files = []
 
         # 并行生成每个片段（逐个处理，避免内存问题）
-        for i, vis in enumerate(vis_seq):
-            print(f"处理片段 {i+1}/{len(vis_seq)}: {vis}")
+        for i, (vis, span_frames) in enumerate(spans):
+            print(f"处理片段 {i+1}/{len(spans)}: {vis} x {span_frames} 帧")
+            duration = span_frames / fps
 
             img_current = os.path.join(lip_dir, f"{vis}.png")
             if not os.path.exists(img_current):
@@ -406,7 +482,7 @@ def generate_video_ffmpeg_fast(
                 create_segment_video(
                     img_current,
                     img_current,
-                    char_interval,
+                    duration,
                     fps,
                     blend_n,
                     segment_output,
@@ -414,11 +490,11 @@ def generate_video_ffmpeg_fast(
                 )
             else:
                 # 后续片段
-                img_prev = os.path.join(lip_dir, f"{vis_seq[i-1]}.png")
+                img_prev = os.path.join(lip_dir, f"{spans[i-1][0]}.png")
                 create_segment_video(
                     img_prev,
                     img_current,
-                    char_interval,
+                    duration,
                     fps,
                     blend_n,
                     segment_output,
@@ -427,15 +503,15 @@ def generate_video_ffmpeg_fast(
 
             segment_files.append(segment_output)
 
-        # 合并所有片段
-        print("合并所有视频片段...")
+        # 合并所有片段并合成音频（片段帧数已按音频时长规划，无需再延长）
+        print("合并视频片段与音频...")
         concat_list = os.path.join(temp_dir, 'segments_concat.txt')
         with open(concat_list, 'w') as f:
             for seg_file in segment_files:
                 f.write(f"file '{seg_file}'\n")
 
-        temp_video = os.path.join(temp_dir, 'video_no_audio.mp4')
-        concat_cmd = [
+        audio_file = audio_path[0] if isinstance(audio_path, tuple) else audio_path
+        merge_cmd = [
             'ffmpeg',
             '-y',
             '-f',
@@ -444,89 +520,12 @@ def generate_video_ffmpeg_fast(
             '0',
             '-i',
             concat_list,
-            '-c',
-            'copy',
-            temp_video,
-        ]
-
-        result = subprocess.run(concat_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"合并视频失败: {result.stderr}")
-
-        audio_file = audio_path[0] if isinstance(audio_path, tuple) else audio_path
-        audio_duration = get_audio_duration(audio_file)
-
-        try:
-            video_duration = get_audio_duration(temp_video)
-        except:
-            video_duration = len(vis_seq) * char_interval
-
-        # 如果音频更长，延长视频
-        final_video = temp_video
-        if audio_duration > video_duration + 0.1:  # 留一点容差
-            print(
-                f"延长视频以匹配音频 ({video_duration:.2f}s -> {audio_duration:.2f}s)..."
-            )
-
-            last_img = os.path.join(lip_dir, f"{vis_seq[-1]}.png")
-            extra_duration = audio_duration - video_duration
-
-            temp_extra = os.path.join(temp_dir, 'extra.mp4')
-            extra_cmd = [
-                'ffmpeg',
-                '-y',
-                '-loop',
-                '1',
-                '-i',
-                last_img,
-                '-t',
-                str(extra_duration),
-                '-vf',
-                f'fps={fps},format=yuv420p',
-                '-c:v',
-                'libx264',
-                '-preset',
-                'ultrafast',
-                '-crf',
-                '23',
-                temp_extra,
-            ]
-
-            subprocess.run(extra_cmd, capture_output=True, check=True)
-
-            # 合并原视频和延长部分
-            concat_final_list = os.path.join(temp_dir, 'final_concat.txt')
-            with open(concat_final_list, 'w') as f:
-                f.write(f"file '{temp_video}'\n")
-                f.write(f"file '{temp_extra}'\n")
-
-            temp_video_extended = os.path.join(temp_dir, 'video_extended.mp4')
-            concat_final_cmd = [
-                'ffmpeg',
-                '-y',
-                '-f',
-                'concat',
-                '-safe',
-                '0',
-                '-i',
-                concat_final_list,
-                '-c',
-                'copy',
-                temp_video_extended,
-            ]
-
-            subprocess.run(concat_final_cmd, capture_output=True, check=True)
-            final_video = temp_video_extended
-
-        # 合并音频
-        print("合并音视频...")
-        merge_cmd = [
-            'ffmpeg',
-            '-y',
-            '-i',
-            final_video,
             '-i',
             audio_file,
+            '-map',
+            '0:v',
+            '-map',
+            '1:a',
             '-c:v',
             'copy',
             '-c:a',
@@ -549,10 +548,31 @@ def generate_video_ffmpeg_fast(
 
 
 def generate_video(
-    text, output_video, audio_file, fps=30, char_interval=0.5, blend_n=5, gender=1
+    text, output_video, audio_file, fps=30, char_interval=0.5, blend_n=5, gender=1, renderer=None, timing=None,
+    resolution=None, output_format='mp4', vfr=None
 ):
+    """
+    生成口型视频
+    resolution 为输出最长边像素数（None 时使用 LIPSYNC_RESOLUTION），segments 旧实现始终按原图大小输出；
+    output_format 见 OUTPUT_FORMATS，非 mp4 格式（带透明通道）只能用 pipe 方式渲染；
+    vfr 为 None 时使用 LIPSYNC_VFR，只对 pipe 方式生效（片段库和旧实现依赖固定帧率拼接）
+    """
+    renderer = renderer or LIPSYNC_RENDERER
+    if renderer not in LIPSYNC_RENDERERS:
+        raise ValueError(f"不支持的渲染方式: {renderer}，可选: {list(LIPSYNC_RENDERERS)}")
+    timing = timing or LIPSYNC_TIMING
+    resolution = resolution or LIPSYNC_RESOLUTION
+    vfr = LIPSYNC_VFR if vfr is None else vfr
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"不支持的输出格式: {output_format}，可选: {list(OUTPUT_FORMATS)}")
+    if output_format != 'mp4' and renderer != 'pipe':
+        # 片段库和旧实现都基于 H.264 拼接，透明通道格式改用 pipe 渲染
+        renderer = 'pipe'
+    if timing not in LIPSYNC_TIMINGS:
+        raise ValueError(f"不支持的时长规划方式: {timing}，可选: {list(LIPSYNC_TIMINGS)}")
+
     gender_folder = 'male' if gender == 1 else 'female'
-    lip_dir = Path(__file__).parent / 'mouse-sort' / gender_folder
+    lip_dir = LIP_DIR / gender_folder
 
     if not lip_dir.exists():
         raise FileNotFoundError(f"口型图片目录不存在: {lip_dir}")
@@ -560,6 +580,12 @@ def generate_video(
     # 生成口型序列
     vis_seq = build_vis_seq(text)
     print('口型序列 ->', vis_seq)
+    if not vis_seq:
+        raise ValueError("文本中没有可生成口型的中文或英文字符")
+
+    # 连续相同的口型合并为一段，减少过渡和编码次数
+    spans = compress_vis_seq(vis_seq, frames_per_char(char_interval, fps))
+    print(f'口型游程 -> {len(vis_seq)} 个口型合并为 {len(spans)} 段')
 
     # 创建临时目录
     temp_dir = tempfile.mkdtemp(prefix='lipsync_')
@@ -569,18 +595,45 @@ def generate_video(
         # 加载音频
         print("处理音频...")
         audio_path = _load_audio_robust(audio_file, temp_dir)
+        audio_file_path = audio_path[0]
+
+        # 只探测一次音频时长，预先分配各段帧数，渲染结果直接与音频等长
+        spans = plan_timing(spans, fps, get_audio_duration(audio_file_path), mode=timing)
 
         # 生成视频
-        generate_video_ffmpeg_fast(
-            vis_seq,
-            fps,
-            char_interval,
-            blend_n,
-            str(lip_dir),
-            audio_path,
-            output_video,
-            temp_dir,
-        )
+        if renderer == 'pipe':
+            render_lipsync_video(
+                spans,
+                fps,
+                blend_n,
+                lip_dir,
+                audio_file_path,
+                output_video,
+                resolution=resolution,
+                output_format=output_format,
+                vfr=vfr,
+            )
+        elif renderer == 'clips':
+            render_lipsync_from_clips(
+                spans,
+                fps,
+                char_interval,
+                blend_n,
+                lip_dir,
+                audio_file_path,
+                output_video,
+                resolution=resolution,
+            )
+        else:
+            generate_video_ffmpeg_fast(
+                spans,
+                fps,
+                blend_n,
+                str(lip_dir),
+                audio_path,
+                output_video,
+                temp_dir,
+            )
 
         return output_video
 
@@ -600,7 +653,43 @@ def generate_video(
         except Exception as e:
             print(f"清理临时目录时出错: {e}")
 
-        gc.collect()
+
+def start_clip_prewarm():
+    """按默认生成参数在后台预生成男女声口型片段库（LIPSYNC_CLIP_PREWARM 开启时）"""
+    if not LIPSYNC_CLIP_PREWARM:
+        return None
+    return prewarm(
+        [LIP_DIR / 'male', LIP_DIR / 'female'],
+        fps=LIPSYNC_FPS,
+        char_interval=0.5,
+        blend_n=LIPSYNC_BLEND_N,
+        resolution=LIPSYNC_RESOLUTION,
+    )
+
+
+def _validate_request(req: GenerateVideoRequest):
+    if not req.text:
+        raise HTTPException(status_code=400, detail="文本内容不能为空")
+
+    if req.gender not in [0, 1]:
+        raise HTTPException(
+            status_code=400, detail="性别参数无效，必须为 0（女性）或 1（男性）"
+        )
+
+    if req.char_interval <= 0 or req.char_interval > 2:
+        raise HTTPException(
+            status_code=400, detail="字符间隔参数无效，必须在 0 到 2 秒之间"
+        )
+
+    if req.resolution is not None and not 16 <= req.resolution <= 4096:
+        raise HTTPException(
+            status_code=400, detail="分辨率参数无效，必须在 16 到 4096 像素之间"
+        )
+
+    if req.output_format not in OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=400, detail=f"输出格式无效，必须为 {list(OUTPUT_FORMATS)} 之一"
+        )
 
 
 # 生成接口
@@ -618,52 +707,137 @@ def generate_video(
     - audio_file: 音频文件地址
     - gender: 说话者性别 (1 为男性, 0 为女性)
     - char_interval: 每个字符的持续时间（秒）
+    - resolution: 输出视频最长边像素数（可选）；传 384 时视频合成接口可直接叠加，无需再缩放
+    - output_format: mp4（默认）| webm（VP9 透明通道）| prores（ProRes 4444 透明通道）| png（PNG-in-MOV 透明通道）
+    
+    调度：
+    - 按租户公平排队（`X-Tenant-ID`，其次 `X-Session-ID`，否则按客户端地址）
+    - `X-Priority: interactive | batch` 指定优先级，短文本默认为 interactive
+    
+    幂等：
+    - 携带 `Idempotency-Key` 的重复请求会等待进行中的任务或直接返回已保存的结果（响应头 `Idempotent-Replayed: true`）
+    - 未携带时相同请求体只合并进行中的任务，不重放已保存的结果
+    
+    长文本建议使用异步任务接口 `POST /virtual/jobs`。
     
     返回生成的视频URL。
     """,
 )
-def api_generate(req: GenerateVideoRequest, request: Request):
-    if not req.text:
-        raise HTTPException(status_code=400, detail="文本内容不能为空")
-
-    if req.gender not in [0, 1]:
-        raise HTTPException(
-            status_code=400, detail="性别参数无效，必须为 0（女性）或 1（男性）"
-        )
-
-    if req.char_interval <= 0 or req.char_interval > 2:
-        raise HTTPException(
-            status_code=400, detail="字符间隔参数无效，必须在 0 到 2 秒之间"
-        )
-
+async def api_generate(
+    req: GenerateVideoRequest,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+):
+    _validate_request(req)
+
+    tenant = get_tenant(request)
+    priority = get_priority(request, interactive=len(req.text) <= INTERACTIVE_MAX_CHARS)
+    base_url = str(request.base_url).rstrip('/')
+
+    async def compute():
+        # 缓存命中直接返回；需要渲染时才等待口型生成槽位，服务繁忙时返回 429
+        return await _run_generate(req, base_url, tenant, priority, admission=virtual_admission.admit)
+
+    # 重试请求复用进行中的任务（携带 Idempotency-Key 时也复用已完成的结果），避免重复渲染
+    result = await idempotency_store.run(
+        scope="virtual.generate_video",
+        idempotency_key=idempotency_key,
+        payload=req.model_dump(mode="json"),
+        compute=compute,
+        response=response,
+        validate=lambda r: Path(r['video_url'].split('/api/v1/upload/files/', 1)[-1]).exists(),
+    )
+    return GenerateVideoResponse(**result)
+
+
+def _video_url(base_url: str, save_path: Path) -> str:
+    return f"{base_url}/api/v1/upload/files/{save_path}"
+
+
+def _prepare_audio(req: GenerateVideoRequest, temp_dir: str, resolution):
+    """取得音频（下载到临时目录）并计算结果缓存键"""
+    audio_path, _ = _load_audio_robust(req.audio_file, temp_dir)
+    cache_key = result_cache.make_key(
+        req.text,
+        file_sha256(audio_path),
+        gender=req.gender,
+        char_interval=req.char_interval,
+        fps=LIPSYNC_FPS,
+        blend_n=LIPSYNC_BLEND_N,
+        timing=LIPSYNC_TIMING,
+        resolution=resolution,
+        output_format=req.output_format,
+        renderer=LIPSYNC_RENDERER,
+        vfr=LIPSYNC_VFR,
+    )
+    return audio_path, cache_key
+
+
+async def _run_generate(req: GenerateVideoRequest, base_url: str, tenant: str, priority: str, on_start=None,
+                        admission=None):
+    """
+    生成一个口型视频：下载音频 → 查结果缓存 → 在调度器工作线程上渲染 → 写入缓存
+    阻塞操作都不在事件循环和请求线程池中执行；on_start 在开始渲染时调用；
+    admission（如 virtual_admission.admit）只包住渲染，缓存命中不占用槽位
+    """
     subtitle_url = req.subtitle_url
+    resolution = req.resolution or LIPSYNC_RESOLUTION
+    suffix = OUTPUT_FORMATS[req.output_format]['suffix']
+    temp_dir = tempfile.mkdtemp(prefix='lipsync_req_')
 
     try:
-        vid_name = f"{uuid.uuid4().hex}.mp4"
-        save_path = VIRTUAL_VIDEOS_DIR / vid_name
-
-        generate_video(
-            text=req.text,
-            output_video=str(save_path),
-            audio_file=req.audio_file,
-            gender=req.gender,
-            char_interval=req.char_interval,
+        # 先取得音频计算缓存键，命中时无需排队和渲染
+        audio_path, cache_key = await asyncio.get_running_loop().run_in_executor(
+            _io_executor, _prepare_audio, req, temp_dir, resolution
         )
+        save_path = VIRTUAL_VIDEOS_DIR / f"{uuid.uuid4().hex}{suffix}"
+        cached_path = await asyncio.get_running_loop().run_in_executor(
+            _io_executor, result_cache.checkout, cache_key, save_path, suffix
+        )
+        if cached_path is not None:
+            return GenerateVideoResponse(
+                success=True,
+                video_url=_video_url(base_url, cached_path),
+                audio_url=req.audio_file,
+                subtitle_url=subtitle_url,
+                message="视频生成成功（缓存）",
+            )
 
-        base_url = str(request.base_url).rstrip('/')
-        relative_path = str(save_path)
-        file_url = f"{base_url}/api/v1/upload/files/{relative_path}"
-
-        gc.collect()
+        def render():
+            if on_start is not None:
+                on_start()
+            generate_video(
+                text=req.text,
+                output_video=str(save_path),
+                audio_file=audio_path,
+                fps=LIPSYNC_FPS,
+                char_interval=req.char_interval,
+                blend_n=LIPSYNC_BLEND_N,
+                gender=req.gender,
+                resolution=resolution,
+                output_format=req.output_format,
+            )
+            if result_cache.enabled:
+                # 缓存保存一份硬链接，淘汰时不会删除返回给客户端的文件
+                result_cache.put(cache_key, save_path)
+
+        # 按租户公平排队，在调度器的工作线程上渲染
+        async with admission() if admission is not None else nullcontext():
+            await scheduler.run(
+                render, tenant=tenant, priority=priority, cost=max(len(req.text) / 50, 1)
+            )
 
         return GenerateVideoResponse(
             success=True,
-            video_url=file_url,
+            video_url=_video_url(base_url, save_path),
             audio_url=req.audio_file,
             subtitle_url=subtitle_url,
             message="视频生成成功",
         )
 
+    except HTTPException:
+        raise
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=f"文件未找到: {str(e)}")
     except PermissionError as e:
@@ -671,4 +845,186 @@ def api_generate(req: GenerateVideoRequest, request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"视频生成失败: {str(e)}")
     finally:
-        gc.collect()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# 批量生成接口
+@router.post(
+    "/generate-videos",
+    response_model=BatchGenerateVideoResponse,
+    summary="批量生成口型视频",
+    operation_id="generate_lip_sync_videos",
+    description="""
+    一次提交整套幻灯片的口型视频。
+    
+    每个条目的参数与 `/virtual/generate-video` 相同。条目作为同一租户的任务并行渲染
+    （受 `SCHEDULER_MAX_WORKERS` 和 `SCHEDULER_TENANT_MAX_RUNNING` 限制），共用已解码的口型图、片段库和结果缓存，
+    已生成过的条目直接命中缓存。单个条目失败不影响其他条目。
+    
+    - 默认等待全部完成，按请求顺序返回每个条目的结果
+    - `?stream=true` 时以 NDJSON 逐行返回，每完成一个条目输出一行（含 `index`），最后一行为汇总
+      （开始输出前已取得口型生成槽位，服务繁忙时同样直接返回 429）
+    - 未指定 `X-Priority` 时按 batch 优先级调度；最多 `LIPSYNC_BATCH_MAX_ITEMS`（默认 100）个条目
+    """,
+)
+async def api_generate_batch(
+    batch: BatchGenerateVideoRequest,
+    request: Request,
+    stream: bool = Query(default=False, description="Stream per-item results as NDJSON as they complete"),
+):
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="条目列表不能为空")
+    if len(batch.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"条目数量超过上限 {BATCH_MAX_ITEMS}")
+    for index, item in enumerate(batch.items):
+        try:
+            _validate_request(item)
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=f"第 {index} 个条目: {e.detail}")
+
+    tenant = get_tenant(request)
+    priority = get_priority(request, interactive=False)
+    base_url = str(request.base_url).rstrip('/')
+
+    async def run_item(index: int, item: GenerateVideoRequest) -> BatchItemResult:
+        try:
+            result = await _run_generate(item, base_url, tenant, priority)
+        except HTTPException as e:
+            return BatchItemResult(index=index, success=False, status_code=e.status_code, error=str(e.detail))
+        return BatchItemResult(index=index, success=True, status_code=200, result=result)
+
+    def summary(results) -> BatchGenerateVideoResponse:
+        succeeded = sum(1 for r in results if r.success)
+        return BatchGenerateVideoResponse(
+            success=succeeded == len(results),
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=sorted(results, key=lambda r: r.index),
+        )
+
+    if not stream:
+        # 整批占用一个口型生成槽位，条目在调度器中并行渲染
+        async with virtual_admission.admit():
+            results = await asyncio.gather(*(run_item(i, item) for i, item in enumerate(batch.items)))
+        return summary(results)
+
+    async def ndjson():
+        # 生成器持有口型生成槽位：响应体结束或从未开始，生成器关闭时都会释放
+        async with virtual_admission.admit():
+            yield ""
+            tasks = [asyncio.ensure_future(run_item(i, item)) for i, item in enumerate(batch.items)]
+            results = []
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
+                    results.append(result)
+                    yield result.model_dump_json() + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+        yield summary(results).model_dump_json(exclude={'results'}) + "\n"
+
+    # 返回 200 之前先取得槽位，服务繁忙时直接返回 429 而不是在流中途失败
+    body = ndjson()
+    await body.__anext__()
+
+    async def release():
+        # 响应体已读完时无操作，否则释放槽位
+        await body.aclose()
+
+    return StreamingResponse(body, media_type="application/x-ndjson", background=BackgroundTask(release))
+
+
+# 异步任务接口
+@router.post(
+    "/jobs",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    summary="提交口型视频生成任务",
+    operation_id="submit_lip_sync_job",
+    description="""
+    提交口型视频生成任务，立即返回任务 ID。
+    
+    请求体与 `/virtual/generate-video` 相同。任务按租户公平排队，在独立的渲染工作线程上执行，
+    通过 `GET /virtual/jobs/{job_id}` 查询状态，完成后从 `GET /virtual/jobs/{job_id}/result` 获取结果。
+    本副本排队中的任务超过 `LIPSYNC_JOB_MAX_PENDING` 或内存/磁盘余量不足时返回 429。
+    """,
+)
+async def submit_job(req: GenerateVideoRequest, request: Request):
+    _validate_request(req)
+
+    # 任务进入有界队列等待渲染，CPU 繁忙（多为本副本自己的渲染）不拒绝入队，只检查内存和磁盘
+    reasons = get_pressure_reasons(include_cpu=False)
+    if reasons:
+        raise HTTPException(
+            status_code=429,
+            detail=f"服务繁忙 (virtual): {'; '.join(reasons)}，请稍后重试",
+            headers={"Retry-After": str(virtual_admission.retry_after())},
+        )
+
+    tenant = get_tenant(request)
+    priority = get_priority(request, interactive=len(req.text) <= INTERACTIVE_MAX_CHARS)
+    base_url = str(request.base_url).rstrip('/')
+
+    async def run(on_start):
+        result = await _run_generate(req, base_url, tenant, priority, on_start=on_start)
+        return result.model_dump()
+
+    record = job_queue.submit(run, tenant=tenant)
+    return _job_submit_response(record, base_url)
+
+
+def _job_submit_response(record: dict, base_url: str) -> JobSubmitResponse:
+    job_id = record['job_id']
+    return JobSubmitResponse(
+        job_id=job_id,
+        status=record['status'],
+        status_url=f"{base_url}/api/v1/virtual/jobs/{job_id}",
+        result_url=f"{base_url}/api/v1/virtual/jobs/{job_id}/result",
+    )
+
+
+def _get_job(job_id: str) -> dict:
+    record = job_queue.get(job_id) if re.fullmatch(r'[0-9a-f]{32}', job_id) else None
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return record
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    summary="查询口型视频任务状态",
+    operation_id="get_lip_sync_job",
+    description="返回任务状态（queued / running / completed / failed）、时间戳、失败原因和完成后的结果。",
+)
+async def get_job(job_id: str):
+    return JobStatusResponse(**_get_job(job_id))
+
+
+@router.get(
+    "/jobs/{job_id}/result",
+    response_model=GenerateVideoResponse,
+    summary="获取口型视频任务结果",
+    operation_id="get_lip_sync_job_result",
+    description="任务完成时返回与 `/virtual/generate-video` 相同的结果；未完成返回 409，失败时返回任务的错误码和原因。",
+)
+async def get_job_result(job_id: str):
+    record = _get_job(job_id)
+    if record['status'] == COMPLETED:
+        return GenerateVideoResponse(**record['result'])
+    if record['status'] == FAILED:
+        raise HTTPException(status_code=record.get('status_code') or 500, detail=record.get('error'))
+    raise HTTPException(status_code=409, detail=f"任务尚未完成，当前状态: {record['status']}")
+
+
+@router.get(
+    "/cache",
+    response_model=CacheStatsResponse,
+    summary="口型视频缓存统计",
+    operation_id="get_lip_sync_cache_stats",
+    description="返回口型视频结果缓存的条数、占用空间、命中率和淘汰次数。",
+)
+async def cache_stats():
+    return CacheStatsResponse(**result_cache.stats())
@@ -0,0 +1,156 @@
+"""
+口型视频结果缓存模块
+按 文本 + 音频内容 + 渲染参数 的哈希缓存生成好的口型视频，重复提交的请求直接返回已有文件。
+缓存文件以键命名保存在共享存储上，多个副本共用；按最近访问时间淘汰（LRU），限制总条数和总大小。
+返回给客户端的视频都是独立文件（与缓存副本硬链接），淘汰只删除缓存自己的副本
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source, target):
+    """硬链接 source 到 target（不占额外空间），不支持时复制；先写临时文件再原子重命名"""
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(source, tmp)
+    except OSError:
+        try:
+            shutil.copyfile(source, tmp)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    os.replace(tmp, target)
+
+
+class LipsyncResultCache:
+    """以文件修改时间作为最近访问时间的口型视频 LRU 缓存"""
+
+    PREFIX = 'lipsync_'
+
+    def __init__(self, directory, max_entries, max_bytes, enabled=True):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text, audio_sha256, **params):
+        """由文本、音频内容哈希和渲染参数生成缓存键"""
+        canonical = json.dumps(
+            {'text': text, 'audio': audio_sha256, 'params': params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def path_for(self, key, suffix='.mp4'):
+        return self.directory / f"{self.PREFIX}{key}{suffix}"
+
+    def get(self, key, suffix='.mp4'):
+        """
+        查找缓存，命中时刷新访问时间并返回文件路径，否则返回 None
+        """
+        if not self.enabled:
+            return None
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def checkout(self, key, target, suffix='.mp4'):
+        """
+        命中时把缓存视频链接（或复制）到 target 并返回 target，否则返回 None
+        响应使用自己的文件，之后缓存淘汰不影响已返回的地址
+        """
+        cached_path = self.get(key, suffix)
+        if cached_path is None:
+            return None
+        try:
+            link_or_copy(cached_path, target)
+        except FileNotFoundError:
+            # 查找后刚好被淘汰
+            return None
+        return Path(target)
+
+    def put(self, key, video_path):
+        """
+        把生成好的视频链接（或复制）到缓存位置，原文件保留（其地址已返回给客户端），返回缓存文件路径
+        """
+        path = self.path_for(key, Path(video_path).suffix)
+        link_or_copy(video_path, path)
+        with self._lock:
+            self.stores += 1
+        self.evict()
+        return path
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.glob(f"{self.PREFIX}*.*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """按最近访问时间从旧到新删除，直到条数和总大小都在限制内"""
+        entries = sorted(self._entries())
+        total_bytes = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total_bytes -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        """缓存命中率和占用情况"""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'stores': self.stores,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,220 @@
+"""
+口型片段库模块
+每种性别只有 10 张口型图，在固定的 fps / 字符间隔 / 过渡帧数下，最多只有 100 种过渡片段和 10 种静止片段。
+这些片段预先编码一次（以关键帧开头的独立 H.264 片段）并保存在共享存储上，
+每个请求只需生成 concat 列表，用 -c copy 拼接视频并合成音频，几乎没有编码开销
+"""
+
+import hashlib
+import itertools
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+from virtual.renderer import (
+    check_visemes,
+    encode_frames,
+    frames_per_char,
+    iter_lipsync_frames,
+    load_viseme_frames,
+    spans_total_frames,
+)
+
+
+CLIPS_DIR = Path("uploads") / "aividfromppt" / "virtual_clips"
+
+# 片段编码参数必须完全一致，才能用 concat 直接拷贝码流
+_CLIP_ENCODE_ARGS = ['-g', '100000', '-bf', '0', '-video_track_timescale', '90000', '-an']
+
+_library_locks = {}
+_library_locks_guard = threading.Lock()
+
+
+def _source_fingerprint(lip_dir):
+    """口型图片的文件名、大小和修改时间摘要，图片更新后自动使用新的片段库"""
+    digest = hashlib.sha256()
+    for image in sorted(Path(lip_dir).glob('*.png')):
+        stat = image.stat()
+        digest.update(f"{image.name}:{stat.st_size}:{int(stat.st_mtime)}".encode())
+    return digest.hexdigest()[:12]
+
+
+class ClipLibrary:
+    """某个口型目录在固定 fps / 每字帧数 / 过渡帧数 / 分辨率下的预编码片段集合"""
+
+    def __init__(self, lip_dir, fps, frames_per_vis, blend_n, resolution=None):
+        self.lip_dir = Path(lip_dir)
+        self.fps = fps
+        self.frames_per_vis = frames_per_vis
+        self.blend_n = blend_n
+        self.resolution = resolution
+        name = (
+            f"{self.lip_dir.name}_{fps}fps_{frames_per_vis}f_b{blend_n}_{resolution or 'src'}"
+            f"_{_source_fingerprint(lip_dir)}"
+        )
+        self.directory = CLIPS_DIR / name
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with _library_locks_guard:
+            self._lock = _library_locks.setdefault(str(self.directory), threading.Lock())
+
+    # ----- 片段路径 -----
+
+    def hold_path(self, vis):
+        """静止片段：一个字符时长的口型 vis"""
+        return self.directory / f"hold_{vis}.mp4"
+
+    def transition_path(self, prev, vis):
+        """过渡片段：从 prev 过渡到 vis，再保持到一个字符时长"""
+        if prev == vis:
+            return self.hold_path(vis)
+        return self.directory / f"trans_{prev}_{vis}.mp4"
+
+    def frame_path(self, vis):
+        """单帧片段：用于把视频补足到音频长度"""
+        return self.directory / f"frame_{vis}.mp4"
+
+    # ----- 片段编码 -----
+
+    def _build(self, path, spans, skip, count):
+        """编码 spans 帧序列中跳过前 skip 帧后的 count 帧（已存在则跳过）"""
+        if path.exists():
+            return path
+        with self._lock:
+            if path.exists():
+                return path
+            frames = load_viseme_frames(self.lip_dir, self.resolution)
+            sequence = iter_lipsync_frames(frames, spans, self.blend_n, skip + count)
+            clip_frames = itertools.islice(sequence, skip, None)
+            # 先写临时文件再原子替换，多个副本同时生成时不会读到半个文件
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.mp4"
+            try:
+                encode_frames(clip_frames, frames.width, frames.height, self.fps, tmp, extra_args=_CLIP_ENCODE_ARGS)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        return path
+
+    def ensure_hold(self, vis):
+        return self._build(self.hold_path(vis), [(vis, self.frames_per_vis)], 0, self.frames_per_vis)
+
+    def ensure_transition(self, prev, vis):
+        if prev == vis:
+            return self.ensure_hold(vis)
+        # 两字序列去掉开头 prev 的一个字符时长，剩下的就是过渡片段
+        spans = [(prev, self.frames_per_vis), (vis, self.frames_per_vis)]
+        return self._build(self.transition_path(prev, vis), spans, self.frames_per_vis, self.frames_per_vis)
+
+    def ensure_frame(self, vis):
+        return self._build(self.frame_path(vis), [(vis, 1)], 0, 1)
+
+    def build_all(self):
+        """生成全部静止、过渡和单帧片段"""
+        visemes = sorted(load_viseme_frames(self.lip_dir, self.resolution))
+        for prev in visemes:
+            self.ensure_hold(prev)
+            self.ensure_frame(prev)
+            for vis in visemes:
+                self.ensure_transition(prev, vis)
+
+    # ----- 组装 -----
+
+    def _hold_clips(self, vis, count):
+        """用静止片段和单帧片段拼出 count 帧的口型 vis"""
+        holds, frames = divmod(count, self.frames_per_vis)
+        return [self.ensure_hold(vis)] * holds + [self.ensure_frame(vis)] * frames
+
+    def plan(self, spans):
+        """
+        把口型游程映射为片段列表
+        第一段以静止片段开头，之后每段以上一个口型到它的过渡片段开头，其余帧用静止片段补足；
+        短于一个字符时长的段（被截断的结尾或缩放后的短段）没有对应的过渡片段，直接静止显示
+        """
+        clips = []
+        prev = None
+        for vis, span_frames in spans:
+            if span_frames < self.frames_per_vis:
+                clips.extend(self._hold_clips(vis, span_frames))
+            else:
+                clips.append(self.ensure_hold(vis) if prev is None else self.ensure_transition(prev, vis))
+                clips.extend(self._hold_clips(vis, span_frames - self.frames_per_vis))
+            prev = vis
+        return clips
+
+
+def get_clip_library(lip_dir, fps, char_interval, blend_n, resolution=None):
+    """获取（必要时创建）口型片段库"""
+    return ClipLibrary(lip_dir, fps, frames_per_char(char_interval, fps), blend_n, resolution)
+
+
+def render_lipsync_from_clips(spans, fps, char_interval, blend_n, lip_dir, audio_file, output_video, resolution=None):
+    """
+    用预编码片段拼接口型视频：concat 列表 + -c copy 拷贝视频码流，只对音频编码
+    spans 应已由 plan_timing 按音频时长分配好帧数；按字符时长（pad）分配时画面与 render_lipsync_video 逐帧一致
+    """
+    check_visemes(load_viseme_frames(lip_dir, resolution), spans, lip_dir)
+    library = get_clip_library(lip_dir, fps, char_interval, blend_n, resolution)
+    total_frames = spans_total_frames(spans)
+    clips = library.plan(spans)
+
+    print(f"拼接口型片段，共 {len(clips)} 个片段，{total_frames} 帧...")
+    with tempfile.NamedTemporaryFile('w', suffix='_concat.txt', delete=False, encoding='utf-8') as f:
+        for clip in clips:
+            f.write(f"file '{clip.resolve()}'\n")
+        concat_list = f.name
+
+    try:
+        cmd = [
+            'ffmpeg',
+            '-y',
+            '-v',
+            'error',
+            '-f',
+            'concat',
+            '-safe',
+            '0',
+            '-i',
+            concat_list,
+            '-i',
+            audio_file,
+            '-map',
+            '0:v',
+            '-map',
+            '1:a',
+            '-c:v',
+            'copy',
+            '-c:a',
+            'aac',
+            '-b:a',
+            '128k',
+            '-shortest',
+            output_video,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"片段拼接失败: {result.stderr}")
+    finally:
+        os.remove(concat_list)
+
+    print(f"视频生成成功: {output_video}")
+    return output_video
+
+
+def prewarm(lip_dirs, fps, char_interval, blend_n, resolution=None):
+    """
+    后台线程中预先生成默认参数下的完整片段库，首次请求无需等待编码
+    """
+    def _run():
+        for lip_dir in lip_dirs:
+            try:
+                get_clip_library(lip_dir, fps, char_interval, blend_n, resolution).build_all()
+                print(f"口型片段库已就绪: {lip_dir}")
+            except Exception as e:
+                print(f"口型片段库预生成失败 ({lip_dir}): {e}")
+
+    thread = threading.Thread(target=_run, name="lipsync-clip-prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,138 @@
+"""
+口型视频异步任务模块
+提交后立即返回任务 ID，渲染在事件循环中排队、在调度器的工作线程上执行，不占用请求线程池。
+任务记录保存在共享存储上，任一副本都能查询状态和结果
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from fastapi import HTTPException
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+# 清理过期任务记录的间隔（秒）
+_SWEEP_INTERVAL = 600.0
+
+
+class LipsyncJobQueue:
+    """有上限的口型视频任务队列，记录以 JSON 文件保存"""
+
+    def __init__(self, directory, max_pending, ttl):
+        """
+        directory: 任务记录目录（共享存储）
+        max_pending: 本副本同时排队和运行的任务上限，超出时返回 429
+        ttl: 已结束任务记录的保留时间（秒）
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    # ----- 记录读写 -----
+
+    def _path(self, job_id):
+        return self.directory / f"{job_id}.json"
+
+    def _write(self, record):
+        path = self._path(record['job_id'])
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            record = self.get(job_id) or {'job_id': job_id}
+            record.update(fields)
+            self._write(record)
+            return record
+
+    def get(self, job_id):
+        """读取任务记录，不存在时返回 None"""
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _sweep_expired(self):
+        now = time.time()
+        if now - self._last_sweep < _SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        for path in self.directory.glob('*.json'):
+            try:
+                if now - path.stat().st_mtime > self.ttl:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+
+    # ----- 提交与执行 -----
+
+    @property
+    def pending(self):
+        return len(self._tasks)
+
+    def submit(self, run, **meta):
+        """
+        提交任务，立即返回任务记录
+        run: 协程函数 run(on_start) -> 可 JSON 序列化的结果，开始渲染时调用 on_start()
+        meta: 额外写入记录的字段
+        必须在事件循环中调用；队列已满时抛出 429
+        """
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=429,
+                detail=f"口型视频任务队列已满（{self.max_pending}），请稍后重试",
+                headers={"Retry-After": "30"},
+            )
+
+        job_id = uuid.uuid4().hex
+        record = {
+            'job_id': job_id,
+            'status': QUEUED,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'status_code': None,
+            **meta,
+        }
+        self._write(record)
+
+        task = asyncio.get_running_loop().create_task(self._execute(job_id, run))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._sweep_expired()
+        return record
+
+    async def _execute(self, job_id, run):
+        def on_start():
+            self._update(job_id, status=RUNNING, started_at=time.time())
+
+        try:
+            result = await run(on_start)
+        except HTTPException as e:
+            self._update(job_id, status=FAILED, finished_at=time.time(), error=str(e.detail), status_code=e.status_code)
+        except Exception as e:
+            self._update(job_id, status=FAILED, finished_at=time.time(), error=str(e), status_code=500)
+        else:
+            self._update(job_id, status=COMPLETED, finished_at=time.time(), result=result, status_code=200)
+
+    def stats(self):
+        """本副本的任务队列占用情况"""
+        return {'pending': self.pending, 'max_pending': self.max_pending}
@@ -0,0 +1,379 @@
+"""
+口型视频渲染模块
+口型图片只解码一次（可按目标分辨率缩放）并缓存为 NumPy 数组：一张完整底图 + 每个口型的差异区域（ROI），
+过渡帧只在 ROI 内做向量化线性插值并贴回底图，
+原始帧通过 stdin 管道写入单个 FFmpeg 进程，同时完成编码和音频合成
+"""
+
+import itertools
+import json
+import math
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+_frame_cache = {}
+_frame_cache_lock = threading.Lock()
+
+# 输出格式：扩展名、是否带透明通道、视频/音频编码参数
+# 带透明通道的格式可直接叠加到幻灯片背景上
+OUTPUT_FORMATS = {
+    'mp4': {
+        'suffix': '.mp4',
+        'alpha': False,
+        'video': ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23', '-pix_fmt', 'yuv420p'],
+        'audio': ['-c:a', 'aac', '-b:a', '128k'],
+    },
+    'webm': {
+        'suffix': '.webm',
+        'alpha': True,
+        'video': [
+            '-c:v', 'libvpx-vp9', '-pix_fmt', 'yuva420p', '-b:v', '0', '-crf', '32',
+            '-deadline', 'realtime', '-cpu-used', '8', '-row-mt', '1',
+        ],
+        'audio': ['-c:a', 'libopus', '-b:a', '128k'],
+    },
+    'prores': {
+        'suffix': '.mov',
+        'alpha': True,
+        'video': ['-c:v', 'prores_ks', '-profile:v', '4444', '-pix_fmt', 'yuva444p10le'],
+        'audio': ['-c:a', 'aac', '-b:a', '128k'],
+    },
+    'png': {
+        'suffix': '.mov',
+        'alpha': True,
+        'video': ['-c:v', 'png', '-pix_fmt', 'rgba'],
+        'audio': ['-c:a', 'aac', '-b:a', '128k'],
+    },
+}
+
+
+def _probe_image_size(image_path):
+    """获取图片宽高"""
+    cmd = [
+        'ffprobe',
+        '-v',
+        'error',
+        '-select_streams',
+        'v:0',
+        '-show_entries',
+        'stream=width,height',
+        '-of',
+        'json',
+        str(image_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    stream = json.loads(result.stdout)['streams'][0]
+    return stream['width'], stream['height']
+
+
+def _target_size(width, height, resolution):
+    """按最长边 resolution 等比缩放后的宽高（取偶数，满足 yuv420p）"""
+    if not resolution:
+        return width, height
+    scale = resolution / max(width, height)
+    return max(int(round(width * scale / 2)) * 2, 2), max(int(round(height * scale / 2)) * 2, 2)
+
+
+def _decode_image(image_path, width, height, scaled=False, alpha=False):
+    """用 FFmpeg 将图片解码（并缩放）为 RGB24 数组 (height, width, 3)，alpha 时为 RGBA (height, width, 4)"""
+    cmd = [
+        'ffmpeg',
+        '-v',
+        'error',
+        '-i',
+        str(image_path),
+    ]
+    if scaled:
+        cmd += ['-vf', f'scale={width}:{height}:flags=area']
+    cmd += [
+        '-f',
+        'rawvideo',
+        '-pix_fmt',
+        'rgba' if alpha else 'rgb24',
+        '-',
+    ]
+    result = subprocess.run(cmd, capture_output=True, check=True)
+    channels = 4 if alpha else 3
+    if len(result.stdout) != width * height * channels:
+        raise Exception(f"口型图片解码失败: {image_path}")
+    return np.frombuffer(result.stdout, dtype=np.uint8).reshape(height, width, channels)
+
+
+def _diff_box(images):
+    """所有口型图片之间存在差异的最小矩形 (top, bottom, left, right)"""
+    stack = np.stack(images)
+    changed = (stack.max(axis=0) != stack.min(axis=0)).any(axis=-1)
+    rows = np.flatnonzero(changed.any(axis=1))
+    cols = np.flatnonzero(changed.any(axis=0))
+    if rows.size == 0:
+        # 所有口型完全相同，保留一个像素的区域
+        return 0, 1, 0, 1
+    return int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+
+class VisemeFrames:
+    """
+    一个口型目录的解码结果：完整底图 + 每个口型在差异区域内的像素
+    差异区域之外所有口型都与底图相同，因此只需保存和计算这一小块
+    """
+
+    def __init__(self, base, box, rois):
+        self.base = base
+        self.box = box
+        self.rois = rois
+        self.height, self.width = base.shape[:2]
+
+    def __contains__(self, vis):
+        return vis in self.rois
+
+    def __iter__(self):
+        return iter(self.rois)
+
+    def roi_slice(self):
+        top, bottom, left, right = self.box
+        return slice(top, bottom), slice(left, right)
+
+
+def load_viseme_frames(lip_dir, resolution=None, alpha=False):
+    """
+    加载口型目录下全部图片（进程内缓存，每个目录、分辨率和通道格式只解码一次）
+    resolution 为输出最长边像素数，None 表示原图大小；alpha 时保留图片透明通道
+    返回 VisemeFrames
+    """
+    key = (str(lip_dir), resolution, alpha)
+    with _frame_cache_lock:
+        if key in _frame_cache:
+            return _frame_cache[key]
+
+        images = sorted(Path(lip_dir).glob('*.png'))
+        if not images:
+            raise FileNotFoundError(f"口型图片不存在: {lip_dir}")
+
+        source_width, source_height = _probe_image_size(images[0])
+        width, height = _target_size(source_width, source_height, resolution)
+        scaled = (width, height) != (source_width, source_height)
+        decoded = {image.stem: _decode_image(image, width, height, scaled, alpha) for image in images}
+
+        box = _diff_box(list(decoded.values()))
+        rows, cols = slice(box[0], box[1]), slice(box[2], box[3])
+        base = decoded[images[0].stem]
+        # 缓存的数据被多个请求共享，禁止写入；只保留差异区域的拷贝，完整帧随后释放
+        base.setflags(write=False)
+        rois = {}
+        for vis, frame in decoded.items():
+            roi = np.ascontiguousarray(frame[rows, cols])
+            roi.setflags(write=False)
+            rois[vis] = roi
+
+        frames = VisemeFrames(base, box, rois)
+        _frame_cache[key] = frames
+        return frames
+
+
+def frames_per_char(char_interval, fps):
+    """每个字符占用的帧数"""
+    return max(int(round(char_interval * fps)), 1)
+
+
+def compress_vis_seq(vis_seq, frames_per_vis):
+    """
+    把逐字口型序列压缩为游程 [(口型, 帧数), ...]
+    连续相同的口型合并为一段更长的静止，总帧数与逐字序列完全一致
+    """
+    spans = []
+    for vis, group in itertools.groupby(vis_seq):
+        spans.append((vis, sum(1 for _ in group) * frames_per_vis))
+    return spans
+
+
+def spans_total_frames(spans):
+    """游程序列的总帧数"""
+    return sum(n for _, n in spans)
+
+
+def plan_timing(spans, fps, audio_duration, mode='pad'):
+    """
+    根据音频时长一次性分配各段帧数，使视频总帧数正好覆盖音频
+    pad: 保持每字时长，不足时延长最后一个口型，超出时截掉结尾
+    scale: 按比例缩放各段时长铺满音频（每段至少 1 帧）
+    """
+    target = max(int(math.ceil(audio_duration * fps)), 1)
+    planned = spans_total_frames(spans)
+
+    if mode == 'scale' and planned != target:
+        if target < len(spans):
+            # 音频太短放不下所有口型，退化为截断
+            return plan_timing(spans, fps, audio_duration, mode='pad')
+        # 每段先分 1 帧，剩余帧按原时长比例分配（最大余数法）
+        extra = target - len(spans)
+        weights = [n for _, n in spans]
+        shares = [extra * w / planned for w in weights]
+        counts = [int(share) for share in shares]
+        remainder = extra - sum(counts)
+        for i in sorted(range(len(spans)), key=lambda i: shares[i] - counts[i], reverse=True)[:remainder]:
+            counts[i] += 1
+        return [(vis, count + 1) for (vis, _), count in zip(spans, counts)]
+
+    if planned < target:
+        vis, n = spans[-1]
+        return spans[:-1] + [(vis, n + target - planned)]
+
+    result = []
+    remaining = target
+    for vis, n in spans:
+        if remaining <= 0:
+            break
+        result.append((vis, min(n, remaining)))
+        remaining -= n
+    return result
+
+
+def iter_lipsync_frames(frames, spans, blend_n, total_frames):
+    """
+    按口型游程逐帧生成画面
+    第一段直接静止显示；之后每段先用 blend_n 帧从上一个口型线性过渡，再保持静止；
+    序列结束后用最后一个口型补足到 total_frames 帧
+    所有帧共用同一块画布，只改写差异区域；每帧在下一次迭代前有效
+    """
+    canvas = frames.base.copy()
+    roi = canvas[frames.roi_slice()]
+    shown = None
+    emitted = 0
+    prev = None
+    for vis, span_frames in spans:
+        current = frames.rois[vis]
+        blend_frames = min(blend_n, span_frames) if prev is not None else 0
+
+        if blend_frames > 0 and prev is not current:
+            start = prev.astype(np.float32)
+            delta = current.astype(np.float32) - start
+            for k in range(blend_frames):
+                if emitted >= total_frames:
+                    return
+                # 与 FFmpeg blend 滤镜一致：第 k 帧的权重为 k / blend_frames
+                roi[...] = start + delta * (k / blend_frames)
+                shown = None
+                yield canvas
+                emitted += 1
+            hold_frames = span_frames - blend_frames
+        else:
+            hold_frames = span_frames
+
+        for _ in range(hold_frames):
+            if emitted >= total_frames:
+                return
+            if shown is not current:
+                roi[...] = current
+                shown = current
+            yield canvas
+            emitted += 1
+        prev = current
+
+    if shown is not frames.rois[spans[-1][0]]:
+        roi[...] = frames.rois[spans[-1][0]]
+    while emitted < total_frames:
+        yield canvas
+        emitted += 1
+
+
+def encode_frames(
+    frames, width, height, fps, output_video, audio_file=None, extra_args=None, output_format='mp4', vfr=False
+):
+    """
+    将原始 RGB24 / RGBA 帧通过 stdin 管道写入单个 FFmpeg 进程，按 output_format 编码
+    提供 audio_file 时同时合成音频并以较短的流为准截断
+    vfr 时丢弃与上一帧完全相同的帧（可变帧率，保留原时间戳），静止口型几乎不占编码时间和体积；
+    至少每秒保留一帧，视频流在最后一次口型变化后最多提前 1 秒结束（播放器和叠加滤镜会保持最后一帧）
+    """
+    spec = OUTPUT_FORMATS[output_format]
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-v',
+        'error',
+        '-f',
+        'rawvideo',
+        '-pix_fmt',
+        'rgba' if spec['alpha'] else 'rgb24',
+        '-s',
+        f'{width}x{height}',
+        '-r',
+        str(fps),
+        '-i',
+        '-',
+    ]
+    if audio_file:
+        cmd += ['-i', audio_file, '-map', '0:v', '-map', '1:a']
+    if vfr:
+        # hi=0/lo=0/frac=0：只丢弃逐像素完全相同的帧
+        cmd += ['-vf', f'mpdecimate=hi=0:lo=0:frac=0:max={max(int(fps) - 1, 1)}', '-fps_mode', 'vfr']
+    cmd += spec['video']
+    if extra_args:
+        cmd += extra_args
+    if audio_file:
+        cmd += spec['audio']
+        if not vfr:
+            # 可变帧率时视频流可能略短于音频，不能按较短的流截断
+            cmd.append('-shortest')
+    cmd.append(output_video)
+
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=stderr_file)
+        try:
+            for frame in frames:
+                proc.stdin.write(frame.data)
+            proc.stdin.close()
+        except BrokenPipeError:
+            # FFmpeg 提前退出，错误信息在 stderr 中
+            pass
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        returncode = proc.wait()
+        if returncode != 0:
+            stderr_file.seek(0)
+            raise Exception(f"视频编码失败: {stderr_file.read().decode(errors='ignore')}")
+    return output_video
+
+
+def check_visemes(frames, spans, lip_dir):
+    """确认序列中的口型图片都存在"""
+    missing = [vis for vis in {vis for vis, _ in spans} if vis not in frames]
+    if missing:
+        raise FileNotFoundError(f"口型图片不存在: {[os.path.join(str(lip_dir), f'{v}.png') for v in missing]}")
+
+
+def render_lipsync_video(
+    spans, fps, blend_n, lip_dir, audio_file, output_video, resolution=None, output_format='mp4', vfr=False
+):
+    """
+    单进程渲染口型视频：NumPy 生成帧 → FFmpeg stdin → 编码 + 音频
+    spans 应已由 plan_timing 按音频时长分配好帧数；resolution 为输出最长边像素数；
+    output_format 见 OUTPUT_FORMATS，带透明通道的格式保留口型图的透明背景；vfr 见 encode_frames
+    """
+    frames = load_viseme_frames(lip_dir, resolution, alpha=OUTPUT_FORMATS[output_format]['alpha'])
+    check_visemes(frames, spans, lip_dir)
+
+    total_frames = spans_total_frames(spans)
+
+    print(f"开始渲染视频，共 {len(spans)} 段口型，{total_frames} 帧...")
+    encode_frames(
+        iter_lipsync_frames(frames, spans, blend_n, total_frames),
+        frames.width,
+        frames.height,
+        fps,
+        output_video,
+        audio_file=audio_file,
+        output_format=output_format,
+        vfr=vfr,
+    )
+
+    print(f"视频生成成功: {output_video}")
+    return output_video
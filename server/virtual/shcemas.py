@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class GenerateVideoRequest(BaseModel):
@@ -16,6 +16,14 @@ class GenerateVideoRequest(BaseModel):
     char_interval: float = Field(
         default=0.5, description="Duration per character in seconds"
     )
+    resolution: Optional[int] = Field(
+        default=None,
+        description="Longest side of the output video in pixels (384 matches the video synthesizer overlay size)",
+    )
+    output_format: str = Field(
+        default="mp4",
+        description="Output format: mp4 (H.264), webm (VP9 with alpha), prores (ProRes 4444 with alpha), png (PNG-in-MOV with alpha)",
+    )
 
     class Config:
         json_schema_extra = {
@@ -24,6 +32,8 @@ class GenerateVideoRequest(BaseModel):
                 "audio_file": "http://xxx.com/file.mp3",
                 "gender": 1,
                 "char_interval": 0.5,
+                "resolution": 384,
+                "output_format": "webm",
             }
         }
 
@@ -52,6 +62,148 @@ class GenerateVideoResponse(BaseModel):
         }
 
 
+class BatchGenerateVideoRequest(BaseModel):
+    """Batch video generation request model"""
+
+    items: List[GenerateVideoRequest] = Field(..., description="Videos to generate, e.g. one per slide")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"text": "第一页的讲解内容", "audio_file": "http://xxx.com/slide1.mp3", "gender": 1, "char_interval": 0.5},
+                    {"text": "第二页的讲解内容", "audio_file": "http://xxx.com/slide2.mp3", "gender": 1, "char_interval": 0.5},
+                ]
+            }
+        }
+
+
+class BatchItemResult(BaseModel):
+    """Result of one item in a batch"""
+
+    index: int = Field(..., description="Position of the item in the request")
+    success: bool = Field(..., description="Whether this item was generated")
+    status_code: int = Field(..., description="HTTP status the item would have returned on its own")
+    result: Optional[GenerateVideoResponse] = Field(default=None, description="Generation result on success")
+    error: Optional[str] = Field(default=None, description="Failure reason")
+
+
+class BatchGenerateVideoResponse(BaseModel):
+    """Batch video generation response model"""
+
+    success: bool = Field(..., description="Whether every item was generated")
+    total: int = Field(..., description="Number of items")
+    succeeded: int = Field(..., description="Number of generated items")
+    failed: int = Field(..., description="Number of failed items")
+    results: List[BatchItemResult] = Field(..., description="Per-item results in request order")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "total": 1,
+                "succeeded": 1,
+                "failed": 0,
+                "results": [
+                    {
+                        "index": 0,
+                        "success": True,
+                        "status_code": 200,
+                        "result": {
+                            "success": True,
+                            "subtitle_url": '',
+                            "audio_url": "http://xxx.com/slide1.mp3",
+                            "video_url": "https://example.com/api/v1/upload/files/uploads/aividfromppt/videos/lipsync_9f3f.mp4",
+                            "message": "视频生成成功",
+                        },
+                        "error": None,
+                    }
+                ],
+            }
+        }
+
+
+class JobSubmitResponse(BaseModel):
+    """Lip-sync job submission response model"""
+
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="Job status: queued, running, completed or failed")
+    status_url: str = Field(..., description="URL to poll the job status")
+    result_url: str = Field(..., description="URL to fetch the result once completed")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2b9c0e8d7a4b6c9e1f0a2b3c4d5e6f",
+                "status": "queued",
+                "status_url": "https://example.com/api/v1/virtual/jobs/3f2b9c0e8d7a4b6c9e1f0a2b3c4d5e6f",
+                "result_url": "https://example.com/api/v1/virtual/jobs/3f2b9c0e8d7a4b6c9e1f0a2b3c4d5e6f/result",
+            }
+        }
+
+
+class JobStatusResponse(BaseModel):
+    """Lip-sync job status response model"""
+
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="Job status: queued, running, completed or failed")
+    created_at: float = Field(..., description="Submission time (Unix timestamp)")
+    started_at: Optional[float] = Field(default=None, description="Render start time (Unix timestamp)")
+    finished_at: Optional[float] = Field(default=None, description="Completion time (Unix timestamp)")
+    error: Optional[str] = Field(default=None, description="Failure reason")
+    result: Optional[GenerateVideoResponse] = Field(default=None, description="Result once completed")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2b9c0e8d7a4b6c9e1f0a2b3c4d5e6f",
+                "status": "completed",
+                "created_at": 1731571530.12,
+                "started_at": 1731571531.04,
+                "finished_at": 1731571537.88,
+                "error": None,
+                "result": {
+                    "success": True,
+                    "subtitle_url": '',
+                    "audio_url": "http://xxx.com/file.mp3",
+                    "video_url": "https://example.com/api/v1/upload/files/uploads/aividfromppt/videos/lipsync_9f3f.mp4",
+                    "message": "视频生成成功",
+                },
+            }
+        }
+
+
+class CacheStatsResponse(BaseModel):
+    """Lip-sync result cache statistics model"""
+
+    enabled: bool = Field(..., description="Whether the result cache is enabled")
+    entries: int = Field(..., description="Number of cached videos")
+    bytes: int = Field(..., description="Total size of cached videos in bytes")
+    max_entries: int = Field(..., description="Maximum number of cached videos")
+    max_bytes: int = Field(..., description="Maximum total size in bytes")
+    hits: int = Field(..., description="Cache hits since process start")
+    misses: int = Field(..., description="Cache misses since process start")
+    hit_rate: float = Field(..., description="hits / (hits + misses)")
+    stores: int = Field(..., description="Videos added to the cache since process start")
+    evictions: int = Field(..., description="Videos evicted since process start")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "enabled": True,
+                "entries": 42,
+                "bytes": 73400320,
+                "max_entries": 2000,
+                "max_bytes": 10737418240,
+                "hits": 17,
+                "misses": 25,
+                "hit_rate": 0.4048,
+                "stores": 25,
+                "evictions": 0,
+            }
+        }
+
+
 class HealthResponse(BaseModel):
     """Health check response model"""
 